@@ -1,13 +1,23 @@
 """
 Flask Application - Medical Chatbot Backend API with Authentication
 """
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, make_response
 from flask_cors import CORS
 from conversation_manager import conversation_manager, ConversationState
+from conversation_summarizer import ConversationSummarizer
 from medical_response_generator import MedicalResponseGenerator
 from llm_providers import LLMProviderFactory
 from auth_memory_store import auth_store
+from response_cache import response_cache
+from translation_memory import translation_memory
+from rate_limiter import ConcurrencyLimiter, TokenBucketLimiter
+from llm_scheduler import LLMScheduler, SchedulerBusy
+from translation_jobs import create_translation_job_queue
 import config
+import json
+import math
+import threading
+import time
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -47,6 +57,99 @@ def require_auth(f):
     wrapper.__name__ = f.__name__
     return wrapper
 
+# Auth rate limits and per-route-group admission control
+auth_ip_limiter = TokenBucketLimiter(
+    rate=config.Config.AUTH_IP_RATE_PER_MINUTE / 60,
+    burst=config.Config.AUTH_IP_BURST,
+    max_keys=config.Config.RATE_LIMIT_MAX_KEYS
+)
+auth_email_limiter = TokenBucketLimiter(
+    rate=config.Config.AUTH_EMAIL_RATE_PER_MINUTE / 60,
+    burst=config.Config.AUTH_EMAIL_BURST,
+    max_keys=config.Config.RATE_LIMIT_MAX_KEYS
+)
+auth_admission = ConcurrencyLimiter('auth', config.Config.AUTH_MAX_CONCURRENT)
+chat_admission = ConcurrencyLimiter('chat', config.Config.CHAT_MAX_CONCURRENT)
+
+# Caps concurrent LLM-bound requests, queuing the excess fairly per user
+llm_scheduler = LLMScheduler(
+    max_concurrent=config.Config.LLM_MAX_CONCURRENT,
+    max_queue=config.Config.LLM_QUEUE_MAX,
+    max_queue_per_user=config.Config.LLM_QUEUE_MAX_PER_USER,
+    max_wait_seconds=config.Config.LLM_QUEUE_TIMEOUT_SECONDS
+)
+
+def rate_limit_auth(f):
+    """Decorator applying the per-IP and per-email token buckets to an auth route"""
+    def wrapper(*args, **kwargs):
+        if config.Config.AUTH_RATE_LIMIT_ENABLED:
+            data = request.get_json(silent=True) or {}
+            email = data.get('email')
+            wait = auth_ip_limiter.acquire(request.remote_addr or 'unknown')
+            if isinstance(email, str) and email:
+                wait = max(wait, auth_email_limiter.acquire(email.strip().lower()))
+            if wait:
+                response = jsonify({'success': False, 'error': 'Too many attempts. Please try again later.'})
+                response.headers['Retry-After'] = str(math.ceil(wait))
+                return response, 429
+        return f(*args, **kwargs)
+    wrapper.__name__ = f.__name__
+    return wrapper
+
+def _busy_response(error, retry_after):
+    response = jsonify({'success': False, 'error': error})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 503
+
+def _call_holding(f, args, kwargs, release):
+    """Run a view, calling release once its response is done (after the stream, if streamed)"""
+    try:
+        response = make_response(f(*args, **kwargs))
+    except BaseException:
+        release()
+        raise
+    if response.is_streamed:
+        response.call_on_close(release)
+    else:
+        release()
+    return response
+
+def admit(limiter):
+    """Decorator rejecting requests with 503 while the route group is at its concurrency limit"""
+    def decorator(f):
+        def wrapper(*args, **kwargs):
+            if not limiter.try_acquire():
+                return _busy_response('Server busy. Please try again shortly.', 1)
+            return _call_holding(f, args, kwargs, limiter.release)
+        wrapper.__name__ = f.__name__
+        return wrapper
+    return decorator
+
+def schedule_llm(validate):
+    """Decorator holding an LLM scheduler slot for the user while the view runs
+
+    validate(*args, **kwargs) runs first and returns an error response for
+    a request that cannot be served (or None), so malformed requests never
+    wait for or use up a slot of the user's fair share. Responds 503 with
+    Retry-After when no slot can be had in time.
+    """
+    def decorator(f):
+        def wrapper(*args, **kwargs):
+            error_response = validate(*args, **kwargs)
+            if error_response:
+                return error_response
+
+            try:
+                llm_scheduler.acquire(request.user['email'])
+            except SchedulerBusy as e:
+                return _busy_response('The assistant is busy. Please try again shortly.', e.retry_after)
+
+            start = time.monotonic()
+            return _call_holding(f, args, kwargs, lambda: llm_scheduler.release(time.monotonic() - start))
+        wrapper.__name__ = f.__name__
+        return wrapper
+    return decorator
+
 # Initialize medical response generator
 try:
     medical_generator = MedicalResponseGenerator()
@@ -54,9 +157,60 @@ except Exception as e:
     print(f"Warning: Could not initialize medical generator: {e}")
     medical_generator = None
 
+
+def _summarize_conversation(previous_summary, messages):
+    # Resolved at call time so provider switches apply to summaries too
+    return medical_generator.summarize_conversation(previous_summary, messages)
+
+
+conversation_summarizer = ConversationSummarizer(
+    conversation_manager,
+    _summarize_conversation,
+    max_workers=config.Config.CONVERSATION_SUMMARY_WORKERS,
+    scheduler=llm_scheduler
+) if config.Config.CONVERSATION_SUMMARY_ENABLED else None
+
+
+def _translate_messages(messages, language, previous_language, llm_slot=None):
+    # Resolved at call time so provider switches apply to translations too
+    # Untranslated messages come back as None so the job can report a partial translation
+    return medical_generator.translate_messages(
+        messages, language, previous_language, llm_slot=llm_slot, fallback=False
+    )
+
+
+# Language-switch translations run as background jobs; each LLM call holds a slot for the owner.
+# The queue, and its database at Config.TRANSLATION_JOBS_DB, is created on first use
+translation_jobs = None
+_translation_jobs_lock = threading.Lock()
+
+
+def get_translation_jobs():
+    """The translation job queue, created on first use"""
+    global translation_jobs
+    with _translation_jobs_lock:
+        if translation_jobs is None:
+            translation_jobs = create_translation_job_queue(
+                conversation_manager, _translate_messages, scheduler=llm_scheduler
+            )
+        return translation_jobs
+
+@app.after_request
+def flush_conversations(response):
+    """Save each conversation the request changed, once"""
+    if response.is_streamed:
+        return response  # Streaming handlers flush when their body completes
+    try:
+        conversation_manager.flush()
+    except Exception as e:
+        print(f"Warning: Could not save conversations: {e}")
+    return response
+
 # Authentication Routes
 
 @app.route('/api/auth/register', methods=['POST'])
+@rate_limit_auth
+@admit(auth_admission)
 def register():
     """Register a new user"""
     try:
@@ -88,6 +242,8 @@ def register():
         }), 500
 
 @app.route('/api/auth/login', methods=['POST'])
+@rate_limit_auth
+@admit(auth_admission)
 def login():
     """Authenticate user login"""
     try:
@@ -135,6 +291,24 @@ def logout():
             'error': 'Logout failed'
         }), 500
 
+@app.route('/api/auth/logout-all', methods=['POST'])
+@require_auth
+def logout_all():
+    """Logout user from every session"""
+    try:
+        auth_store.logout_all_sessions(request.user['email'])
+
+        return jsonify({
+            'success': True,
+            'message': 'Logged out of all sessions'
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': 'Logout failed'
+        }), 500
+
 @app.route('/api/auth/me', methods=['GET'])
 @require_auth
 def get_current_user():
@@ -146,12 +320,55 @@ def get_current_user():
 
 # User Conversations Routes
 
+def _page_arg(name, default, minimum):
+    """Read an integer query parameter; limits are capped at MAX_PAGE_SIZE"""
+    value = int(request.args.get(name, default))
+    if value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return min(value, config.Config.MAX_PAGE_SIZE) if name == 'limit' else value
+
+def _client_messages(messages):
+    """Stored messages as the frontend renders them: assistant replies as their structured response"""
+    formatted = []
+    for m in messages:
+        response = m.get('response')
+        if response is not None:
+            m = {key: value for key, value in m.items() if key != 'response'}
+            m['content'] = response
+        formatted.append(m)
+    return formatted
+
 @app.route('/api/user/conversations', methods=['GET'])
 @require_auth
 def get_user_conversations():
-    """Get all conversations for the authenticated user"""
+    """Get the authenticated user's conversations
+
+    With `limit` and/or `cursor` query parameters, returns one page of
+    summaries (id, title, updated_at, message_count) and a next_cursor;
+    without them, returns every conversation with its messages.
+    """
     try:
+        if 'limit' in request.args or 'cursor' in request.args:
+            try:
+                limit = _page_arg('limit', config.Config.CONVERSATION_PAGE_SIZE, 1)
+                page = auth_store.list_conversation_summaries(
+                    request.user['email'], limit, request.args.get('cursor') or None
+                )
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'error': 'limit must be a positive integer and cursor a value returned by a previous page'
+                }), 400
+
+            return jsonify({
+                'success': True,
+                'conversations': page['conversations'],
+                'next_cursor': page['next_cursor']
+            }), 200
+
         conversations = auth_store.get_user_conversations(request.user['email'])
+        for conversation in conversations:
+            conversation['messages'] = _client_messages(conversation.get('messages', []))
         return jsonify({
             'success': True,
             'conversations': conversations
@@ -163,6 +380,39 @@ def get_user_conversations():
             'error': 'Failed to get conversations'
         }), 500
 
+@app.route('/api/user/conversations/<conversation_id>/messages', methods=['GET'])
+@require_auth
+def get_user_conversation_messages(conversation_id):
+    """Get one page of a saved conversation's messages (`offset`, `limit`), oldest first"""
+    try:
+        try:
+            offset = _page_arg('offset', 0, 0)
+            limit = _page_arg('limit', config.Config.MESSAGE_PAGE_SIZE, 1)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'offset and limit must be integers (limit at least 1)'
+            }), 400
+
+        page = auth_store.get_conversation_messages(conversation_id, request.user['email'], offset, limit)
+        if page is None:
+            return jsonify({
+                'success': False,
+                'error': 'Conversation not found'
+            }), 404
+
+        page['messages'] = _client_messages(page['messages'])
+        return jsonify({
+            'success': True,
+            **page
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': 'Failed to get messages'
+        }), 500
+
 @app.route('/api/user/conversations', methods=['POST'])
 @require_auth
 def save_user_conversation():
@@ -211,19 +461,8 @@ def start_conversation():
     """Start a new conversation session for authenticated user"""
     try:
         user_email = request.user['email']
-        conversation_id = conversation_manager.create_conversation(user_email)
-
-        # Save conversation to user's in-memory store
-        conversation_data = {
-            'id': conversation_id,
-            'title': 'New Conversation',
-            'messages': [],
-            'age': None,
-            'language': 'english',
-            'created_at': conversation_manager.get_conversation(conversation_id)['created_at'],
-            'updated_at': conversation_manager.get_conversation(conversation_id)['updated_at']
-        }
-        auth_store.save_conversation(user_email, conversation_data)
+        # Saved to the user's store when the request finishes
+        conversation_id = conversation_manager.create_conversation(user_email, owner=user_email)
 
         return jsonify({
             'success': True,
@@ -245,7 +484,6 @@ def start_conversation():
 def set_age(conversation_id):
     """Set age for a conversation"""
     try:
-        user_email = request.user['email']
         data = request.json
         age = data.get('age')
 
@@ -263,15 +501,7 @@ def set_age(conversation_id):
                 'error': 'Invalid age group or conversation not found'
             }), 400
 
-        # Update conversation in in-memory store
         conv = conversation_manager.get_conversation(conversation_id)
-        auth_store.update_conversation_messages(conversation_id, conv['messages'], user_email)
-
-        # Update conversation metadata
-        conversation_data = auth_store.get_conversation(conversation_id, user_email)
-        if conversation_data:
-            conversation_data['age'] = age
-            auth_store.save_conversation(user_email, conversation_data)
 
         response = {
             'success': True,
@@ -305,6 +535,9 @@ def set_language(conversation_id):
         data = request.json
         language = data.get('language', 'english').lower()
         
+        previous = conversation_manager.get_conversation(conversation_id)
+        previous_language = previous['language'] if previous else None
+        
         success = conversation_manager.set_language(conversation_id, language)
         
         if not success:
@@ -322,42 +555,10 @@ def set_language(conversation_id):
             'state': conv['state'].value
         }
 
-        # Attempt to translate existing conversation messages to the selected language
-        try:
-            if medical_generator and conv and conv.get('messages'):
-                # Use the generator's translator to get translated contents
-                translated_contents = medical_generator.translate_messages(conv['messages'], language)
-                # Update stored messages in conversation manager
-                conversation_manager.translate_conversation(conversation_id, language, lambda msgs, lang: medical_generator.translate_messages(msgs, lang))
-                # Build translated message objects to return
-                translated_messages = []
-                for i, m in enumerate(conv['messages']):
-                    content = translated_contents[i]
-                    # For assistant messages, try to parse into structured response if possible
-                    if m.get('role') == 'assistant':
-                        try:
-                            parsed = medical_generator._parse_response(content)
-                            # include disclaimer separately
-                            parsed['disclaimer'] = medical_generator._get_disclaimer(language)
-                            content_obj = parsed
-                        except Exception:
-                            content_obj = content
-                        translated_messages.append({
-                            'role': m.get('role'),
-                            'content': content_obj,
-                            'timestamp': m.get('timestamp')
-                        })
-                    else:
-                        translated_messages.append({
-                            'role': m.get('role'),
-                            'content': content,
-                            'timestamp': m.get('timestamp')
-                        })
-                response['translated_messages'] = translated_messages
-
-        except Exception as e:
-            # If translation fails, warn but do not change conversation state
-            response['translation_warning'] = 'Translation failed; original messages preserved.'
+        # Translate existing messages in the background; clients poll the job for the result
+        if medical_generator and conv and conv.get('messages'):
+            job = get_translation_jobs().submit(conversation_id, request.user['email'], language, previous_language)
+            response['translation_job'] = {'id': job['id'], 'status': job['status']}
         
         # If age is also set, conversation is ready
         if conv['state'] == ConversationState.READY:
@@ -375,65 +576,128 @@ def set_language(conversation_id):
         }), 500
 
 
-@app.route('/api/conversation/<conversation_id>/chat', methods=['POST'])
-@require_auth
-def chat(conversation_id):
-    """Handle chat messages"""
-    try:
-        data = request.json
-        message = data.get('message', '').strip()
-        
-        if not message:
-            return jsonify({
+def _check_chat(conversation_id):
+    """Validate a chat request without changing anything
+
+    Returns (message, conv, None) when the turn can be processed,
+    or (None, None, error_response) otherwise.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Message is required'
+        }), 400)
+
+    message = data.get('message', '').strip()
+    
+    if not message:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Message is required'
+        }), 400)
+    
+    conv = conversation_manager.get_conversation(conversation_id)
+    
+    if not conv:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Conversation not found'
+        }), 404)
+    
+    # Check if age and language are set
+    can_process, error_msg = conversation_manager.can_process_symptoms(conversation_id)
+    
+    if not can_process:
+        # Handle initial setup messages
+        if conv['state'] == ConversationState.INITIAL or conv['state'] == ConversationState.AWAITING_AGE:
+            return None, None, (jsonify({
                 'success': False,
-                'error': 'Message is required'
-            }), 400
+                'error': 'Please select your age group first',
+                'requires_age': True,
+                'age_groups': config.Config.AGE_GROUPS
+            }), 400)
         
-        conv = conversation_manager.get_conversation(conversation_id)
-        
-        if not conv:
-            return jsonify({
+        if conv['state'] == ConversationState.AWAITING_LANGUAGE:
+            return None, None, (jsonify({
                 'success': False,
-                'error': 'Conversation not found'
-            }), 404
-        
-        # Check if age and language are set
-        can_process, error_msg = conversation_manager.can_process_symptoms(conversation_id)
-        
-        if not can_process:
-            # Handle initial setup messages
-            if conv['state'] == ConversationState.INITIAL or conv['state'] == ConversationState.AWAITING_AGE:
-                return jsonify({
-                    'success': False,
-                    'error': 'Please select your age group first',
-                    'requires_age': True,
-                    'age_groups': config.Config.AGE_GROUPS
-                }), 400
-            
-            if conv['state'] == ConversationState.AWAITING_LANGUAGE:
-                return jsonify({
-                    'success': False,
-                    'error': 'Please select your preferred language',
-                    'requires_language': True,
-                    'languages': list(config.Config.SUPPORTED_LANGUAGES.keys())
-                }), 400
-        
+                'error': 'Please select your preferred language',
+                'requires_language': True,
+                'languages': list(config.Config.SUPPORTED_LANGUAGES.keys())
+            }), 400)
+    
+    if not medical_generator:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Medical response generator is not available. Please check LLM configuration.'
+        }), 500)
+    
+    return message, conv, None
+
+
+def _chat_request_error(conversation_id):
+    """Error response for a chat request that cannot be served, checked before scheduling"""
+    return _check_chat(conversation_id)[2]
+
+
+def _prepare_chat(conversation_id):
+    """Validate a chat request and record the user message
+
+    Returns (message, conv, None) when the turn can be processed,
+    or (None, None, error_response) otherwise.
+    """
+    message, conv, error_response = _check_chat(conversation_id)
+    if not error_response:
         # Add user message to history
         conversation_manager.add_message(conversation_id, 'user', message)
+    return message, conv, error_response
+
+
+def _prompt_context(conversation_id):
+    """Return (history, summary) to build the next prompt from"""
+    if conversation_summarizer:
+        summary, history = conversation_manager.get_summary_context(conversation_id)
+        return history, summary
+    return conversation_manager.get_conversation_history(conversation_id), None
+
+
+def _add_assistant_message(conversation_id, structured_response):
+    """Record the assistant turn and refresh the running summary in the background
+
+    History keeps the flattened text for prompts; the structured response
+    is stored alongside it so saved conversations render the same sections.
+    """
+    conversation_manager.add_message(
+        conversation_id, 'assistant', _format_assistant_message(structured_response),
+        extra={'response': structured_response}
+    )
+    if conversation_summarizer:
+        conversation_summarizer.schedule(conversation_id)
+
+
+def _format_assistant_message(structured_response):
+    """Flatten a structured response into the text stored in conversation history"""
+    return f"Summary: {structured_response['summary']}\n\nHome Care: {structured_response['home_care']}\n\nMedical Attention: {structured_response['medical_attention']}\n\nPossible Causes: {structured_response['possible_causes']}"
+
+
+@app.route('/api/conversation/<conversation_id>/chat', methods=['POST'])
+@require_auth
+@admit(chat_admission)
+@schedule_llm(_chat_request_error)
+def chat(conversation_id):
+    """Handle chat messages"""
+    try:
+        message, conv, error_response = _prepare_chat(conversation_id)
+        if error_response:
+            return error_response
         
-        # Generate medical response
-        if not medical_generator:
-            return jsonify({
-                'success': False,
-                'error': 'Medical response generator is not available. Please check LLM configuration.'
-            }), 500
-        
-        history = conversation_manager.get_conversation_history(conversation_id)
+        history, summary = _prompt_context(conversation_id)
         result = medical_generator.generate_medical_response(
             symptoms=message,
             age=conv['age'],
             language=conv['language'],
-            conversation_history=history
+            conversation_history=history,
+            conversation_summary=summary
         )
         
         if not result['success']:
@@ -443,8 +707,7 @@ def chat(conversation_id):
             }), 500
         
         # Add assistant response to history
-        assistant_message = f"Summary: {result['response']['summary']}\n\nHome Care: {result['response']['home_care']}\n\nMedical Attention: {result['response']['medical_attention']}\n\nPossible Causes: {result['response']['possible_causes']}"
-        conversation_manager.add_message(conversation_id, 'assistant', assistant_message)
+        _add_assistant_message(conversation_id, result['response'])
         
         return jsonify({
             'success': True,
@@ -459,6 +722,118 @@ def chat(conversation_id):
         }), 500
 
 
+@app.route('/api/conversation/<conversation_id>/chat/stream', methods=['POST'])
+@require_auth
+@admit(chat_admission)
+@schedule_llm(_chat_request_error)
+def chat_stream(conversation_id):
+    """Handle chat messages, streaming the response as Server-Sent Events
+
+    Emits 'section' and 'delta' events while the LLM is generating, then a
+    final 'done' event carrying the same payload as the /chat endpoint.
+    """
+    try:
+        message, conv, error_response = _prepare_chat(conversation_id)
+        if error_response:
+            return error_response
+        
+        history, summary = _prompt_context(conversation_id)
+        events = medical_generator.stream_medical_response(
+            symptoms=message,
+            age=conv['age'],
+            language=conv['language'],
+            conversation_history=history,
+            conversation_summary=summary
+        )
+        
+        def generate():
+            try:
+                for event in events:
+                    name = event.pop('event')
+                    if name == 'done':
+                        # Add assistant response to history
+                        _add_assistant_message(conversation_id, event['response'])
+                        event = {
+                            'success': True,
+                            'response': event['response'],
+                            'conversation_id': conversation_id
+                        }
+                    elif name == 'error':
+                        event = {'success': False, 'error': event['error']}
+                    yield f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            finally:
+                # after_request runs before a streamed body, so save the turn here
+                conversation_manager.flush(conversation_id)
+        
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _format_translated_messages(messages, language):
+    """Translated job messages as returned to clients; assistant replies are structured where possible"""
+    formatted = []
+    for m in messages:
+        content = m['content']
+        if m.get('role') == 'assistant' and medical_generator:
+            try:
+                parsed = medical_generator._parse_response(content)
+                # include disclaimer separately
+                parsed['disclaimer'] = medical_generator._get_disclaimer(language)
+                content = parsed
+            except Exception:
+                pass
+        formatted.append({
+            'role': m.get('role'),
+            'content': content,
+            'timestamp': m.get('timestamp')
+        })
+    return formatted
+
+
+@app.route('/api/translation-jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_translation_job(job_id):
+    """Get the status of a language-switch translation job, with the messages once completed"""
+    try:
+        job = get_translation_jobs().get(job_id)
+        if not job or job['owner'] != request.user['email']:
+            return jsonify({
+                'success': False,
+                'error': 'Translation job not found'
+            }), 404
+        
+        response = {
+            'success': True,
+            'job_id': job['id'],
+            'conversation_id': job['conversation_id'],
+            'language': job['language'],
+            'status': job['status'],
+            'partial': job['partial'],
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at']
+        }
+        if job['error']:
+            response['translation_warning'] = job['error']
+        if job['messages'] is not None:
+            response['translated_messages'] = _format_translated_messages(job['messages'], job['language'])
+        
+        return jsonify(response), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/conversation/<conversation_id>/status', methods=['GET'])
 @require_auth
 def get_status(conversation_id):
@@ -514,12 +889,18 @@ def get_llm_providers():
         available = LLMProviderFactory.list_available_providers()
         current = config.Config.LLM_PROVIDER
         
-        return jsonify({
+        response = {
             'success': True,
             'current_provider': current,
             'available_providers': available,
             'all_providers': list(LLMProviderFactory._providers.keys())
-        }), 200
+        }
+        
+        # Include routing health and batching counters for the active provider
+        if LLMProviderFactory._instance:
+            response.update(LLMProviderFactory._instance.stats())
+        
+        return jsonify(response), 200
     
     except Exception as e:
         return jsonify({
@@ -528,6 +909,36 @@ def get_llm_providers():
         }), 500
 
 
+@app.route('/api/config/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Get response cache and translation memory hit/miss counters"""
+    return jsonify({
+        'success': True,
+        'enabled': config.Config.RESPONSE_CACHE_ENABLED,
+        'response_cache': response_cache.stats(),
+        'translation_memory': translation_memory.stats()
+    }), 200
+
+
+@app.route('/api/config/admission-stats', methods=['GET'])
+def get_admission_stats():
+    """Get auth rate limiter and route group concurrency counters"""
+    return jsonify({
+        'success': True,
+        'rate_limits': {
+            'enabled': config.Config.AUTH_RATE_LIMIT_ENABLED,
+            'ip': auth_ip_limiter.stats(),
+            'email': auth_email_limiter.stats()
+        },
+        'concurrency': {
+            'auth': auth_admission.stats(),
+            'chat': chat_admission.stats()
+        },
+        'llm_scheduler': llm_scheduler.stats(),
+        'translation_jobs': translation_jobs.stats() if translation_jobs else None
+    }), 200
+
+
 @app.route('/api/config/switch-provider', methods=['POST'])
 def switch_provider():
     """Switch LLM provider (admin function)"""
@@ -0,0 +1,342 @@
+"""
+ASGI entry point - Serves the app.py REST API from an event loop
+POST /api/conversation/<id>/chat and /chat/stream run natively async, awaiting
+the LLM without holding a thread; every other route is the Flask app itself,
+run on a bounded thread pool for short blocking work only (the language switch
+queues its translation as a background job). Run with any ASGI server, e.g.
+`uvicorn asgi:app`.
+"""
+import asyncio
+import io
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Response, jsonify, make_response, request
+import app as flask_module
+from app import (
+    app as flask_app, require_auth, chat_admission, llm_scheduler,
+    conversation_manager, _chat_request_error, _prepare_chat, _prompt_context, _add_assistant_message,
+    _busy_response
+)
+from llm_scheduler import SchedulerBusy
+import config
+
+CHAT_PATH = re.compile(r'^/api/conversation/([^/]+)/chat$')
+CHAT_STREAM_PATH = re.compile(r'^/api/conversation/([^/]+)/chat/stream$')
+
+# Threads running Flask views; the only threads requests use in this mode
+_wsgi_pool = ThreadPoolExecutor(max_workers=config.Config.ASGI_WSGI_THREADS, thread_name_prefix='asgi-wsgi')
+
+# require_auth applied to a no-op: returns the 401 response, or None with request.user set
+_authenticate = require_auth(lambda: None)
+
+_END = object()
+
+
+def _environ(scope, body: bytes) -> dict:
+    """Build a WSGI environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in scope.get('headers', []):
+        name, value = name.decode('latin-1'), value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'content-length':
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionResetError("Client disconnected")
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def _send_start(send, status: int, headers):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+    })
+
+
+async def _call_wsgi(environ: dict, send):
+    """Run the Flask app on the thread pool, relaying its (possibly streamed) body chunk by chunk"""
+    loop = asyncio.get_running_loop()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    iterable = await loop.run_in_executor(_wsgi_pool, flask_app, environ, start_response)
+    chunks = iter(iterable)
+    try:
+        chunk = await loop.run_in_executor(_wsgi_pool, next, chunks, _END)
+        await _send_start(send, started['status'], started['headers'])
+        while chunk is not _END:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            chunk = await loop.run_in_executor(_wsgi_pool, next, chunks, _END)
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        # Closing runs call_on_close callbacks, e.g. releasing admission slots after a stream
+        if hasattr(iterable, 'close'):
+            await loop.run_in_executor(_wsgi_pool, iterable.close)
+
+
+def _in_request(scope, body: bytes):
+    """in_request(fn): run fn on the thread pool inside a Flask request context for this request"""
+    loop = asyncio.get_running_loop()
+
+    def in_request(fn):
+        def run():
+            with flask_app.request_context(_environ(scope, body)):
+                return fn()
+        return loop.run_in_executor(_wsgi_pool, run)
+    return in_request
+
+
+def _admit(conversation_id: str):
+    """Authenticate and validate a chat request, then take a chat admission slot
+
+    Returns (email, None) once admitted, or (None, error response).
+    Unlike the chat views, whose admit decorator runs before
+    schedule_llm's validation, a malformed request is rejected here
+    before it can hold an admission slot.
+    """
+    denied = _authenticate()
+    if denied:
+        return None, make_response(denied)
+    error_response = _chat_request_error(conversation_id)
+    if error_response:
+        return None, make_response(error_response)
+    if not chat_admission.try_acquire():
+        return None, make_response(_busy_response('Server busy. Please try again shortly.', 1))
+    return request.user['email'], None
+
+
+def _prepare(conversation_id: str):
+    """Record the user message; returns the generator arguments, or an error response"""
+    message, conv, error_response = _prepare_chat(conversation_id)
+    if error_response:
+        return None, make_response(error_response)
+    history, summary = _prompt_context(conversation_id)
+    return {
+        'symptoms': message,
+        'age': conv['age'],
+        'language': conv['language'],
+        'conversation_history': history,
+        'conversation_summary': summary
+    }, None
+
+
+async def _chat(scope, body: bytes, conversation_id: str):
+    """Async twin of app.chat: the same checks and response, with the LLM call awaited
+
+    Everything touching sessions, the auth store or conversations runs on
+    the thread pool, so the event loop only ever waits.
+    """
+    in_request = _in_request(scope, body)
+    email, response = await in_request(lambda: _admit(conversation_id))
+    if response is not None:
+        return response
+
+    try:
+        try:
+            await llm_scheduler.aacquire(email)
+        except SchedulerBusy as e:
+            with flask_app.app_context():
+                return make_response(_busy_response('The assistant is busy. Please try again shortly.', e.retry_after))
+
+        start = time.monotonic()
+        try:
+            prepared, response = await in_request(lambda: _prepare(conversation_id))
+            if response is not None:
+                return response
+
+            result = await flask_module.medical_generator.agenerate_medical_response(**prepared)
+
+            def respond():
+                if not result['success']:
+                    return make_response(jsonify({
+                        'success': False,
+                        'error': result.get('error', 'Failed to generate response')
+                    }), 500)
+
+                # Add assistant response to history
+                _add_assistant_message(conversation_id, result['response'])
+
+                return make_response(jsonify({
+                    'success': True,
+                    'response': result['response'],
+                    'conversation_id': conversation_id
+                }), 200)
+
+            return await in_request(respond)
+        except Exception as e:
+            with flask_app.app_context():
+                return make_response(jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 500)
+        finally:
+            llm_scheduler.release(time.monotonic() - start)
+    finally:
+        chat_admission.release()
+
+
+async def _chat_stream(scope, body: bytes, conversation_id: str, receive, send):
+    """Async twin of app.chat_stream: Server-Sent Events relayed from the provider's async stream
+
+    Generation stops, and the turn is left unanswered, if the client
+    disconnects mid-stream.
+    """
+    loop = asyncio.get_running_loop()
+    in_request = _in_request(scope, body)
+    email, response = await in_request(lambda: _admit(conversation_id))
+    if response is not None:
+        await _finish(scope, body, response, send)
+        return
+
+    try:
+        try:
+            await llm_scheduler.aacquire(email)
+        except SchedulerBusy as e:
+            with flask_app.app_context():
+                response = make_response(_busy_response('The assistant is busy. Please try again shortly.', e.retry_after))
+            await _finish(scope, body, response, send)
+            return
+
+        start = time.monotonic()
+        try:
+            prepared, response = await in_request(lambda: _prepare(conversation_id))
+            if response is not None:
+                await _finish(scope, body, response, send)
+                return
+
+            with flask_app.app_context():
+                response = Response(mimetype='text/event-stream', headers={
+                    'Cache-Control': 'no-cache',
+                    'X-Accel-Buffering': 'no'
+                })
+            await _finish(scope, body, response, send, more_body=True)
+
+            async def relay():
+                async for event in flask_module.medical_generator.astream_medical_response(**prepared):
+                    name = event.pop('event')
+                    if name == 'done':
+                        # Add assistant response to history
+                        await loop.run_in_executor(_wsgi_pool, _add_assistant_message, conversation_id, event['response'])
+                        event = {
+                            'success': True,
+                            'response': event['response'],
+                            'conversation_id': conversation_id
+                        }
+                    elif name == 'error':
+                        event = {'success': False, 'error': event['error']}
+                    chunk = f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                    await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+            await _until_disconnect(relay(), receive)
+        finally:
+            llm_scheduler.release(time.monotonic() - start)
+            await loop.run_in_executor(_wsgi_pool, conversation_manager.flush, conversation_id)
+    finally:
+        chat_admission.release()
+
+
+async def _until_disconnect(coroutine, receive):
+    """Run coroutine, cancelling it if the client disconnects first"""
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    task = asyncio.ensure_future(coroutine)
+    watcher = asyncio.ensure_future(disconnected())
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if not task.done():
+        task.cancel()  # The client went away; stop generating
+        await asyncio.wait({task})
+    if not task.cancelled():
+        task.result()
+
+
+async def _finish(scope, body: bytes, response, send, more_body: bool = False):
+    """Run after_request hooks (CORS headers, conversation flush) off the loop, then send
+
+    With more_body, only the headers are sent and the caller streams the body.
+    """
+    def process():
+        with flask_app.request_context(_environ(scope, body)):
+            return flask_app.process_response(response)
+
+    response = await asyncio.get_running_loop().run_in_executor(_wsgi_pool, process)
+    await _send_start(send, response.status_code, response.headers.to_wsgi_list())
+    if not more_body:
+        await send({'type': 'http.response.body', 'body': response.get_data(), 'more_body': False})
+
+
+async def app(scope, receive, send):
+    """The ASGI application"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                _wsgi_pool.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        return
+
+    try:
+        body = await _read_body(receive)
+    except ConnectionResetError:
+        return  # The client went away before sending its whole request; nobody to answer
+
+    native = scope['method'] == 'POST' and flask_module.medical_generator
+    match = CHAT_PATH.match(scope['path'])
+    stream_match = CHAT_STREAM_PATH.match(scope['path'])
+    if native and match:
+        response = await _chat(scope, body, match.group(1))
+        await _finish(scope, body, response, send)
+    elif native and stream_match:
+        await _chat_stream(scope, body, stream_match.group(1), receive, send)
+    else:
+        await _call_wsgi(_environ(scope, body), send)
@@ -2,13 +2,22 @@
 In-Memory Authentication and Data Store with File Persistence
 Session-based storage for user authentication and conversation history with file persistence
 """
-import hashlib
 import secrets
 import json
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from operator import attrgetter
 from typing import Dict, List, Optional
+from abc import ABC, abstractmethod
 from dataclasses import dataclass, asdict
+from conversation_index import ConversationIndex, decode_cursor, encode_cursor
+from keyed_lock import KeyedLock
+from message_store import Message, message_store, to_dicts
+from password_hasher import create_password_hasher
+from session_store import UserView, create_session_store
+import config
 
 @dataclass
 class User:
@@ -19,11 +28,15 @@ class User:
     email: str
     password_hash: str
     created_at: str
-    conversations: List[Dict] = None
+    conversations: ConversationIndex = None  # refs keyed by id, ordered by updated_at
 
     def __post_init__(self):
-        if self.conversations is None:
-            self.conversations = []
+        if not isinstance(self.conversations, ConversationIndex):
+            self.conversations = ConversationIndex(self.conversations or ())
+
+    def to_dict(self) -> Dict:
+        """Plain dict for persistence (asdict would deep-copy the index and its lock)"""
+        return dict(vars(self), conversations=self.conversations.to_list())
 
 @dataclass
 class Conversation:
@@ -36,73 +49,175 @@ class Conversation:
     language: str
     created_at: str
     updated_at: str
+    message_count: int = 0  # kept with the metadata so listings never load messages
+
+def _message_fingerprint(message: Message) -> int:
+    """Cheap in-process fingerprint used to diff message lists between persists"""
+    content, extra = message.content, message.extra
+    if not isinstance(content, str):
+        # Structured content (e.g. the frontend's parsed assistant replies) is not hashable
+        content = ('json', json.dumps(content, sort_keys=True, default=str))
+    if extra:
+        extra = ('json', json.dumps(extra, sort_keys=True, default=str))
+    return hash((message.role, content, message.timestamp, extra))
+
+_MESSAGE_KEY = attrgetter('role', 'content', 'timestamp', 'extra')
+
+def _message_fingerprints(messages: List[Message]) -> List[int]:
+    """Fingerprints of a whole message list
+
+    Text-only lists are hashed by map() without a Python call per message
+    (equal to _message_fingerprint for text without extra fields); this runs on every
+    persist of a growing conversation, so it is the bulk of a write's cost.
+    """
+    try:
+        return list(map(hash, map(_MESSAGE_KEY, messages)))
+    except TypeError:
+        # Structured content is unhashable; fingerprint message by message
+        return [_message_fingerprint(m) for m in messages]
+
+# Fields the server owns on live records; everything else a client sends is merged in
+_SERVER_FIELDS = ('role', 'content', 'timestamp', 'response')
+
+def _merge_client_fields(live: List[Message], incoming: List) -> None:
+    """Copy client-only fields from a client's copy of a conversation onto the live messages
+
+    Client messages are matched to live ones in order by role (user
+    messages also by text), skipping messages only the client shows,
+    such as its own prompts to pick an age group.
+    """
+    j = 0
+    for message in list(live):
+        while j < len(incoming):
+            candidate = incoming[j]
+            j += 1
+            if not isinstance(candidate, dict) or candidate.get('role') != message.role:
+                continue
+            if message.role == 'user' and candidate.get('content') != message.content:
+                continue
+            for key, value in candidate.items():
+                if key not in _SERVER_FIELDS and message.get(key) != value:
+                    message[key] = value
+            break
+        else:
+            return
+
+class AuthStore(ABC):
+    """Abstract base class for authentication and conversation storage backends
+
+    Password hashing and session handling live here; subclasses only
+    implement user lookup/insert and the conversation storage methods.
+    """
+
+    def __init__(self):
+        self.hasher = create_password_hasher()
+        self.sessions = create_session_store()
+        self._user_views: Dict[str, UserView] = {}  # email -> shared read-only user info
+
+    @abstractmethod
+    def _get_user(self, email: str) -> Optional[User]:
+        """Look up a user by email"""
+        pass
+
+    @abstractmethod
+    def _add_user(self, user: User) -> bool:
+        """Persist a new user, returning False if the email is already taken"""
+        pass
+
+    @abstractmethod
+    def _set_password_hash(self, email: str, password_hash: str) -> bool:
+        """Replace a user's stored password hash"""
+        pass
+
+    @abstractmethod
+    def save_conversation(self, user_email: str, conversation_data: Dict) -> bool:
+        """Save conversation for user"""
+        pass
 
-class InMemoryAuthStore:
-    """In-Memory authentication and data store with file persistence"""
+    @abstractmethod
+    def get_user_conversations(self, user_email: str) -> List[Dict]:
+        """Get all conversations for a user, most recently updated first"""
+        pass
 
-    def __init__(self, data_file="auth_data.json"):
-        self.data_file = data_file
-        self.users: Dict[str, User] = {}  # email -> User
-        self.conversations: Dict[str, Conversation] = {}  # conversation_id -> Conversation
-        self.active_sessions: Dict[str, str] = {}  # session_token -> email
-        self._load_data()
+    @abstractmethod
+    def list_conversation_summaries(self, user_email: str, limit: int, cursor: str = None) -> Dict:
+        """Get one page of a user's conversation summaries, most recently updated first
 
-    def _load_data(self):
-        """Load data from file if it exists"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
+        Returns {'conversations': [...], 'next_cursor': str or None}; raises
+        ValueError for a malformed cursor.
+        """
+        pass
 
-                # Load users
-                for email, user_data in data.get('users', {}).items():
-                    user = User(**user_data)
-                    self.users[email] = user
-
-                # Load conversations
-                for conv_id, conv_data in data.get('conversations', {}).items():
-                    conversation = Conversation(**conv_data)
-                    self.conversations[conv_id] = conversation
+    @abstractmethod
+    def get_conversation(self, conversation_id: str, user_email: str) -> Optional[Dict]:
+        """Get specific conversation for user"""
+        pass
 
-            except Exception as e:
-                print(f"Warning: Could not load data from {self.data_file}: {e}")
+    @abstractmethod
+    def get_conversation_messages(self, conversation_id: str, user_email: str, offset: int, limit: int) -> Optional[Dict]:
+        """Get one page of a conversation's messages, oldest first"""
+        pass
 
-    def _save_data(self):
-        """Save data to file"""
-        try:
-            data = {
-                'users': {email: asdict(user) for email, user in self.users.items()},
-                'conversations': {conv_id: asdict(conv) for conv_id, conv in self.conversations.items()}
-            }
+    @abstractmethod
+    def update_conversation_messages(self, conversation_id: str, messages: List[Dict], user_email: str) -> bool:
+        """Update messages in a conversation"""
+        pass
 
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Warning: Could not save data to {self.data_file}: {e}")
+    @abstractmethod
+    def clear_all_data(self):
+        """Clear all data (for testing/reset)"""
+        pass
 
     def hash_password(self, password: str) -> str:
-        """Hash password using SHA-256 with salt"""
-        salt = secrets.token_hex(16)
-        password_hash = hashlib.sha256(f"{salt}{password}".encode()).hexdigest()
-        return f"{salt}:{password_hash}"
+        """Hash password with the configured KDF (runs on the hasher's worker pool)"""
+        return self.hasher.hash(password)
 
     def verify_password(self, password: str, stored_hash: str) -> bool:
-        """Verify password against stored hash"""
-        try:
-            salt, hash_value = stored_hash.split(':')
-            computed_hash = hashlib.sha256(f"{salt}{password}".encode()).hexdigest()
-            return computed_hash == hash_value
-        except:
-            return False
-
-    def generate_session_token(self) -> str:
-        """Generate a secure session token"""
-        return secrets.token_urlsafe(32)
+        """Verify password against stored hash (KDF or legacy salt:sha256)"""
+        return self.hasher.verify(password, stored_hash)
+
+    @staticmethod
+    def _incoming_messages(conversation_id: str, messages: List) -> List:
+        """Messages a client save should store for a conversation
+
+        A conversation open in the ConversationManager (pinned) is server
+        managed: its live message list is the authoritative copy, so a
+        client-sent copy never replaces its messages. Fields only the
+        client knows (e.g. the frontend's 'mode') are merged into the
+        matching live records instead.
+        """
+        if message_store.is_pinned(conversation_id):
+            live = message_store.peek(conversation_id)
+            if live is not None:
+                _merge_client_fields(live, messages)
+                return live
+        return messages
+
+    def _user_view(self, user: User) -> UserView:
+        """Get the cached read-only view of a user"""
+        view = self._user_views.get(user.email)
+        if view is None:
+            view = UserView(
+                id=user.id,
+                full_name=user.full_name,
+                email=user.email,
+                date_of_birth=user.date_of_birth
+            )
+            self._user_views[user.email] = view
+        return view
+
+    def _start_session(self, user: User) -> Dict:
+        """Create a session for user and build the login/registration response"""
+        return {
+            "success": True,
+            "user": dict(self._user_view(user)),
+            "session_token": self.sessions.create(user.email)
+        }
 
     def register_user(self, full_name: str, date_of_birth: str, email: str, password: str) -> Dict:
         """Register a new user"""
         # Check if user already exists
-        if email in self.users:
+        if self._get_user(email):
             return {"success": False, "error": "User already exists with this email"}
 
         # Create new user
@@ -118,71 +233,474 @@ class InMemoryAuthStore:
             created_at=datetime.now().isoformat()
         )
 
-        self.users[email] = user
-        self._save_data()
-
-        # Generate session token
-        session_token = self.generate_session_token()
-        self.active_sessions[session_token] = email
+        if not self._add_user(user):
+            return {"success": False, "error": "User already exists with this email"}
 
-        return {
-            "success": True,
-            "user": {
-                "id": user.id,
-                "full_name": user.full_name,
-                "email": user.email,
-                "date_of_birth": user.date_of_birth
-            },
-            "session_token": session_token
-        }
+        return self._start_session(user)
 
     def authenticate_user(self, email: str, password: str) -> Dict:
         """Authenticate existing user"""
-        user = self.users.get(email)
+        user = self._get_user(email)
         if not user:
             return {"success": False, "error": "User not found or invalid credentials"}
 
         if not self.verify_password(password, user.password_hash):
             return {"success": False, "error": "User not found or invalid credentials"}
 
-        # Generate session token
-        session_token = self.generate_session_token()
-        self.active_sessions[session_token] = email
+        # Upgrade legacy or outdated-cost hashes while the plain password is at hand
+        if self.hasher.needs_rehash(user.password_hash):
+            if not self._set_password_hash(email, self.hash_password(password)):
+                print(f"Warning: Could not rehash password for {email}")
 
-        return {
-            "success": True,
-            "user": {
-                "id": user.id,
-                "full_name": user.full_name,
-                "email": user.email,
-                "date_of_birth": user.date_of_birth
-            },
-            "session_token": session_token
-        }
+        return self._start_session(user)
 
-    def validate_session(self, session_token: str) -> Optional[Dict]:
-        """Validate session token and return user info"""
-        email = self.active_sessions.get(session_token)
+    def validate_session(self, session_token: str) -> Optional[UserView]:
+        """Validate session token and return the shared read-only user info"""
+        email = self.sessions.get(session_token)
         if not email:
             return None
 
-        user = self.users.get(email)
+        view = self._user_views.get(email)
+        if view is not None:
+            return view
+
+        user = self._get_user(email)
         if not user:
             return None
+        return self._user_view(user)
 
+    def logout_user(self, session_token: str) -> bool:
+        """Logout user by removing session"""
+        return self.sessions.revoke(session_token)
+
+    def logout_all_sessions(self, email: str) -> bool:
+        """End every session of a user"""
+        return self.sessions.revoke_user(email)
+
+    @staticmethod
+    def _conversation_to_dict(conversation: Conversation, messages: List = None) -> Dict:
+        """Serialize a conversation for API responses"""
         return {
-            "id": user.id,
-            "full_name": user.full_name,
-            "email": user.email,
-            "date_of_birth": user.date_of_birth
+            'id': conversation.id,
+            'title': conversation.title,
+            'messages': to_dicts(conversation.messages if messages is None else messages),
+            'age': conversation.age,
+            'language': conversation.language,
+            'created_at': conversation.created_at,
+            'updated_at': conversation.updated_at
         }
 
-    def logout_user(self, session_token: str) -> bool:
-        """Logout user by removing session"""
-        if session_token in self.active_sessions:
-            del self.active_sessions[session_token]
+    @staticmethod
+    def _conversation_summary(conversation: Conversation, message_count: int) -> Dict:
+        """Serialize a conversation for listings, without its messages"""
+        return {
+            'id': conversation.id,
+            'title': conversation.title,
+            'updated_at': conversation.updated_at,
+            'message_count': message_count
+        }
+
+    @staticmethod
+    def _messages_page(conversation_id: str, messages: List, offset: int, total: int) -> Dict:
+        """Build a messages page response; next_offset is None on the last page"""
+        end = offset + len(messages)
+        return {
+            'id': conversation_id,
+            'messages': to_dicts(messages),
+            'offset': offset,
+            'total': total,
+            'next_offset': end if end < total else None
+        }
+
+class InMemoryAuthStore(AuthStore):
+    """In-Memory authentication and data store with file persistence
+
+    The snapshot is split in two: ``data_file`` holds users and conversation
+    metadata, and a bodies file holds one JSON line of messages per
+    conversation, located by byte offset. Only metadata is read at startup;
+    a conversation's messages are loaded on first access and at most
+    ``resident_limit`` bodies stay in memory, least recently used first out.
+
+    In 'journal' mode every mutation appends one compact record to
+    ``<data_file>.journal`` and the full snapshot is only rewritten on
+    compaction. The journal offsets of each conversation's records are
+    indexed, so a paged-out body is rebuilt from its snapshot line plus its
+    own records. In 'snapshot' mode every mutation rewrites the snapshot.
+
+    Conversations are guarded by per-conversation locks; file writes are
+    serialized by a single I/O lock that is always taken last, after any
+    conversation lock, so the two can never deadlock.
+    """
+
+    def __init__(self, data_file: str = None, persistence_mode: str = None, compact_every: int = None,
+                 resident_limit: int = None):
+        self.data_file = data_file or config.Config.AUTH_DATA_FILE
+        self.journal_file = f"{self.data_file}.journal"
+        self.persistence_mode = persistence_mode or config.Config.AUTH_PERSISTENCE_MODE
+        self.compact_every = compact_every or config.Config.AUTH_JOURNAL_COMPACT_EVERY
+        self.resident_limit = resident_limit or config.Config.AUTH_RESIDENT_CONVERSATIONS
+        super().__init__()
+        self.users: Dict[str, User] = {}  # email -> User
+        self.conversations: Dict[str, Conversation] = {}  # conversation_id -> Conversation (messages None while paged out)
+        self._persisted_fingerprints: Dict[str, List[int]] = {}  # conversation_id -> message fingerprints on disk
+        self._bodies_file: Optional[str] = None  # current bodies file, relative to data_file's directory
+        self._bodies_generation = 0
+        self._body_offsets: Dict[str, int] = {}  # conversation_id -> line offset in the bodies file
+        self._journal_offsets: Dict[str, List[int]] = {}  # conversation_id -> offsets of its journal records
+        self._resident: "OrderedDict[str, None]" = OrderedDict()  # loaded bodies, least recently used first
+        self._resident_lock = threading.Lock()
+        self._journal_records = 0
+        self._journal = None  # binary append handle, kept open between records
+        self._conversation_locks = KeyedLock()
+        self._users_lock = threading.RLock()
+        self._io_lock = threading.RLock()
+        self._load_data()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(os.path.dirname(self.data_file), name)
+
+    def _load_data(self):
+        """Load snapshot metadata if it exists, then replay the journal on top of it"""
+        legacy_bodies = False
+        if os.path.exists(self.data_file):
+            try:
+                with open(self.data_file, 'r') as f:
+                    data = json.load(f)
+
+                # Load users
+                for email, user_data in data.get('users', {}).items():
+                    user = User(**user_data)
+                    self.users[email] = user
+
+                self._bodies_file = data.get('bodies_file')
+                self._bodies_generation = data.get('bodies_generation', 0)
+                self._body_offsets = data.get('body_offsets', {})
+
+                # Load conversation metadata; bodies stay on disk until first access
+                for conv_id, conv_data in data.get('conversations', {}).items():
+                    messages = conv_data.pop('messages', None)
+                    conversation = Conversation(messages=None, **conv_data)
+                    self.conversations[conv_id] = conversation
+                    if messages is not None:
+                        # Snapshot from before bodies were split out
+                        legacy_bodies = True
+                        conversation.messages = message_store.replace(conv_id, messages)
+                        conversation.message_count = len(messages)
+                        self._resident[conv_id] = None
+
+            except Exception as e:
+                print(f"Warning: Could not load data from {self.data_file}: {e}")
+
+        self._replay_journal()
+
+        # Refresh the users' refs from the conversations themselves, which
+        # carry the latest title and updated_at
+        users_by_id = {user.id: user for user in self.users.values()}
+        for conversation in self.conversations.values():
+            user = users_by_id.get(conversation.user_id)
+            if user:
+                self._link_conversation(user, conversation)
+
+        for conv_id in self._resident:
+            messages = self.conversations[conv_id].messages
+            self._persisted_fingerprints[conv_id] = _message_fingerprints(messages)
+
+        # Rewrite legacy snapshots in the split format, and fold a leftover
+        # journal into the snapshot when journaling is disabled
+        if legacy_bodies or (self.persistence_mode != 'journal' and self._journal_records):
+            self._compact()
+
+    def _replay_journal(self):
+        """Index journal records written since the last compaction"""
+        if not os.path.exists(self.journal_file):
+            return
+
+        try:
+            with open(self.journal_file, 'rb') as f:
+                offset = 0
+                for line in f:
+                    line_offset, offset = offset, offset + len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted append; everything before it is intact
+                        print(f"Warning: Ignoring corrupt journal record in {self.journal_file}")
+                        break
+                    self._apply_record(record, line_offset)
+                    self._journal_records += 1
+        except Exception as e:
+            print(f"Warning: Could not replay journal {self.journal_file}: {e}")
+
+    def _apply_record(self, record: Dict, offset: int):
+        """Apply a journal record's metadata and index it for the conversation's body"""
+        op = record.get('op')
+
+        if op == 'user':
+            user = User(**record['data'])
+            self.users[user.email] = user
+            return
+
+        if op == 'conversation':
+            data = dict(record['data'])
+            existing = self.conversations.get(data['id'])
+            conversation = Conversation(messages=existing.messages if existing else None, **data)
+            self.conversations[conversation.id] = conversation
+
+            user = self.users.get(record['email'])
+            if user:
+                self._link_conversation(user, conversation)
+
+        elif op == 'messages':
+            conversation = self.conversations.get(record['id'])
+            if not conversation:
+                return
+            conversation.updated_at = record['updated_at']
+
+        else:
+            return
+
+        conversation.message_count = record['start'] + len(record['messages'])
+        self._journal_offsets.setdefault(conversation.id, []).append(offset)
+        if conversation.messages is not None:
+            conversation.messages = message_store.replace(
+                conversation.id, conversation.messages[:record['start']] + record['messages']
+            )
+
+    def _read_body(self, conversation_id: str) -> List[Dict]:
+        """Rebuild a conversation's messages from its snapshot line and journal records"""
+        with self._io_lock:
+            messages = []
+            offset = self._body_offsets.get(conversation_id)
+            if offset is not None and self._bodies_file:
+                with open(self._path(self._bodies_file), 'rb') as f:
+                    f.seek(offset)
+                    messages = json.loads(f.readline())['messages']
+
+            offsets = self._journal_offsets.get(conversation_id)
+            if offsets:
+                if self._journal:
+                    self._journal.flush()
+                with open(self.journal_file, 'rb') as f:
+                    for offset in offsets:
+                        f.seek(offset)
+                        record = json.loads(f.readline())
+                        messages = messages[:record['start']] + record['messages']
+            return messages
+
+    def _body(self, conversation: Conversation) -> List[Message]:
+        """Get a conversation's messages, loading them from disk if paged out"""
+        messages = conversation.messages
+        if messages is None:
+            with self._conversation_locks.get(conversation.id):
+                messages = conversation.messages
+                if messages is None:
+                    messages = message_store.replace(conversation.id, self._read_body(conversation.id))
+                    self._persisted_fingerprints[conversation.id] = _message_fingerprints(messages)
+                    conversation.messages = messages
+        self._touch(conversation.id)
+        return messages
+
+    def _touch(self, conversation_id: str):
+        """Mark a body most recently used and page out the coldest ones over the limit
+
+        Bodies pinned by the conversation manager, locked by a request in
+        flight, or not yet on disk are skipped.
+        """
+        with self._resident_lock:
+            self._resident[conversation_id] = None
+            self._resident.move_to_end(conversation_id)
+            if len(self._resident) <= self.resident_limit:
+                return
+
+            excess = len(self._resident) - self.resident_limit
+            victims, skipped = [], []
+            for victim in self._resident:
+                if len(victims) >= excess or victim == conversation_id:
+                    break
+                if message_store.is_pinned(victim) or (
+                        victim not in self._body_offsets and victim not in self._journal_offsets):
+                    skipped.append(victim)  # Pinned, or no copy on disk yet (e.g. a failed save)
+                else:
+                    victims.append(victim)
+
+            # Skipped bodies go to the back so later scans do not walk over them again
+            for victim in skipped:
+                self._resident.move_to_end(victim)
+
+            for victim in victims:
+                lock = self._conversation_locks.get(victim)
+                if not lock.acquire(blocking=False):
+                    continue
+                try:
+                    conversation = self.conversations.get(victim)
+                    if conversation:
+                        conversation.messages = None
+                    message_store.discard(victim)
+                    self._persisted_fingerprints.pop(victim, None)
+                    del self._resident[victim]
+                finally:
+                    lock.release()
+
+    def _save_data(self):
+        """Save full snapshot: metadata to data_file and bodies to a new bodies file"""
+        try:
+            with self._users_lock:
+                users = {email: user.to_dict() for email, user in list(self.users.items())}
+
+            with self._io_lock:
+                generation = self._bodies_generation + 1
+                bodies_file = f"{os.path.basename(self.data_file)}.bodies.{generation}"
+                old_bodies = self._path(self._bodies_file) if self._bodies_file else None
+                if old_bodies and not os.path.exists(old_bodies):
+                    old_bodies = None
+
+                conversations = {}
+                offsets = {}
+                # Message lists are copied without taking conversation locks,
+                # because writers hold them while waiting for the I/O lock
+                with open(self._path(bodies_file), 'wb') as out:
+                    source = open(old_bodies, 'rb') if old_bodies else None
+                    try:
+                        for conv_id, conv in list(self.conversations.items()):
+                            conv_data = dict(vars(conv))
+                            messages = conv_data.pop('messages')
+                            conversations[conv_id] = conv_data
+
+                            if messages is not None:
+                                messages = list(messages)
+                                conv_data['message_count'] = len(messages)
+                                line = self._body_line(conv_id, to_dicts(messages))
+                            elif source and conv_id in self._body_offsets and conv_id not in self._journal_offsets:
+                                # Unchanged since the last snapshot: copy the line without parsing it
+                                source.seek(self._body_offsets[conv_id])
+                                line = source.readline()
+                            else:
+                                line = self._body_line(conv_id, self._read_body(conv_id))
+
+                            offsets[conv_id] = out.tell()
+                            out.write(line)
+                    finally:
+                        if source:
+                            source.close()
+
+                data = {
+                    'users': users,
+                    'conversations': conversations,
+                    'bodies_file': bodies_file,
+                    'bodies_generation': generation,
+                    'body_offsets': offsets
+                }
+
+                tmp_file = f"{self.data_file}.tmp"
+                with open(tmp_file, 'w') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp_file, self.data_file)
+
+                self._bodies_file = bodies_file
+                self._bodies_generation = generation
+                self._body_offsets = offsets
+                if old_bodies:
+                    os.remove(old_bodies)
             return True
-        return False
+        except Exception as e:
+            print(f"Warning: Could not save data to {self.data_file}: {e}")
+            return False
+
+    @staticmethod
+    def _body_line(conversation_id: str, messages: List[Dict]) -> bytes:
+        return (json.dumps({'id': conversation_id, 'messages': messages}, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def _compact(self):
+        """Rewrite the snapshot and truncate the journal"""
+        with self._io_lock:
+            if not self._save_data():
+                return
+
+            try:
+                if self._journal:
+                    self._journal.close()
+                    self._journal = None
+                with open(self.journal_file, 'wb'):
+                    pass
+                self._journal_records = 0
+                self._journal_offsets.clear()
+            except Exception as e:
+                print(f"Warning: Could not truncate journal {self.journal_file}: {e}")
+
+    def _persist(self, record: Dict, conversation_id: str = None):
+        """Persist one mutation according to the configured persistence mode"""
+        if self.persistence_mode != 'journal':
+            self._save_data()
+            return
+
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._io_lock:
+            try:
+                if self._journal is None:
+                    self._journal = open(self.journal_file, 'ab')
+                offset = self._journal.tell()
+                self._journal.write(line)
+                self._journal.flush()
+                self._journal_records += 1
+                if conversation_id:
+                    self._journal_offsets.setdefault(conversation_id, []).append(offset)
+            except Exception as e:
+                print(f"Warning: Could not append to journal {self.journal_file}: {e}")
+                self._save_data()
+                return
+
+            if self._journal_records >= self.compact_every:
+                self._compact()
+
+    def _messages_delta(self, conversation_id: str, messages: List[Message]):
+        """Return (start, tail) such that messages == persisted[:start] + tail, tail as dicts"""
+        messages = list(messages)
+        fingerprints = _message_fingerprints(messages)
+        persisted = self._persisted_fingerprints.get(conversation_id, [])
+
+        if persisted == fingerprints[:len(persisted)]:
+            start = len(persisted)  # Appends only, the usual case; compared without a Python loop
+        else:
+            start = 0
+            limit = min(len(persisted), len(fingerprints))
+            while start < limit and persisted[start] == fingerprints[start]:
+                start += 1
+
+        self._persisted_fingerprints[conversation_id] = fingerprints
+        return start, to_dicts(messages[start:])
+
+    @staticmethod
+    def _message_count(conversation: Conversation) -> int:
+        messages = conversation.messages
+        return conversation.message_count if messages is None else len(messages)
+
+    def _link_conversation(self, user: User, conversation: Conversation):
+        """Add conversation to user's conversation index, or refresh its ref there"""
+        user.conversations.touch(conversation.id, conversation.updated_at, conversation.title, conversation.created_at)
+
+    def _get_user(self, email: str) -> Optional[User]:
+        return self.users.get(email)
+
+    def _add_user(self, user: User) -> bool:
+        with self._users_lock:
+            if user.email in self.users:
+                return False
+            self.users[user.email] = user
+
+        self._persist({'op': 'user', 'data': user.to_dict()})
+        return True
+
+    def _set_password_hash(self, email: str, password_hash: str) -> bool:
+        with self._users_lock:
+            user = self.users.get(email)
+            if not user:
+                return False
+            user.password_hash = password_hash
+
+        self._persist({'op': 'user', 'data': user.to_dict()})
+        return True
 
     def save_conversation(self, user_email: str, conversation_data: Dict) -> bool:
         """Save conversation for user"""
@@ -194,32 +712,42 @@ class InMemoryAuthStore:
         if not conversation_id:
             return False
 
-        # Create conversation object
-        conversation = Conversation(
-            id=conversation_id,
-            user_id=user.id,
-            title=conversation_data.get('title', 'New Conversation'),
-            messages=conversation_data.get('messages', []),
-            age=conversation_data.get('age'),
-            language=conversation_data.get('language', 'english'),
-            created_at=conversation_data.get('created_at', datetime.now().isoformat()),
-            updated_at=datetime.now().isoformat()
-        )
-
-        # Store conversation
-        self.conversations[conversation_id] = conversation
-
-        # Add to user's conversation list if not already there
-        existing_conv_ids = [c.get('id') for c in user.conversations]
-        if conversation_id not in existing_conv_ids:
-            user.conversations.append({
-                'id': conversation.id,
-                'title': conversation.title,
-                'created_at': conversation.created_at,
-                'updated_at': conversation.updated_at
-            })
-
-        self._save_data()
+        with self._conversation_locks.get(conversation_id):
+            existing = self.conversations.get(conversation_id)
+            if existing is None or existing.messages is None:
+                # Nothing on disk is known to match; write the full message list
+                self._persisted_fingerprints.pop(conversation_id, None)
+
+            # Create conversation object
+            conversation = Conversation(
+                id=conversation_id,
+                user_id=user.id,
+                title=conversation_data.get('title', existing.title if existing else 'New Conversation'),
+                messages=message_store.replace(
+                    conversation_id, self._incoming_messages(conversation_id, conversation_data.get('messages', []))
+                ),
+                age=conversation_data.get('age'),
+                language=conversation_data.get('language', 'english'),
+                created_at=conversation_data.get('created_at', existing.created_at if existing else datetime.now().isoformat()),
+                updated_at=datetime.now().isoformat()
+            )
+            conversation.message_count = len(conversation.messages)
+
+            # Store conversation
+            self.conversations[conversation_id] = conversation
+
+            # Add to user's conversation list if not already there
+            self._link_conversation(user, conversation)
+
+            start, tail = self._messages_delta(conversation_id, conversation.messages)
+            data = asdict(conversation)
+            del data['messages']
+            self._persist(
+                {'op': 'conversation', 'email': user_email, 'data': data, 'start': start, 'messages': tail},
+                conversation_id
+            )
+
+        self._touch(conversation_id)
         return True
 
     def get_user_conversations(self, user_email: str) -> List[Dict]:
@@ -228,24 +756,34 @@ class InMemoryAuthStore:
         if not user:
             return []
 
+        conversation_ids, _ = user.conversations.page(len(user.conversations))
+
         conversations = []
-        for conv_ref in user.conversations:
-            conversation = self.conversations.get(conv_ref['id'])
+        for conversation_id in conversation_ids:
+            conversation = self.conversations.get(conversation_id)
             if conversation:
-                conversations.append({
-                    'id': conversation.id,
-                    'title': conversation.title,
-                    'messages': conversation.messages,
-                    'age': conversation.age,
-                    'language': conversation.language,
-                    'created_at': conversation.created_at,
-                    'updated_at': conversation.updated_at
-                })
-
-        # Sort by updated_at (most recent first)
-        conversations.sort(key=lambda x: x['updated_at'], reverse=True)
+                conversations.append(self._conversation_to_dict(conversation, self._body(conversation)))
         return conversations
 
+    def list_conversation_summaries(self, user_email: str, limit: int, cursor: str = None) -> Dict:
+        """Get one page of a user's conversation summaries, most recently updated first"""
+        after = decode_cursor(cursor) if cursor else None
+        user = self.users.get(user_email)
+        if not user:
+            return {'conversations': [], 'next_cursor': None}
+
+        conversation_ids, next_key = user.conversations.page(limit, after)
+
+        summaries = []
+        for conversation_id in conversation_ids:
+            conversation = self.conversations.get(conversation_id)
+            if conversation:
+                summaries.append(self._conversation_summary(conversation, self._message_count(conversation)))
+        return {
+            'conversations': summaries,
+            'next_cursor': encode_cursor(next_key) if next_key else None
+        }
+
     def get_conversation(self, conversation_id: str, user_email: str) -> Optional[Dict]:
         """Get specific conversation for user"""
         conversation = self.conversations.get(conversation_id)
@@ -257,38 +795,81 @@ class InMemoryAuthStore:
         if not user or conversation.user_id != user.id:
             return None
 
-        return {
-            'id': conversation.id,
-            'title': conversation.title,
-            'messages': conversation.messages,
-            'age': conversation.age,
-            'language': conversation.language,
-            'created_at': conversation.created_at,
-            'updated_at': conversation.updated_at
-        }
+        return self._conversation_to_dict(conversation, self._body(conversation))
 
-    def update_conversation_messages(self, conversation_id: str, messages: List[Dict], user_email: str) -> bool:
-        """Update messages in a conversation"""
+    def get_conversation_messages(self, conversation_id: str, user_email: str, offset: int, limit: int) -> Optional[Dict]:
+        """Get one page of a conversation's messages, oldest first"""
         conversation = self.conversations.get(conversation_id)
         if not conversation:
-            return False
+            return None
 
         # Verify ownership
         user = self.users.get(user_email)
         if not user or conversation.user_id != user.id:
-            return False
+            return None
+
+        messages = self._body(conversation)
+        page = messages[offset:offset + limit]
+        return self._messages_page(conversation_id, page, offset, len(messages))
 
-        conversation.messages = messages
-        conversation.updated_at = datetime.now().isoformat()
-        self._save_data()
+    def update_conversation_messages(self, conversation_id: str, messages: List[Dict], user_email: str) -> bool:
+        """Update messages in a conversation"""
+        with self._conversation_locks.get(conversation_id):
+            conversation = self.conversations.get(conversation_id)
+            if not conversation:
+                return False
+
+            # Verify ownership
+            user = self.users.get(user_email)
+            if not user or conversation.user_id != user.id:
+                return False
+
+            if conversation.messages is None:
+                self._persisted_fingerprints.pop(conversation_id, None)
+            conversation.messages = message_store.replace(conversation_id, self._incoming_messages(conversation_id, messages))
+            conversation.message_count = len(conversation.messages)
+            conversation.updated_at = datetime.now().isoformat()
+            self._link_conversation(user, conversation)
+
+            start, tail = self._messages_delta(conversation_id, conversation.messages)
+            self._persist({
+                'op': 'messages',
+                'id': conversation_id,
+                'updated_at': conversation.updated_at,
+                'start': start,
+                'messages': tail
+            }, conversation_id)
+
+        self._touch(conversation_id)
         return True
 
     def clear_all_data(self):
         """Clear all data (for testing/reset)"""
         self.users.clear()
         self.conversations.clear()
-        self.active_sessions.clear()
+        message_store.clear()
+        self.sessions.clear()
+        self._user_views.clear()
+        self._persisted_fingerprints.clear()
+        self._journal_offsets.clear()
+        self._body_offsets.clear()
+        with self._resident_lock:
+            self._resident.clear()
+        self._conversation_locks.clear()
+
+def create_auth_store(backend: str = None) -> AuthStore:
+    """Create the configured auth store backend"""
+    backend = (backend or config.Config.AUTH_STORE_BACKEND).lower()
+
+    if backend == 'memory':
+        return InMemoryAuthStore()
+
+    if backend == 'sqlite':
+        from sqlite_auth_store import SQLiteAuthStore
+        return SQLiteAuthStore()
+
+    raise ValueError(f"Unknown auth store backend: {backend}. Available: ['memory', 'sqlite']")
 
 # Global instance
-auth_store = InMemoryAuthStore()
+auth_store = create_auth_store()
 
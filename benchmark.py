@@ -0,0 +1,501 @@
+"""
+Benchmark script for backend hot paths
+Runs in-process against the real modules; no Flask server or LLM keys required
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Keep auth stores from creating session key/revocation files in the working directory,
+# and the global stores from loading (and migrating) the working directory's data files
+os.environ.setdefault('SESSION_BACKEND', 'memory')
+# Removed with everything in it when the interpreter exits, even after a failed run
+_data_dir = tempfile.TemporaryDirectory(prefix='benchmark-')
+os.environ.setdefault('AUTH_DATA_FILE', os.path.join(_data_dir.name, 'auth_data.json'))
+os.environ.setdefault('TRANSLATION_JOBS_DB', os.path.join(_data_dir.name, 'translation_jobs.db'))
+
+THREAD_COUNTS = [1, 2, 4, 8]
+
+
+def bench_conversation_threads(ops_per_thread: int = 2000):
+    """Measure add_message + journaled persist throughput as threads are added
+
+    Each thread works on its own conversation, so the per-conversation locks
+    never contend and the store's I/O lock is held only for a buffered
+    journal append. The writes are pure Python, however, so the GIL runs
+    them one at a time: expect throughput to stay roughly flat as threads
+    are added (dipping a little from GIL hand-offs), not to scale.
+    bench_conversation_lock_contention shows what the per-conversation
+    locks buy when writers block.
+    """
+    from conversation_manager import ConversationManager
+    from auth_memory_store import InMemoryAuthStore
+
+    print("Conversation write throughput (one conversation per thread)...")
+    for threads in THREAD_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = ConversationManager()
+            store = InMemoryAuthStore(data_file=os.path.join(tmp, 'auth_data.json'), compact_every=10 ** 9)
+
+            conv_ids = []
+            for t in range(threads):
+                email = f"user{t}@bench.local"
+                store.register_user(f"User {t}", "2000-01-01", email, "password")
+                conv_id = manager.create_conversation(email)
+                store.save_conversation(email, {'id': conv_id, 'messages': []})
+                conv_ids.append(conv_id)
+
+            def worker(conv_id):
+                for i in range(ops_per_thread):
+                    manager.add_message(conv_id, 'user', f"message {i}")
+                    store.update_conversation_messages(conv_id, manager.get_conversation(conv_id)['messages'], conv_id)
+
+            workers = [threading.Thread(target=worker, args=(c,)) for c in conv_ids]
+            start = time.perf_counter()
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            elapsed = time.perf_counter() - start
+
+            total = threads * ops_per_thread
+            print(f"   {threads} thread(s): {total / elapsed:,.0f} ops/s ({total} ops in {elapsed:.2f}s)")
+    print()
+
+
+def bench_conversation_lock_contention(ops_per_thread: int = 200, hold_ms: float = 1.0):
+    """Hold each conversation's lock across simulated blocking I/O
+
+    Pure-Python work is bounded by the GIL, so this isolates the locking:
+    if writers to different conversations contended, throughput would stay
+    flat at ~1000/hold_ms ops/s regardless of thread count.
+    """
+    from conversation_manager import ConversationManager
+
+    print(f"Per-conversation lock scaling ({hold_ms}ms blocking hold per write)...")
+    for threads in THREAD_COUNTS:
+        manager = ConversationManager()
+        conv_ids = [manager.create_conversation() for _ in range(threads)]
+
+        def worker(conv_id):
+            for i in range(ops_per_thread):
+                with manager.lock(conv_id):
+                    time.sleep(hold_ms / 1000)
+                    manager.add_message(conv_id, 'user', f"message {i}")
+
+        workers = [threading.Thread(target=worker, args=(c,)) for c in conv_ids]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+
+        total = threads * ops_per_thread
+        print(f"   {threads} thread(s): {total / elapsed:,.0f} ops/s ({total} ops in {elapsed:.2f}s)")
+    print()
+
+
+def _legacy_parse_response(response: str) -> dict:
+    """The original per-line, per-marker substring parser, kept as a baseline"""
+    from response_parser import SECTION_MARKERS
+
+    structured = {section: '' for section in SECTION_MARKERS}
+    current_section, current_content = None, []
+    for line in response.split('\n'):
+        line_upper = line.upper()
+        section_name = next(
+            (s for s, markers in SECTION_MARKERS.items() for m in markers if m.upper() in line_upper),
+            None
+        )
+        if section_name:
+            if current_section:
+                structured[current_section] = '\n'.join(current_content).strip()
+            current_section, current_content = section_name, [line]
+        elif current_section:
+            current_content.append(line)
+    if current_section:
+        structured[current_section] = '\n'.join(current_content).strip()
+    return structured
+
+
+def bench_response_parser(sizes=(50, 500, 5000), repeats: int = 20):
+    """Compare the legacy section parser with the compiled single-pass parser"""
+    from response_parser import SectionParser, parse_sections
+
+    print("Response parser throughput (lines per second)...")
+    for lines_per_section in sizes:
+        body = '\n'.join(f"- Advice line {i}: rest, fluids and monitoring of temperature." for i in range(lines_per_section))
+        response = '\n\n'.join(
+            f"**({code}) {title}**\n{body}"
+            for code, title in [('A', 'Brief Summary of the Symptoms'), ('B', 'Home Care Recommendations'),
+                                ('C', 'When to Seek Medical Attention'), ('D', 'Possible Causes')]
+        )
+        total_lines = response.count('\n') + 1
+
+        def run(parse):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                parse(response)
+            return total_lines * repeats / (time.perf_counter() - start)
+
+        def incremental(text):
+            parser = SectionParser(strict=True)
+            for i in range(0, len(text), 64):
+                parser.feed(text[i:i + 64])
+            parser.close()
+
+        legacy = run(_legacy_parse_response)
+        loose = run(lambda text: parse_sections(text, strict=False))
+        strict = run(lambda text: parse_sections(text, strict=True))
+        streamed = run(incremental)
+        print(f"   {total_lines:>6} lines: legacy {legacy:,.0f} | loose {loose:,.0f} | strict {strict:,.0f} "
+              f"| streamed (64-char chunks) {streamed:,.0f} ({strict / legacy:.1f}x strict vs legacy)")
+    print()
+
+
+def bench_session_validation(session_counts=(1_000, 100_000, 500_000), lookups: int = 200_000):
+    """Session validation cost as active sessions accumulate, plus memory under login churn"""
+    from auth_memory_store import InMemoryAuthStore
+    from session_store import SessionStore, SignedSessionStore
+
+    print("Session validation throughput (in-process sessions)...")
+    tmp = tempfile.TemporaryDirectory()
+    for count in session_counts:
+        store = InMemoryAuthStore(data_file=os.path.join(tmp.name, f'sessions_{count}.json'))
+        store.register_user("Bench User", "2000-01-01", "bench@bench.local", "password")
+        store.sessions = SessionStore(max_per_user=0)  # Uncapped so one user can hold every session
+        tokens = [store.sessions.create("bench@bench.local") for _ in range(count)]
+
+        probe = tokens[::max(1, count // 1000)]
+        start = time.perf_counter()
+        for i in range(lookups):
+            store.validate_session(probe[i % len(probe)])
+        elapsed = time.perf_counter() - start
+        print(f"   {count:>9,} sessions: {lookups / elapsed:,.0f} validations/s")
+
+    store.sessions.clear()
+    store.sessions.ttl_seconds = 0.05
+    store.sessions.max_per_user = 10
+    start = time.perf_counter()
+    peak = 0
+    while time.perf_counter() - start < 1.0:
+        store.authenticate_user("bench@bench.local", "password")
+        peak = max(peak, len(store.sessions))
+    print(f"   login churn with 10-per-user cap: peak {peak} live sessions")
+
+    store.sessions = SignedSessionStore(b'bench-secret', revocation_db=os.path.join(tmp.name, 'sessions.db'))
+    token = store.sessions.create("bench@bench.local")
+    start = time.perf_counter()
+    for _ in range(lookups // 10):
+        store.validate_session(token)
+    elapsed = time.perf_counter() - start
+    print(f"   signed tokens (HMAC + shared revocation check): {lookups // 10 / elapsed:,.0f} validations/s")
+    tmp.cleanup()
+    print()
+
+
+def bench_message_memory(count: int = 1_000_000):
+    """Bytes per stored message: legacy dicts with ISO timestamps vs compact Message records
+
+    Content strings are shared across messages so the figures isolate the
+    per-message structure overhead that the representation controls.
+    """
+    import gc
+    import tracemalloc
+    from datetime import datetime
+    from message_store import Message
+
+    contents = [f"message body {i}" for i in range(100)]
+    roles = ['user', 'assistant']
+
+    def legacy():
+        return [
+            {'role': roles[i % 2], 'content': contents[i % 100], 'timestamp': datetime.now().isoformat()}
+            for i in range(count)
+        ]
+
+    def compact():
+        return [Message(roles[i % 2], contents[i % 100]) for i in range(count)]
+
+    print(f"Message memory at {count:,} messages...")
+    for label, build in [('dict + ISO string', legacy), ('Message __slots__', compact)]:
+        gc.collect()
+        tracemalloc.start()
+        messages = build()
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"   {label:<18}: {used / count:6.1f} bytes/message ({used / 2 ** 20:,.0f} MiB)")
+        del messages
+    print()
+
+
+def bench_store_startup(conversations: int = 10_000, messages_per_conversation: int = 20, active: int = 500):
+    """Startup time and traced memory of the in-memory auth store
+
+    Loads a snapshot of many stored conversations, then opens the bodies of
+    `active` of them, as a restart followed by that many users returning.
+    Startup only reads metadata; memory grows with the active set.
+    """
+    import gc
+    import tracemalloc
+    from auth_memory_store import InMemoryAuthStore
+    from message_store import message_store
+
+    print(f"Auth store startup with {conversations:,} conversations x {messages_per_conversation} messages...")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'auth_data.json')
+        store = InMemoryAuthStore(data_file=data_file, resident_limit=active)
+        store.register_user('Bench User', '1990-01-01', 'bench@example.com', 'Bench-password-1')
+        body = [{'role': 'user', 'content': f"message body {i}"} for i in range(messages_per_conversation)]
+        for i in range(conversations):
+            store.save_conversation('bench@example.com', {'id': f"conv-{i}", 'messages': body})
+        store._compact()
+        del store
+        message_store.clear()
+
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        store = InMemoryAuthStore(data_file=data_file, resident_limit=active)
+        elapsed = time.perf_counter() - start
+        loaded, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        for i in range(active):
+            store.get_conversation(f"conv-{i}", 'bench@example.com')
+        opened = time.perf_counter() - start
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"   startup              : {elapsed * 1000:8.1f} ms, {loaded / 2 ** 20:6.1f} MiB")
+        print(f"   after {active:>5,} opened   : {opened * 1000:8.1f} ms, {used / 2 ** 20:6.1f} MiB"
+              f" ({store.resident_limit:,} bodies resident)")
+        message_store.clear()
+    print()
+
+
+def bench_conversation_saves(history_sizes=(100, 1_000, 10_000), saves: int = 2_000):
+    """Per-save cost of the in-memory store as one user's history grows
+
+    Each save refreshes the user's conversation index; with the old list
+    scan this grew linearly with the number of conversations.
+    """
+    from auth_memory_store import InMemoryAuthStore
+    from message_store import message_store
+
+    print(f"Conversation saves ({saves:,} per history size)...")
+    for size in history_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = InMemoryAuthStore(data_file=os.path.join(tmp, 'auth_data.json'), compact_every=10 ** 9)
+            store.register_user('Bench User', '1990-01-01', 'bench@example.com', 'Bench-password-1')
+            for i in range(size):
+                store.save_conversation('bench@example.com', {'id': f"conv-{i}", 'messages': []})
+
+            start = time.perf_counter()
+            for i in range(saves):
+                store.save_conversation('bench@example.com', {'id': f"conv-{i % size}", 'messages': []})
+            elapsed = time.perf_counter() - start
+            print(f"   {size:>7,} conversations: {elapsed / saves * 1e6:8.1f} us/save")
+            message_store.clear()
+    print()
+
+
+def bench_login_throughput(logins: int = 64, clients: int = 8):
+    """Password verifications per second at each hash cost setting
+
+    `clients` threads log in concurrently, as simultaneous requests would;
+    the hasher's pool caps how many derivations run at once.
+    """
+    import hashlib
+    from concurrent.futures import ThreadPoolExecutor
+    from password_hasher import PasswordHasher
+
+    settings = [
+        ('legacy salt:sha256', None),
+        ('pbkdf2_sha256 i=100k', dict(algorithm='pbkdf2_sha256', pbkdf2_iterations=100_000)),
+        ('pbkdf2_sha256 i=600k', dict(algorithm='pbkdf2_sha256', pbkdf2_iterations=600_000)),
+        ('scrypt n=2^14', dict(algorithm='scrypt', scrypt_n=2 ** 14)),
+        ('scrypt n=2^15', dict(algorithm='scrypt', scrypt_n=2 ** 15)),
+        ('scrypt n=2^16', dict(algorithm='scrypt', scrypt_n=2 ** 16)),
+    ]
+
+    print(f"Login throughput ({logins} logins, {clients} concurrent clients, {os.cpu_count()} CPUs)...")
+    for label, kwargs in settings:
+        for workers in (1, 4):
+            hasher = PasswordHasher(max_workers=workers, **(kwargs or {}))
+            if kwargs is None:
+                salt = 'ab' * 16
+                stored = f"{salt}:{hashlib.sha256(f'{salt}correct horse'.encode()).hexdigest()}"
+            else:
+                stored = hasher.hash('correct horse')
+
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                start = time.perf_counter()
+                results = list(pool.map(lambda _: hasher.verify('correct horse', stored), range(logins)))
+                elapsed = time.perf_counter() - start
+            assert all(results)
+            print(f"   {label:<22} workers={workers}: {logins / elapsed:9.1f} logins/s "
+                  f"({elapsed / logins * 1000:7.2f} ms/login amortized)")
+            if kwargs is None:
+                break
+    print()
+
+
+def _memory_kb(field: str) -> int:
+    """A memory figure from /proc/self/status (VmRSS, VmHWM), 0 where unavailable"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _serve_mode(mode: str, threads: int, requests: int, clients: int, llm_seconds: float):
+    """One row of bench_serving_modes, run in a fresh process so memory figures are its own
+
+    `clients` connections each send chats back to back until `requests` are
+    done; latency runs from a client sending until it has the response, so
+    time spent queued for a worker thread counts.
+    """
+    import asyncio
+    import json
+    os.environ['ASGI_WSGI_THREADS'] = str(threads)
+    from concurrent.futures import ThreadPoolExecutor
+    from llm_providers import LLMProvider, LLMProviderFactory
+
+    class StubProvider(LLMProvider):
+        def is_available(self):
+            return True
+
+        def generate_response(self, prompt, system_prompt=None, **kwargs):
+            time.sleep(llm_seconds)
+            return "(A) Brief Summary\nStub answer"
+
+        async def agenerate_response(self, prompt, system_prompt=None, **kwargs):
+            await asyncio.sleep(llm_seconds)
+            return "(A) Brief Summary\nStub answer"
+
+    LLMProviderFactory.get_provider = classmethod(lambda cls, name=None: StubProvider())
+    import app as app_module
+    import asgi
+    app_module.conversation_summarizer = None
+    # Persistence has its own benchmarks; leave it out so only the serving mode differs
+    app_module.conversation_manager.store = None
+    app_module.chat_admission.limit = clients
+    app_module.llm_scheduler.max_concurrent = clients
+
+    client = app_module.app.test_client()
+    response = client.post('/api/auth/register', json={
+        'full_name': 'Bench', 'date_of_birth': '1990-01-01', 'email': 'serving@example.com', 'password': 'benchpass1'
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['session_token']}"}
+    conversation_ids = []
+    for _ in range(clients):
+        conversation_id = client.post('/api/conversation/start', headers=headers, json={}).get_json()['conversation_id']
+        client.post(f'/api/conversation/{conversation_id}/age', headers=headers, json={'age': '18-64 years (Adult)'})
+        client.post(f'/api/conversation/{conversation_id}/language', headers=headers, json={'language': 'english'})
+        conversation_ids.append(conversation_id)
+
+    # WSGI mode models a threaded server: one worker thread per connection it can serve at once
+    workers = ThreadPoolExecutor(max_workers=threads) if mode == 'wsgi' else None
+
+    def sync_chat(i):
+        response = app_module.app.test_client().post(
+            f'/api/conversation/{conversation_ids[i % clients]}/chat', headers=headers, json={'message': f"sync {i}"}
+        )
+        assert response.status_code == 200, response.get_json()
+
+    async def async_chat(i):
+        body = json.dumps({'message': f"async {i}"}).encode('utf-8')
+        scope = {
+            'type': 'http', 'method': 'POST', 'path': f'/api/conversation/{conversation_ids[i % clients]}/chat',
+            'query_string': b'', 'root_path': '', 'scheme': 'http', 'http_version': '1.1',
+            'headers': [(b'content-type', b'application/json'), (b'authorization', headers['Authorization'].encode())]
+        }
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            sent.append(message)
+
+        await asgi.app(scope, receive, send)
+        assert sent[0]['status'] == 200, sent
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        pending = iter(range(requests))
+        latencies = []
+
+        async def connection():
+            for i in pending:
+                start = time.perf_counter()
+                if workers:
+                    await loop.run_in_executor(workers, sync_chat, i)
+                else:
+                    await async_chat(i)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(connection() for _ in range(clients)))
+        return latencies
+
+    baseline_kb = _memory_kb('VmRSS')
+    start = time.perf_counter()
+    latencies = sorted(asyncio.run(run()))
+    elapsed = time.perf_counter() - start
+    peak_threads = threading.active_count()
+    growth_mb = (_memory_kb('VmHWM') - baseline_kb) / 1024
+    print(f"   {mode:<5} {threads:4d} threads  {requests / elapsed:7.1f} req/s  "
+          f"p50 {latencies[len(latencies) // 2] * 1000:7.1f} ms  p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.1f} ms  "
+          f"peak threads {peak_threads:4d}  RSS growth {growth_mb:6.1f} MB", flush=True)
+
+
+def bench_serving_modes(requests: int = 1024, threads: int = 32, clients: int = 256, llm_seconds: float = 0.2):
+    """Chat throughput of the WSGI app vs the ASGI app at the same connection count
+
+    The LLM is a stub that sleeps llm_seconds (time.sleep in the sync path,
+    asyncio.sleep in the async one) and `clients` connections stay busy
+    throughout. WSGI needs a thread per connection it serves at once, so it
+    runs twice: with `threads` workers (the ASGI pool size, leaving
+    connections queued) and with one worker per connection. ASGI keeps the
+    `threads`-thread pool for the Flask parts and awaits the LLM calls.
+    Each row runs in its own process and reports peak threads and how far
+    resident memory grew under load.
+    """
+    import subprocess
+    print(f"Serving modes ({requests} chats from {clients} connections, {llm_seconds * 1000:.0f} ms stub LLM)...")
+    for mode, mode_threads in (('wsgi', threads), ('wsgi', clients), ('asgi', threads)):
+        env = dict(os.environ, AUTH_DATA_FILE=os.path.join(tempfile.mkdtemp(dir=_data_dir.name), 'auth_data.json'))
+        subprocess.run([
+            sys.executable, '-c',
+            f"import benchmark; benchmark._serve_mode({mode!r}, {mode_threads}, {requests}, {clients}, {llm_seconds})"
+        ], cwd=os.path.dirname(os.path.abspath(__file__)), env=env, check=True)
+    print()
+
+
+BENCHMARKS = {
+    'conversation_threads': bench_conversation_threads,
+    'conversation_lock_contention': bench_conversation_lock_contention,
+    'response_parser': bench_response_parser,
+    'session_validation': bench_session_validation,
+    'message_memory': bench_message_memory,
+    'store_startup': bench_store_startup,
+    'conversation_saves': bench_conversation_saves,
+    'login_throughput': bench_login_throughput,
+    'serving_modes': bench_serving_modes,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS.keys())
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name}. Available: {list(BENCHMARKS.keys())}")
+            continue
+        BENCHMARKS[name]()
@@ -6,6 +6,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Session files default to the auth data's directory, so they move with the accounts they belong to
+_AUTH_DATA_DIR = os.path.dirname(os.getenv('AUTH_DATA_FILE', 'auth_data.json'))
+
 class Config:
     """Application configuration"""
     
@@ -28,6 +31,102 @@ class Config:
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
     FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 32))  # asgi.py: threads running the non-async routes
+    
+    # LLM Transport Configuration
+    LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', 30))  # per attempt
+    LLM_DEADLINE_SECONDS = float(os.getenv('LLM_DEADLINE_SECONDS', 60))  # across all retries
+    LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))
+    LLM_RETRY_BACKOFF_SECONDS = float(os.getenv('LLM_RETRY_BACKOFF_SECONDS', 0.5))
+    LLM_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv('LLM_RETRY_BACKOFF_MAX_SECONDS', 8))
+    LLM_POOL_MAX_CONNECTIONS = int(os.getenv('LLM_POOL_MAX_CONNECTIONS', 50))
+    LLM_POOL_MAX_KEEPALIVE = int(os.getenv('LLM_POOL_MAX_KEEPALIVE', 20))
+    
+    # LLM Routing Configuration (LLM_PROVIDER=router)
+    LLM_ROUTER_PROVIDERS = os.getenv('LLM_ROUTER_PROVIDERS', 'openai,gemini')  # in priority order
+    LLM_ROUTER_MAX_WORKERS = int(os.getenv('LLM_ROUTER_MAX_WORKERS', 32))
+    LLM_HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', 0.95))
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv('LLM_HEDGE_DEFAULT_DELAY_SECONDS', 10))
+    LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('LLM_CIRCUIT_FAILURE_THRESHOLD', 5))
+    LLM_CIRCUIT_RESET_SECONDS = float(os.getenv('LLM_CIRCUIT_RESET_SECONDS', 30))
+    
+    # LLM Micro-batching Configuration (0 ms window disables batching)
+    LLM_BATCH_WINDOW_MS = float(os.getenv('LLM_BATCH_WINDOW_MS', 0))
+    LLM_BATCH_MAX_SIZE = int(os.getenv('LLM_BATCH_MAX_SIZE', 8))
+    
+    # Session Configuration
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'signed').lower()  # Options: signed, memory
+    SESSION_SECRET = os.getenv('SESSION_SECRET', '')  # Shared HMAC key; generated into SESSION_SECRET_FILE if unset
+    SESSION_SECRET_FILE = os.getenv('SESSION_SECRET_FILE', os.path.join(_AUTH_DATA_DIR, 'session_secret.key'))
+    SESSION_REVOCATION_DB = os.getenv('SESSION_REVOCATION_DB', os.path.join(_AUTH_DATA_DIR, 'sessions.db'))
+    SESSION_TTL_SECONDS = float(os.getenv('SESSION_TTL_SECONDS', 86400))
+    SESSION_MAX_PER_USER = int(os.getenv('SESSION_MAX_PER_USER', 10))
+    
+    # Password Hashing (records made with other settings are rehashed on login)
+    PASSWORD_HASH_ALGORITHM = os.getenv('PASSWORD_HASH_ALGORITHM', 'scrypt').lower()  # Options: scrypt, pbkdf2_sha256
+    PASSWORD_SCRYPT_N = int(os.getenv('PASSWORD_SCRYPT_N', 2 ** 14))
+    PASSWORD_SCRYPT_R = int(os.getenv('PASSWORD_SCRYPT_R', 8))
+    PASSWORD_SCRYPT_P = int(os.getenv('PASSWORD_SCRYPT_P', 1))
+    PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 600000))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))  # Concurrent hashes; bounds CPU and scrypt memory
+    
+    # Auth Rate Limiting (token buckets per client IP and per email on login/register)
+    AUTH_RATE_LIMIT_ENABLED = os.getenv('AUTH_RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    AUTH_IP_RATE_PER_MINUTE = float(os.getenv('AUTH_IP_RATE_PER_MINUTE', 20))
+    AUTH_IP_BURST = int(os.getenv('AUTH_IP_BURST', 10))
+    AUTH_EMAIL_RATE_PER_MINUTE = float(os.getenv('AUTH_EMAIL_RATE_PER_MINUTE', 5))
+    AUTH_EMAIL_BURST = int(os.getenv('AUTH_EMAIL_BURST', 5))
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+    
+    # Admission Control (requests in flight per route group; extra ones get 503 at once)
+    AUTH_MAX_CONCURRENT = int(os.getenv('AUTH_MAX_CONCURRENT', 8))
+    CHAT_MAX_CONCURRENT = int(os.getenv('CHAT_MAX_CONCURRENT', 64))
+    
+    # LLM Scheduling (concurrent LLM-bound requests; the excess queues fairly per user, bounded in size and wait)
+    LLM_MAX_CONCURRENT = int(os.getenv('LLM_MAX_CONCURRENT', 16))
+    LLM_QUEUE_MAX = int(os.getenv('LLM_QUEUE_MAX', 64))
+    LLM_QUEUE_MAX_PER_USER = int(os.getenv('LLM_QUEUE_MAX_PER_USER', 4))
+    LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', 10))
+    
+    # Persistence Configuration
+    AUTH_STORE_BACKEND = os.getenv('AUTH_STORE_BACKEND', 'memory').lower()  # Options: memory, sqlite
+    AUTH_SQLITE_PATH = os.getenv('AUTH_SQLITE_PATH', 'auth_data.db')
+    AUTH_DATA_FILE = os.getenv('AUTH_DATA_FILE', 'auth_data.json')
+    AUTH_PERSISTENCE_MODE = os.getenv('AUTH_PERSISTENCE_MODE', 'journal').lower()  # Options: journal, snapshot
+    AUTH_JOURNAL_COMPACT_EVERY = int(os.getenv('AUTH_JOURNAL_COMPACT_EVERY', 1000))
+    AUTH_RESIDENT_CONVERSATIONS = int(os.getenv('AUTH_RESIDENT_CONVERSATIONS', 1000))  # Message bodies kept in memory; the rest are paged out
+    
+    # Conversation Listing (page sizes for /api/user/conversations and its messages endpoint)
+    CONVERSATION_PAGE_SIZE = int(os.getenv('CONVERSATION_PAGE_SIZE', 20))
+    MESSAGE_PAGE_SIZE = int(os.getenv('MESSAGE_PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 200))
+    
+    # Response Cache Configuration
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_TTL_SECONDS = int(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 3600))
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD = float(os.getenv('RESPONSE_CACHE_SIMILARITY_THRESHOLD', 0))  # 0 disables fuzzy matching
+    
+    # Translation Configuration
+    TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv('TRANSLATION_MEMORY_MAX_ENTRIES', 10000))
+    TRANSLATION_BATCH_TOKENS = int(os.getenv('TRANSLATION_BATCH_TOKENS', 1500))
+    TRANSLATION_MAX_WORKERS = int(os.getenv('TRANSLATION_MAX_WORKERS', 4))
+    TRANSLATION_MAX_RETRIES = int(os.getenv('TRANSLATION_MAX_RETRIES', 1))
+    TRANSLATION_JOBS_DB = os.getenv('TRANSLATION_JOBS_DB', 'translation_jobs.db')  # Durable status of language-switch jobs
+    TRANSLATION_JOB_WORKERS = int(os.getenv('TRANSLATION_JOB_WORKERS', 2))
+    TRANSLATION_JOB_RETENTION_HOURS = float(os.getenv('TRANSLATION_JOB_RETENTION_HOURS', 24))
+    
+    # Prompt Assembly (token budgets for the conversation history window)
+    PROMPT_HISTORY_TOKEN_BUDGET = int(os.getenv('PROMPT_HISTORY_TOKEN_BUDGET', 1000))
+    PROMPT_MESSAGE_MAX_TOKENS = int(os.getenv('PROMPT_MESSAGE_MAX_TOKENS', 300))
+    
+    # Conversation Summaries (prompts send a running summary instead of raw history)
+    CONVERSATION_SUMMARY_ENABLED = os.getenv('CONVERSATION_SUMMARY_ENABLED', 'True').lower() == 'true'
+    CONVERSATION_SUMMARY_MAX_TOKENS = int(os.getenv('CONVERSATION_SUMMARY_MAX_TOKENS', 250))
+    CONVERSATION_SUMMARY_WORKERS = int(os.getenv('CONVERSATION_SUMMARY_WORKERS', 2))
+    
+    # Response Parsing (strict only treats marker-led lines as section headers)
+    RESPONSE_PARSER_STRICT = os.getenv('RESPONSE_PARSER_STRICT', 'True').lower() == 'true'
     
     # Age Groups (for validation)
     AGE_GROUPS = [
@@ -0,0 +1,172 @@
+"""
+Conversation Index - A user's conversations keyed by id and ordered by last update
+Backs cursor-paginated listings without sorting the whole history per request
+"""
+import base64
+import binascii
+import json
+import random
+import threading
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# (updated_at, conversation_id); ISO timestamps sort chronologically as strings
+SortKey = Tuple[str, str]
+
+
+def encode_cursor(key: SortKey) -> str:
+    """Opaque cursor for the position after key"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        updated_at, conversation_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (binascii.Error, TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(updated_at, str) or not isinstance(conversation_id, str):
+        raise ValueError("Invalid cursor")
+    return updated_at, conversation_id
+
+
+class _Node:
+    __slots__ = ('key', 'next')
+
+    def __init__(self, key: Optional[SortKey], level: int):
+        self.key = key
+        self.next: List[Optional['_Node']] = [None] * level
+
+
+class _SkipList:
+    """Sort keys newest first, with O(log n) expected insert, remove and seek"""
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+
+    def _predecessors(self, key: SortKey) -> List[_Node]:
+        """The last node newer than key on each level"""
+        update = [self._head] * self.MAX_LEVEL
+        node = self._head
+        for level in range(self._level - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].key > key:
+                node = node.next[level]
+            update[level] = node
+        return update
+
+    def insert(self, key: SortKey):
+        update = self._predecessors(key)
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < self.P:
+            level += 1
+        self._level = max(self._level, level)
+        node = _Node(key, level)
+        for i in range(level):
+            node.next[i] = update[i].next[i]
+            update[i].next[i] = node
+
+    def remove(self, key: SortKey):
+        update = self._predecessors(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return
+        for i in range(len(node.next)):
+            update[i].next[i] = node.next[i]
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+
+    def older_than(self, after: Optional[SortKey]) -> Iterator[SortKey]:
+        """Keys strictly older than after (all keys if None), newest first"""
+        node = self._head.next[0] if after is None else self._predecessors(after)[0].next[0]
+        if node is not None and node.key == after:
+            node = node.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+
+class ConversationIndex:
+    """A user's conversation references ({'id', 'title', 'created_at', 'updated_at'})
+
+    Refs live in a dict keyed by id, in the order conversations were first
+    saved, so membership and lookup are O(1). A skip list holds the
+    (updated_at, id) keys newest first: touch() and discard() move or drop
+    a key in O(log n) expected time, and page() seeks to a cursor the same
+    way and then walks forward, so a listing costs O(log n + limit) however
+    long the user's history is.
+    """
+
+    def __init__(self, refs: Iterable[Dict] = ()):
+        self._refs: Dict[str, Dict] = {}  # conversation_id -> ref
+        self._order = _SkipList()
+        self._lock = threading.Lock()
+        for ref in refs:
+            self._refs[ref['id']] = {
+                'id': ref['id'],
+                'title': ref.get('title'),
+                'created_at': ref.get('created_at'),
+                'updated_at': ref.get('updated_at', '')
+            }
+        for conversation_id, ref in self._refs.items():
+            self._order.insert((ref['updated_at'], conversation_id))
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return conversation_id in self._refs
+
+    def get(self, conversation_id: str) -> Optional[Dict]:
+        return self._refs.get(conversation_id)
+
+    def to_list(self) -> List[Dict]:
+        """Plain ref dicts in first-saved order, for persistence"""
+        with self._lock:
+            return [dict(ref) for ref in self._refs.values()]
+
+    def touch(self, conversation_id: str, updated_at: str, title: str = None, created_at: str = None):
+        """Insert a conversation or refresh its ref and move it to its new updated_at"""
+        with self._lock:
+            ref = self._refs.get(conversation_id)
+            if ref is None:
+                self._refs[conversation_id] = {
+                    'id': conversation_id,
+                    'title': title,
+                    'created_at': created_at,
+                    'updated_at': updated_at
+                }
+                self._order.insert((updated_at, conversation_id))
+                return
+
+            if title is not None:
+                ref['title'] = title
+            if created_at is not None:
+                ref['created_at'] = created_at
+            if ref['updated_at'] != updated_at:
+                self._order.remove((ref['updated_at'], conversation_id))
+                ref['updated_at'] = updated_at
+                self._order.insert((updated_at, conversation_id))
+
+    def discard(self, conversation_id: str):
+        with self._lock:
+            ref = self._refs.pop(conversation_id, None)
+            if ref is not None:
+                self._order.remove((ref['updated_at'], conversation_id))
+
+    def page(self, limit: int, after: Optional[SortKey] = None) -> Tuple[List[str], Optional[SortKey]]:
+        """Up to limit ids, newest first, strictly older than after
+
+        Returns the ids and the key to pass as `after` for the next page
+        (None when this was the last page).
+        """
+        with self._lock:
+            # One key past the page tells whether another page follows
+            keys = list(islice(self._order.older_than(after), limit + 1))
+        more = len(keys) > limit
+        keys = keys[:limit]
+        next_key = keys[-1] if keys and more else None
+        return [conversation_id for _, conversation_id in keys], next_key
@@ -5,6 +5,10 @@ from typing import Dict, Optional, List, Tuple
 from enum import Enum
 import uuid
 from datetime import datetime
+import threading
+from keyed_lock import KeyedLock
+from message_store import Message, message_store
+from auth_memory_store import auth_store
 
 class ConversationState(Enum):
     """States in the conversation flow"""
@@ -15,25 +19,83 @@ class ConversationState(Enum):
     IN_CONVERSATION = "in_conversation"
 
 class ConversationManager:
-    """Manages conversation state and history"""
+    """Manages conversation state and history
+
+    Every read-modify-write on a conversation runs under that conversation's
+    own lock, so concurrent requests for different conversations never contend.
+
+    This is the single live copy of each conversation. When a store is
+    attached, mutations only mark the conversation dirty; flush() then
+    writes it to the store once, as one incremental save of whatever
+    changed, however many mutations the request made.
+    """
     
-    def __init__(self):
+    def __init__(self, store=None):
         self.conversations: Dict[str, Dict] = {}
+        self.store = store
+        self._locks = KeyedLock()
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+    
+    def lock(self, user_id: str):
+        """Get the lock guarding a conversation (re-entrant)"""
+        return self._locks.get(user_id)
+    
+    def _mark_dirty(self, user_id: str):
+        if self.store is not None:
+            with self._dirty_lock:
+                self._dirty.add(user_id)
     
-    def create_conversation(self, user_id: str = None) -> str:
-        """Create a new conversation session"""
+    def flush(self, user_id: str = None) -> int:
+        """Persist dirty conversations (one, or all when user_id is None); returns how many were saved"""
+        with self._dirty_lock:
+            if user_id is None:
+                pending, self._dirty = self._dirty, set()
+            elif user_id in self._dirty:
+                self._dirty.discard(user_id)
+                pending = {user_id}
+            else:
+                return 0
+        
+        saved = 0
+        for conv_id in pending:
+            with self.lock(conv_id):
+                conv = self.conversations.get(conv_id)
+                if not conv or not conv.get('owner'):
+                    continue
+                if self.store.save_conversation(conv['owner'], {
+                    'id': conv_id,
+                    'messages': conv['messages'],
+                    'age': conv['age'],
+                    'language': conv['language'],
+                    'created_at': conv['created_at']
+                }):
+                    saved += 1
+        return saved
+    
+    def create_conversation(self, user_id: str = None, owner: str = None) -> str:
+        """Create a new conversation session
+
+        owner is the email of the account the conversation is saved under.
+        """
         if not user_id:
             user_id = str(uuid.uuid4())
         
-        self.conversations[user_id] = {
-            'user_id': user_id,
-            'state': ConversationState.INITIAL,
-            'age': None,
-            'language': 'english',  # Default language
-            'messages': [],
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat()
-        }
+        with self.lock(user_id):
+            self.conversations[user_id] = {
+                'user_id': user_id,
+                'owner': owner,
+                'state': ConversationState.INITIAL,
+                'age': None,
+                'language': 'english',  # Default language
+                'messages': message_store.replace(user_id, []),  # Shared with auth_store
+                'summary': None,  # Running summary of messages[:summary_covered]
+                'summary_covered': 0,
+                'created_at': datetime.now().isoformat(),
+                'updated_at': datetime.now().isoformat()
+            }
+            message_store.pin(user_id)
+            self._mark_dirty(user_id)
         
         return user_id
     
@@ -43,45 +105,51 @@ class ConversationManager:
     
     def set_age(self, user_id: str, age: str) -> bool:
         """Set age for a conversation"""
-        if user_id not in self.conversations:
-            return False
-        
         # Validate age
         from config import Config
         if age not in Config.AGE_GROUPS:
             return False
         
-        self.conversations[user_id]['age'] = age
-        self.conversations[user_id]['updated_at'] = datetime.now().isoformat()
-        
-        # Update state
-        if self.conversations[user_id]['state'] == ConversationState.AWAITING_AGE:
-            if self.conversations[user_id]['language']:
-                self.conversations[user_id]['state'] = ConversationState.READY
-            else:
-                self.conversations[user_id]['state'] = ConversationState.AWAITING_LANGUAGE
+        with self.lock(user_id):
+            conv = self.conversations.get(user_id)
+            if not conv:
+                return False
+            
+            conv['age'] = age
+            conv['updated_at'] = datetime.now().isoformat()
+            self._mark_dirty(user_id)
+            
+            # Update state
+            if conv['state'] == ConversationState.AWAITING_AGE:
+                if conv['language']:
+                    conv['state'] = ConversationState.READY
+                else:
+                    conv['state'] = ConversationState.AWAITING_LANGUAGE
         
         return True
     
     def set_language(self, user_id: str, language: str) -> bool:
         """Set language for a conversation"""
-        if user_id not in self.conversations:
-            return False
-        
         # Validate language
         from config import Config
         if language.lower() not in Config.SUPPORTED_LANGUAGES:
             return False
         
-        self.conversations[user_id]['language'] = language.lower()
-        self.conversations[user_id]['updated_at'] = datetime.now().isoformat()
-        
-        # Update state
-        if self.conversations[user_id]['state'] == ConversationState.AWAITING_LANGUAGE:
-            if self.conversations[user_id]['age']:
-                self.conversations[user_id]['state'] = ConversationState.READY
-            else:
-                self.conversations[user_id]['state'] = ConversationState.AWAITING_AGE
+        with self.lock(user_id):
+            conv = self.conversations.get(user_id)
+            if not conv:
+                return False
+            
+            conv['language'] = language.lower()
+            conv['updated_at'] = datetime.now().isoformat()
+            self._mark_dirty(user_id)
+            
+            # Update state
+            if conv['state'] == ConversationState.AWAITING_LANGUAGE:
+                if conv['age']:
+                    conv['state'] = ConversationState.READY
+                else:
+                    conv['state'] = ConversationState.AWAITING_AGE
         
         return True
 
@@ -90,11 +158,15 @@ class ConversationManager:
 
         The translator is expected to be a callable that accepts a list of messages and a target language
         and returns a list of translated contents in the same order.
+        The translator runs outside the conversation lock, so messages appended meanwhile are kept as-is,
+        and the result is dropped if the conversation switched to another language in the meantime.
         """
-        if user_id not in self.conversations:
-            return False
+        with self.lock(user_id):
+            conv = self.conversations.get(user_id)
+            if not conv:
+                return False
+            messages = list(conv['messages'])
 
-        messages = self.conversations[user_id]['messages']
         if not messages:
             return True
 
@@ -104,51 +176,83 @@ class ConversationManager:
             if not translated or len(translated) != len(messages):
                 return False
 
-            for i, m in enumerate(messages):
-                m['content'] = translated[i]
+            with self.lock(user_id):
+                if conv['language'] != target_language.lower():
+                    return False
+                for i, m in enumerate(messages):
+                    m['content'] = translated[i]
+                    m.pop('response', None)  # The structured reply is in the old language
 
-            self.conversations[user_id]['updated_at'] = datetime.now().isoformat()
+                conv['updated_at'] = datetime.now().isoformat()
+                self._mark_dirty(user_id)
             return True
         except Exception:
             return False
     
-    def add_message(self, user_id: str, role: str, content: str):
-        """Add a message to conversation history"""
-        if user_id not in self.conversations:
-            return
-        
-        self.conversations[user_id]['messages'].append({
-            'role': role,
-            'content': content,
-            'timestamp': datetime.now().isoformat()
-        })
-        self.conversations[user_id]['updated_at'] = datetime.now().isoformat()
-        
-        if self.conversations[user_id]['state'] == ConversationState.READY:
-            self.conversations[user_id]['state'] = ConversationState.IN_CONVERSATION
+    def add_message(self, user_id: str, role: str, content: str, extra: Dict = None):
+        """Add a message to conversation history, with any extra fields stored alongside it"""
+        with self.lock(user_id):
+            conv = self.conversations.get(user_id)
+            if not conv:
+                return
+            
+            conv['messages'].append(Message(role, content, extra=tuple(extra.items()) if extra else None))
+            conv['updated_at'] = datetime.now().isoformat()
+            self._mark_dirty(user_id)
+            
+            if conv['state'] == ConversationState.READY:
+                conv['state'] = ConversationState.IN_CONVERSATION
     
     def can_process_symptoms(self, user_id: str) -> Tuple[bool, str]:
         """Check if conversation is ready to process symptoms"""
-        if user_id not in self.conversations:
-            return False, "Conversation not found"
-        
-        conv = self.conversations[user_id]
-        
-        if not conv['age']:
-            return False, "Age selection is required before processing symptoms"
-        
-        if not conv['language']:
-            return False, "Language selection is required"
+        with self.lock(user_id):
+            conv = self.conversations.get(user_id)
+            if not conv:
+                return False, "Conversation not found"
+            
+            if not conv['age']:
+                return False, "Age selection is required before processing symptoms"
+            
+            if not conv['language']:
+                return False, "Language selection is required"
         
         return True, "Ready"
     
     def get_conversation_history(self, user_id: str, limit: int = 10) -> List[Dict]:
         """Get recent conversation history"""
-        if user_id not in self.conversations:
-            return []
+        with self.lock(user_id):
+            conv = self.conversations.get(user_id)
+            if not conv:
+                return []
+            
+            messages = conv['messages']
+            return messages[-limit:] if limit else list(messages)
+    
+    def get_summary_context(self, user_id: str, limit: int = 10) -> Tuple[Optional[str], List[Dict]]:
+        """Get the running summary and the recent messages it does not cover yet"""
+        with self.lock(user_id):
+            conv = self.conversations.get(user_id)
+            if not conv:
+                return None, []
+            
+            uncovered = conv['messages'][conv.get('summary_covered', 0):]
+            return conv.get('summary'), uncovered[-limit:] if limit else list(uncovered)
+    
+    def apply_summary(self, user_id: str, summary: str, covered: int, expected_covered: int) -> bool:
+        """Store a new summary covering the first `covered` messages
+
+        Rejected if another update landed since the summary was started
+        (summary_covered no longer equals expected_covered).
+        """
+        with self.lock(user_id):
+            conv = self.conversations.get(user_id)
+            if not conv or conv.get('summary_covered', 0) != expected_covered:
+                return False
+            
+            conv['summary'] = summary
+            conv['summary_covered'] = covered
         
-        messages = self.conversations[user_id]['messages']
-        return messages[-limit:] if limit else messages
+        return True
     
     def cleanup_old_conversations(self, max_age_hours: int = 24):
         """Clean up old conversations (optional maintenance)"""
@@ -156,14 +260,21 @@ class ConversationManager:
         cutoff = datetime.now() - timedelta(hours=max_age_hours)
         
         to_remove = []
-        for user_id, conv in self.conversations.items():
+        for user_id, conv in list(self.conversations.items()):
             updated = datetime.fromisoformat(conv['updated_at'])
             if updated < cutoff:
                 to_remove.append(user_id)
         
         for user_id in to_remove:
-            del self.conversations[user_id]
+            with self.lock(user_id):
+                conv = self.conversations.get(user_id)
+                # Re-check under the lock in case the conversation was touched meanwhile
+                if conv and datetime.fromisoformat(conv['updated_at']) < cutoff:
+                    self.flush(user_id)
+                    del self.conversations[user_id]
+                    message_store.unpin(user_id)
+                    self._locks.discard(user_id)
 
-# Global conversation manager instance
-conversation_manager = ConversationManager()
+# Global conversation manager instance, saving through the global auth store
+conversation_manager = ConversationManager(store=auth_store)
 
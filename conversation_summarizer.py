@@ -0,0 +1,95 @@
+"""
+Conversation Summarizer - Keeps a compact running summary per conversation
+Summaries are updated in the background after each assistant turn
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from llm_scheduler import SchedulerBusy
+
+
+class ConversationSummarizer:
+    """Folds new messages into each conversation's running summary off the request path
+
+    summarize(previous_summary, new_messages) performs one LLM call and
+    returns the updated summary text. At most one update runs per
+    conversation at a time; turns that arrive meanwhile are folded in by a
+    follow-up run, so summaries never race each other.
+
+    With a scheduler, each call holds an LLM slot for the conversation's
+    owner; when none is free the update is skipped and the next turn's
+    update covers the messages instead.
+    """
+
+    def __init__(self, manager, summarize: Callable[[Optional[str], List[Dict]], str], max_workers: int = 2,
+                 scheduler=None):
+        self.manager = manager
+        self.summarize = summarize
+        self.scheduler = scheduler
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summarize')
+        self._lock = threading.Lock()
+        self._running = set()
+        self._rerun = set()
+        self.updates = 0
+        self.failures = 0
+        self.deferred = 0
+
+    def schedule(self, conversation_id: str):
+        """Queue a summary update for a conversation after a new assistant turn"""
+        with self._lock:
+            if conversation_id in self._running:
+                self._rerun.add(conversation_id)
+                return
+            self._running.add(conversation_id)
+        self._executor.submit(self._run, conversation_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'updates': self.updates,
+                'failures': self.failures,
+                'deferred': self.deferred,
+                'in_progress': len(self._running)
+            }
+
+    def _run(self, conversation_id: str):
+        while True:
+            try:
+                self._update(conversation_id)
+            except Exception as e:
+                print(f"Warning: Failed to summarize conversation {conversation_id}: {e}")
+                with self._lock:
+                    self.failures += 1
+
+            with self._lock:
+                if conversation_id not in self._rerun:
+                    self._running.discard(conversation_id)
+                    return
+                self._rerun.discard(conversation_id)
+
+    def _update(self, conversation_id: str):
+        with self.manager.lock(conversation_id):
+            conv = self.manager.get_conversation(conversation_id)
+            if not conv:
+                return
+            owner = conv.get('owner') or conversation_id
+            previous = conv.get('summary')
+            covered = conv.get('summary_covered', 0)
+            new_messages = list(conv['messages'][covered:])
+
+        if not new_messages:
+            return
+
+        if self.scheduler:
+            try:
+                with self.scheduler.slot(owner):
+                    summary = self.summarize(previous, new_messages)
+            except SchedulerBusy:
+                with self._lock:
+                    self.deferred += 1
+                return
+        else:
+            summary = self.summarize(previous, new_messages)
+        if summary and self.manager.apply_summary(conversation_id, summary.strip(), covered + len(new_messages), covered):
+            with self._lock:
+                self.updates += 1
@@ -12,6 +12,7 @@ import {
   sendMessage,
   getUserConversations,
   saveConversation,
+  waitForTranslationJob,
 } from './services/api';
 import { getUniqueConversationTitle } from './utils/conversationNaming';
 import { detectConversationMode } from './utils/conversationModeDetector';
@@ -33,6 +34,9 @@ function App() {
   const [error, setError] = useState(null);
   const [conversations, setConversations] = useState([]);
   const messagesEndRef = useRef(null);
+  // Latest conversation id, for translation jobs that finish after the user switched away
+  const conversationIdRef = useRef(null);
+  conversationIdRef.current = conversationId;
 
   useEffect(() => {
     checkAuthentication();
@@ -131,6 +135,27 @@ function App() {
     // If state is 'ready', input is already enabled (no action needed)
   };
 
+  const applyTranslatedMessages = (targetConversationId, language, translatedMessages) => {
+    const translated = translatedMessages.map((m) => ({
+      role: m.role,
+      content: m.content,
+      timestamp: m.timestamp || new Date().toISOString(),
+    }));
+    if (targetConversationId === conversationIdRef.current) {
+      setMessages(translated);
+    }
+    // Update conversation history entry if present
+    setConversations((prevConvs) => {
+      const idx = prevConvs.findIndex((c) => c.id === targetConversationId);
+      if (idx >= 0) {
+        const copy = [...prevConvs];
+        copy[idx] = { ...copy[idx], language, messages: translated };
+        return copy;
+      }
+      return prevConvs;
+    });
+  };
+
   const handleLanguageSet = (result) => {
     setLanguage(result.language);
     setState(result.state);
@@ -138,22 +163,22 @@ function App() {
 
     // If backend returned translated messages, update displayed messages
     if (result.translated_messages && Array.isArray(result.translated_messages)) {
-      const translated = result.translated_messages.map((m) => ({
-        role: m.role,
-        content: m.content,
-        timestamp: m.timestamp || new Date().toISOString(),
-      }));
-      setMessages(translated);
-      // Update conversation history entry if present
-      setConversations((prevConvs) => {
-        const idx = prevConvs.findIndex((c) => c.id === conversationId);
-        if (idx >= 0) {
-          const copy = [...prevConvs];
-          copy[idx] = { ...copy[idx], language: result.language, messages: translated };
-          return copy;
-        }
-        return prevConvs;
-      });
+      applyTranslatedMessages(conversationId, result.language, result.translated_messages);
+    }
+
+    // Translation runs as a background job; apply its messages once it completes
+    if (result.translation_job) {
+      const targetConversationId = conversationId;
+      waitForTranslationJob(result.translation_job.id)
+        .then((job) => {
+          if (job.status === 'completed' && Array.isArray(job.translated_messages)) {
+            applyTranslatedMessages(targetConversationId, job.language, job.translated_messages);
+          }
+          if (job.translation_warning) {
+            console.warn('Translation job:', job.translation_warning);
+          }
+        })
+        .catch((err) => console.error('Failed to get translation job:', err));
     }
   };
 
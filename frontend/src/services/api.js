@@ -65,6 +65,23 @@ export const setLanguage = async (conversationId, language) => {
   return response.data;
 };
 
+export const getTranslationJob = async (jobId) => {
+  const response = await api.get(`/api/translation-jobs/${jobId}`);
+  return response.data;
+};
+
+// Poll a language-switch translation job until it is no longer queued or running
+export const waitForTranslationJob = async (jobId, intervalMs = 1000, timeoutMs = 120000) => {
+  const deadline = Date.now() + timeoutMs;
+  for (;;) {
+    const job = await getTranslationJob(jobId);
+    if ((job.status !== 'queued' && job.status !== 'running') || Date.now() >= deadline) {
+      return job;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
 export const sendMessage = async (conversationId, message) => {
   const response = await api.post(`/api/conversation/${conversationId}/chat`, {
     message,
@@ -0,0 +1,36 @@
+"""
+Keyed Locks - One re-entrant lock per key
+Lets writers to different conversations proceed without contending on a global lock
+"""
+import threading
+from typing import Dict, Hashable
+
+
+class KeyedLock:
+    """Registry of per-key re-entrant locks
+
+    The registry lock is only taken the first time a key is seen (and on
+    discard), so steady-state acquisition is a single dict lookup.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, threading.RLock] = {}
+        self._registry_lock = threading.Lock()
+
+    def get(self, key: Hashable) -> threading.RLock:
+        """Get the lock for key, creating it on first use"""
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._registry_lock:
+                lock = self._locks.setdefault(key, threading.RLock())
+        return lock
+
+    def discard(self, key: Hashable):
+        """Forget the lock for key once nothing refers to the key any more"""
+        with self._registry_lock:
+            self._locks.pop(key, None)
+
+    def clear(self):
+        """Forget all locks"""
+        with self._registry_lock:
+            self._locks.clear()
@@ -3,12 +3,197 @@ LLM Provider Abstraction Layer
 Supports multiple LLM providers with easy switching
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Iterator, Callable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import asyncio
+import queue
+import random
+import threading
+import time
 import config
 
+
+class LLMTransport:
+    """Shared transport layer for all providers
+
+    Owns the keep-alive HTTP connection pool, the per-attempt timeout and an
+    overall deadline, and retries 429/5xx/timeout failures with jittered
+    exponential backoff. Each attempt is passed timeout= the smaller of the
+    per-attempt timeout and the time left before the deadline, and no retry
+    is started whose backoff would end past it, so a call never outlives
+    the deadline. Provider clients are built with their own retries
+    disabled so this is the only retry loop.
+    """
+    
+    RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+    
+    def __init__(
+        self,
+        timeout: float = 30,
+        deadline: float = 60,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8,
+        max_connections: int = 50,
+        max_keepalive: int = 20
+    ):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self._http_client = None
+        self._async_http_client = None
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls) -> 'LLMTransport':
+        return cls(
+            timeout=config.Config.LLM_TIMEOUT_SECONDS,
+            deadline=config.Config.LLM_DEADLINE_SECONDS,
+            max_retries=config.Config.LLM_MAX_RETRIES,
+            backoff_base=config.Config.LLM_RETRY_BACKOFF_SECONDS,
+            backoff_max=config.Config.LLM_RETRY_BACKOFF_MAX_SECONDS,
+            max_connections=config.Config.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive=config.Config.LLM_POOL_MAX_KEEPALIVE
+        )
+    
+    def http_client(self):
+        """Shared keep-alive httpx client, or None if httpx is not installed"""
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    try:
+                        import httpx
+                        self._http_client = httpx.Client(
+                            timeout=self.timeout,
+                            limits=httpx.Limits(
+                                max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_keepalive
+                            )
+                        )
+                    except ImportError:
+                        return None
+        return self._http_client
+    
+    def async_http_client(self):
+        """Shared keep-alive httpx.AsyncClient for ainvoke, or None if httpx is not installed"""
+        if self._async_http_client is None:
+            with self._lock:
+                if self._async_http_client is None:
+                    try:
+                        import httpx
+                        self._async_http_client = httpx.AsyncClient(
+                            timeout=self.timeout,
+                            limits=httpx.Limits(
+                                max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_keepalive
+                            )
+                        )
+                    except ImportError:
+                        return None
+        return self._async_http_client
+    
+    def is_retryable(self, error: Exception) -> bool:
+        """Whether a failed call is worth retrying (rate limits, server errors, timeouts)"""
+        for status in (
+            getattr(error, 'status_code', None),
+            getattr(getattr(error, 'response', None), 'status_code', None),
+            getattr(error, 'code', None)
+        ):
+            if isinstance(status, int):
+                return status in self.RETRYABLE_STATUS
+        
+        name = type(error).__name__
+        return 'Timeout' in name or 'Connection' in name or 'Unavailable' in name
+    
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    def attempt_timeout(self, started: float) -> float:
+        """Timeout for the next attempt of a call started at `started`"""
+        return max(0.0, min(self.timeout, self.deadline - (time.monotonic() - started)))
+    
+    def _retry_delay(self, error: Exception, attempt: int, started: float) -> float:
+        """Backoff before retrying a failed attempt; re-raises error if no retry fits in the deadline"""
+        if attempt >= self.max_retries or not self.is_retryable(error):
+            raise error
+        delay = self.backoff(attempt)
+        if time.monotonic() - started + delay >= self.deadline:
+            raise error
+        return delay
+    
+    def call(self, fn: Callable, *args, **kwargs):
+        """Call fn(*args, timeout=..., **kwargs), retrying retryable failures until max_retries or the deadline"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return fn(*args, timeout=self.attempt_timeout(started), **kwargs)
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt, started))
+                attempt += 1
+    
+    async def acall(self, fn: Callable, *args, **kwargs):
+        """Async call(): awaits fn(...) with the same retry policy, sleeping without a thread"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return await fn(*args, timeout=self.attempt_timeout(started), **kwargs)
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt, started))
+                attempt += 1
+    
+    def stream(self, fn: Callable, *args, **kwargs) -> Iterator:
+        """Stream from fn, retrying only while nothing has been yielded yet"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            yielded = False
+            try:
+                for item in fn(*args, timeout=self.attempt_timeout(started), **kwargs):
+                    yielded = True
+                    yield item
+                return
+            except Exception as e:
+                if yielded:
+                    raise
+                time.sleep(self._retry_delay(e, attempt, started))
+                attempt += 1
+    
+    async def astream(self, fn: Callable, *args, **kwargs) -> AsyncIterator:
+        """Async stream(): iterates fn(...) as an async iterator with the same retry policy"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            yielded = False
+            try:
+                async for item in fn(*args, timeout=self.attempt_timeout(started), **kwargs):
+                    yielded = True
+                    yield item
+                return
+            except Exception as e:
+                if yielded:
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt, started))
+                attempt += 1
+
+
+# Shared transport instance
+transport = LLMTransport.from_config()
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers"""
     
+    # Whether generate_batch maps to a native batch API rather than a loop
+    supports_batching = False
+    
     @abstractmethod
     def generate_response(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
         """Generate a response from the LLM"""
@@ -18,18 +203,83 @@ class LLMProvider(ABC):
     def is_available(self) -> bool:
         """Check if the provider is available and configured"""
         pass
+    
+    async def agenerate_response(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
+        """Async generate_response
+
+        Providers with a native async client override this; the default
+        runs the blocking call on the event loop's default executor.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self.generate_response(prompt, system_prompt=system_prompt, **kwargs)
+        )
+    
+    def stream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> Iterator[str]:
+        """Yield the response incrementally as text chunks
+
+        Providers without native streaming yield the whole response as one chunk.
+        """
+        yield self.generate_response(prompt, system_prompt=system_prompt, **kwargs)
+    
+    async def astream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> AsyncIterator[str]:
+        """Async stream_response
+
+        Providers with a native async client override this; the default
+        yields the whole agenerate_response result as one chunk.
+        """
+        yield await self.agenerate_response(prompt, system_prompt=system_prompt, **kwargs)
+    
+    def generate_batch(self, requests: List[tuple]) -> list:
+        """Generate responses for several (prompt, system_prompt) pairs
+
+        Returns a list aligned with requests holding either the response
+        text or the Exception raised for that request.
+        """
+        results = []
+        for prompt, system_prompt in requests:
+            try:
+                results.append(self.generate_response(prompt, system_prompt=system_prompt))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def estimate_tokens(self, text: str) -> int:
+        """Rough token count for budgeting prompts (about 4 characters per token)"""
+        return max(1, len(text) // 4)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Provider-specific runtime statistics"""
+        return {}
+    
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: str = None) -> list:
+        """Build the langchain message list for a prompt"""
+        from langchain_core.messages import HumanMessage, SystemMessage
+        
+        messages = []
+        if system_prompt:
+            messages.append(SystemMessage(content=system_prompt))
+        messages.append(HumanMessage(content=prompt))
+        return messages
 
 
 class OpenAIProvider(LLMProvider):
     """OpenAI GPT Provider"""
     
+    supports_batching = True
+    
     def __init__(self):
         try:
             from langchain_openai import ChatOpenAI
+            self.transport = transport
             self.llm = ChatOpenAI(
                 model=config.Config.OPENAI_MODEL,
                 api_key=config.Config.OPENAI_API_KEY,
-                temperature=0.7
+                temperature=0.7,
+                timeout=transport.timeout,
+                max_retries=0,
+                http_client=transport.http_client(),
+                http_async_client=transport.async_http_client()
             )
             self.available = True
         except Exception as e:
@@ -44,29 +294,71 @@ class OpenAIProvider(LLMProvider):
             raise ValueError("OpenAI provider is not available or not configured")
         
         try:
-            from langchain_core.messages import HumanMessage, SystemMessage
-            
-            messages = []
-            if system_prompt:
-                messages.append(SystemMessage(content=system_prompt))
-            messages.append(HumanMessage(content=prompt))
-            
-            response = self.llm.invoke(messages)
+            response = self.transport.call(self.llm.invoke, self._build_messages(prompt, system_prompt))
             return response.content
         except Exception as e:
             raise Exception(f"Error generating OpenAI response: {str(e)}")
+    
+    async def agenerate_response(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
+        if not self.is_available():
+            raise ValueError("OpenAI provider is not available or not configured")
+        
+        try:
+            response = await self.transport.acall(self.llm.ainvoke, self._build_messages(prompt, system_prompt))
+            return response.content
+        except Exception as e:
+            raise Exception(f"Error generating OpenAI response: {str(e)}")
+    
+    def generate_batch(self, requests: List[tuple]) -> list:
+        if not self.is_available():
+            raise ValueError("OpenAI provider is not available or not configured")
+        
+        batch = [self._build_messages(prompt, system_prompt) for prompt, system_prompt in requests]
+        responses = self.transport.call(self.llm.batch, batch, return_exceptions=True)
+        return [
+            Exception(f"Error generating OpenAI response: {str(r)}") if isinstance(r, Exception) else r.content
+            for r in responses
+        ]
+    
+    def stream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> Iterator[str]:
+        if not self.is_available():
+            raise ValueError("OpenAI provider is not available or not configured")
+        
+        try:
+            for chunk in self.transport.stream(self.llm.stream, self._build_messages(prompt, system_prompt)):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            raise Exception(f"Error streaming OpenAI response: {str(e)}")
+    
+    async def astream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> AsyncIterator[str]:
+        if not self.is_available():
+            raise ValueError("OpenAI provider is not available or not configured")
+        
+        try:
+            async for chunk in self.transport.astream(self.llm.astream, self._build_messages(prompt, system_prompt)):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            raise Exception(f"Error streaming OpenAI response: {str(e)}")
 
 
 class GeminiProvider(LLMProvider):
     """Google Gemini Provider"""
     
+    supports_batching = True
+    
     def __init__(self):
         try:
             from langchain_google_genai import ChatGoogleGenerativeAI
+            self.transport = transport
+            # The Google client manages its own channel pool; timeout and retries still go through the transport
             self.llm = ChatGoogleGenerativeAI(
                 model=config.Config.GEMINI_MODEL,
                 google_api_key=config.Config.GEMINI_API_KEY,
-                temperature=0.7
+                temperature=0.7,
+                timeout=transport.timeout,
+                max_retries=0
             )
             self.available = True
         except Exception as e:
@@ -81,17 +373,53 @@ class GeminiProvider(LLMProvider):
             raise ValueError("Gemini provider is not available or not configured")
         
         try:
-            from langchain_core.messages import HumanMessage, SystemMessage
-            
-            messages = []
-            if system_prompt:
-                messages.append(SystemMessage(content=system_prompt))
-            messages.append(HumanMessage(content=prompt))
-            
-            response = self.llm.invoke(messages)
+            response = self.transport.call(self.llm.invoke, self._build_messages(prompt, system_prompt))
             return response.content
         except Exception as e:
             raise Exception(f"Error generating Gemini response: {str(e)}")
+    
+    async def agenerate_response(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
+        if not self.is_available():
+            raise ValueError("Gemini provider is not available or not configured")
+        
+        try:
+            response = await self.transport.acall(self.llm.ainvoke, self._build_messages(prompt, system_prompt))
+            return response.content
+        except Exception as e:
+            raise Exception(f"Error generating Gemini response: {str(e)}")
+    
+    def generate_batch(self, requests: List[tuple]) -> list:
+        if not self.is_available():
+            raise ValueError("Gemini provider is not available or not configured")
+        
+        batch = [self._build_messages(prompt, system_prompt) for prompt, system_prompt in requests]
+        responses = self.transport.call(self.llm.batch, batch, return_exceptions=True)
+        return [
+            Exception(f"Error generating Gemini response: {str(r)}") if isinstance(r, Exception) else r.content
+            for r in responses
+        ]
+    
+    def stream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> Iterator[str]:
+        if not self.is_available():
+            raise ValueError("Gemini provider is not available or not configured")
+        
+        try:
+            for chunk in self.transport.stream(self.llm.stream, self._build_messages(prompt, system_prompt)):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            raise Exception(f"Error streaming Gemini response: {str(e)}")
+    
+    async def astream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> AsyncIterator[str]:
+        if not self.is_available():
+            raise ValueError("Gemini provider is not available or not configured")
+        
+        try:
+            async for chunk in self.transport.astream(self.llm.astream, self._build_messages(prompt, system_prompt)):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            raise Exception(f"Error streaming Gemini response: {str(e)}")
 
 
 class AnthropicProvider(LLMProvider):
@@ -107,16 +435,503 @@ class AnthropicProvider(LLMProvider):
         raise NotImplementedError("Anthropic provider is not yet implemented")
 
 
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker
+
+    Opens after failure_threshold consecutive failures, rejects calls for
+    reset_timeout seconds, then lets a single trial call through (half-open).
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+    
+    def allow(self) -> bool:
+        """Whether a call may be attempted now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+    
+    def release_trial(self):
+        """End a call abandoned by its caller without judging the provider"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class RoutingProvider(LLMProvider):
+    """Routes requests across several providers with hedging and failover
+
+    The first healthy provider is tried first. If it has not answered within
+    its recent latency percentile, a hedged request goes to the next healthy
+    provider and whichever succeeds first wins. Failures fail over
+    immediately, and each provider has a circuit breaker that takes it out
+    of rotation after repeated failures.
+    """
+    
+    MIN_LATENCY_SAMPLES = 20
+    
+    def __init__(self, provider_names: List[str] = None):
+        names = provider_names or [
+            name.strip() for name in config.Config.LLM_ROUTER_PROVIDERS.split(',') if name.strip()
+        ]
+        self.providers = []
+        for name in names:
+            if name == 'router':
+                continue
+            try:
+                self.providers.append((name, LLMProviderFactory._get_cached(name)))
+            except Exception as e:
+                print(f"Error initializing routed provider {name}: {e}")
+        
+        self.hedge_percentile = config.Config.LLM_HEDGE_PERCENTILE
+        self.default_hedge_delay = config.Config.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        self.breakers = {
+            name: CircuitBreaker(config.Config.LLM_CIRCUIT_FAILURE_THRESHOLD, config.Config.LLM_CIRCUIT_RESET_SECONDS)
+            for name, _ in self.providers
+        }
+        self.latencies = {name: deque(maxlen=200) for name, _ in self.providers}
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.Config.LLM_ROUTER_MAX_WORKERS,
+            thread_name_prefix='llm-router'
+        )
+        self._background = set()  # hedged tasks still running after their request returned
+    
+    def is_available(self) -> bool:
+        return any(provider.is_available() for _, provider in self.providers)
+    
+    def estimate_tokens(self, text: str) -> int:
+        healthy = self._healthy()
+        return healthy[0][1].estimate_tokens(text) if healthy else super().estimate_tokens(text)
+    
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to wait on a provider before hedging: its recent latency percentile"""
+        samples = sorted(self.latencies[name])
+        if len(samples) < self.MIN_LATENCY_SAMPLES:
+            return self.default_hedge_delay
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile))
+        return samples[index]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and hedge delay per routed provider"""
+        return {
+            'routing': {
+                name: {
+                    'state': self.breakers[name].state,
+                    'consecutive_failures': self.breakers[name].failures,
+                    'hedge_delay': self.hedge_delay(name)
+                }
+                for name, _ in self.providers
+            }
+        }
+    
+    def _healthy(self) -> list:
+        return [(name, provider) for name, provider in self.providers if provider.is_available()]
+    
+    def _timed_call(self, name: str, provider: LLMProvider, prompt: str, system_prompt: str, kwargs: dict) -> str:
+        started = time.monotonic()
+        try:
+            result = provider.generate_response(prompt, system_prompt=system_prompt, **kwargs)
+        except Exception:
+            self.breakers[name].record_failure()
+            raise
+        self.latencies[name].append(time.monotonic() - started)
+        self.breakers[name].record_success()
+        return result
+    
+    async def _atimed_call(self, name: str, provider: LLMProvider, prompt: str, system_prompt: str, kwargs: dict) -> str:
+        started = time.monotonic()
+        try:
+            result = await provider.agenerate_response(prompt, system_prompt=system_prompt, **kwargs)
+        except Exception:
+            self.breakers[name].record_failure()
+            raise
+        except BaseException:
+            # Cancelled: free a half-open trial so the provider can be tried again
+            self.breakers[name].release_trial()
+            raise
+        self.latencies[name].append(time.monotonic() - started)
+        self.breakers[name].record_success()
+        return result
+    
+    def generate_response(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
+        candidates = iter(self._healthy())
+        pending = {}
+        last_error = None
+        
+        def launch() -> bool:
+            for name, provider in candidates:
+                if self.breakers[name].allow():
+                    future = self._executor.submit(self._timed_call, name, provider, prompt, system_prompt, kwargs)
+                    pending[future] = name
+                    return True
+            return False
+        
+        if not launch():
+            raise ValueError("No healthy LLM provider is available")
+        
+        hedged = False
+        while pending:
+            timeout = None
+            if not hedged:
+                timeout = min(self.hedge_delay(name) for name in pending.values())
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            if not done:
+                # Primary is slower than its usual tail latency: hedge to the next provider
+                hedged = True
+                launch()
+                continue
+            
+            for future in done:
+                pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+                    launch()
+        
+        raise last_error or ValueError("No healthy LLM provider is available")
+    
+    async def agenerate_response(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
+        """Async generate_response: the same hedging and failover, with tasks instead of threads"""
+        candidates = iter(self._healthy())
+        pending = {}
+        last_error = None
+        
+        def launch() -> bool:
+            for name, provider in candidates:
+                if self.breakers[name].allow():
+                    task = asyncio.ensure_future(self._atimed_call(name, provider, prompt, system_prompt, kwargs))
+                    pending[task] = name
+                    return True
+            return False
+        
+        if not launch():
+            raise ValueError("No healthy LLM provider is available")
+        
+        hedged = False
+        try:
+            while pending:
+                timeout = None
+                if not hedged:
+                    timeout = min(self.hedge_delay(name) for name in pending.values())
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    # Primary is slower than its usual tail latency: hedge to the next provider
+                    hedged = True
+                    launch()
+                    continue
+                
+                for task in done:
+                    pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+                        launch()
+        finally:
+            # Like the threaded path, losing calls run to completion and still update breakers and latencies
+            for task in pending:
+                self._detach(task)
+        
+        raise last_error or ValueError("No healthy LLM provider is available")
+    
+    def _detach(self, task: asyncio.Task):
+        """Keep a losing hedged task alive until it finishes, discarding its outcome"""
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    
+    def stream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> Iterator[str]:
+        # Streams cannot be merged, so they fail over instead of hedging
+        last_error = None
+        for name, provider in self._healthy():
+            if not self.breakers[name].allow():
+                continue
+            started = time.monotonic()
+            yielded = False
+            try:
+                for chunk in provider.stream_response(prompt, system_prompt=system_prompt, **kwargs):
+                    if not yielded:
+                        self.latencies[name].append(time.monotonic() - started)
+                    yielded = True
+                    yield chunk
+            except Exception as e:
+                self.breakers[name].record_failure()
+                if yielded:
+                    raise
+                last_error = e
+                continue
+            except BaseException:
+                # The consumer closed the stream (GeneratorExit); chunks so far show the provider works
+                if yielded:
+                    self.breakers[name].record_success()
+                else:
+                    self.breakers[name].release_trial()
+                raise
+            self.breakers[name].record_success()
+            return
+        
+        raise last_error or ValueError("No healthy LLM provider is available")
+    
+    async def astream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> AsyncIterator[str]:
+        """Async stream_response: the same failover, iterating each provider's async stream"""
+        last_error = None
+        for name, provider in self._healthy():
+            if not self.breakers[name].allow():
+                continue
+            started = time.monotonic()
+            yielded = False
+            try:
+                async for chunk in provider.astream_response(prompt, system_prompt=system_prompt, **kwargs):
+                    if not yielded:
+                        self.latencies[name].append(time.monotonic() - started)
+                    yielded = True
+                    yield chunk
+            except Exception as e:
+                self.breakers[name].record_failure()
+                if yielded:
+                    raise
+                last_error = e
+                continue
+            except BaseException:
+                # Cancelled or closed by the consumer; chunks so far show the provider works
+                if yielded:
+                    self.breakers[name].record_success()
+                else:
+                    self.breakers[name].release_trial()
+                raise
+            self.breakers[name].record_success()
+            return
+        
+        raise last_error or ValueError("No healthy LLM provider is available")
+
+
+class _PendingRequest:
+    """A generate_response call waiting for its batch to complete
+
+    Threaded callers wait on `done`; async callers pass a future, which
+    finish() resolves on its own event loop.
+    """
+    
+    __slots__ = ('prompt', 'system_prompt', 'done', 'future', 'result', 'error')
+    
+    def __init__(self, prompt: str, system_prompt: str, future: asyncio.Future = None):
+        self.prompt = prompt
+        self.system_prompt = system_prompt
+        self.done = threading.Event()
+        self.future = future
+        self.result = None
+        self.error = None
+    
+    def finish(self):
+        self.done.set()
+        if self.future is not None and not self.future.done():
+            try:
+                self.future.get_loop().call_soon_threadsafe(self._resolve)
+            except RuntimeError:
+                pass  # The caller timed out and its event loop has since closed
+    
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class BatchingProvider(LLMProvider):
+    """Micro-batches concurrent generate_response calls into provider batch calls
+
+    Requests arriving within window_seconds of the first one (up to
+    max_batch_size) are sent together through the wrapped provider's
+    generate_batch, and each caller gets its own result back. Items the
+    batch returns as errors are retried one by one before their callers see
+    the failure. Batches are dispatched on a small pool so collection of the
+    next batch never waits for the previous one to finish.
+
+    Callers wait at most timeout seconds for their result, by default the
+    window plus two transport deadlines (the batch call, then the single
+    retry); past it they get a TimeoutError, so a stuck batch or a dead
+    collector cannot block them forever.
+    """
+    
+    def __init__(self, provider: LLMProvider, window_seconds: float, max_batch_size: int, max_concurrent_batches: int = 4,
+                 timeout: float = None):
+        self.provider = provider
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout if timeout is not None else window_seconds + 2 * transport.deadline
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix='llm-batch')
+        self.batches = 0
+        self.batched_requests = 0
+        self.retried_requests = 0  # batch items that failed and were retried singly
+        self._dispatcher = threading.Thread(target=self._collect, name='llm-batch-collector', daemon=True)
+        self._dispatcher.start()
+    
+    def is_available(self) -> bool:
+        return self.provider.is_available()
+    
+    def estimate_tokens(self, text: str) -> int:
+        return self.provider.estimate_tokens(text)
+    
+    def stream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> Iterator[str]:
+        return self.provider.stream_response(prompt, system_prompt=system_prompt, **kwargs)
+    
+    def astream_response(self, prompt: str, system_prompt: str = None, **kwargs) -> AsyncIterator[str]:
+        return self.provider.astream_response(prompt, system_prompt=system_prompt, **kwargs)
+    
+    def generate_batch(self, requests: List[tuple]) -> list:
+        return self.provider.generate_batch(requests)
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self.provider.stats())
+        stats['batching'] = {
+            'batches': self.batches,
+            'batched_requests': self.batched_requests,
+            'average_batch_size': self.batched_requests / self.batches if self.batches else 0.0,
+            'retried_requests': self.retried_requests
+        }
+        return stats
+    
+    def generate_response(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
+        if kwargs:
+            # Per-call options cannot be shared across a batch
+            return self.provider.generate_response(prompt, system_prompt=system_prompt, **kwargs)
+        
+        request = _PendingRequest(prompt, system_prompt)
+        self._queue.put(request)
+        if not request.done.wait(self.timeout):
+            raise TimeoutError(f"Batched LLM request timed out after {self.timeout:.0f}s")
+        if request.error is not None:
+            raise request.error
+        return request.result
+    
+    async def agenerate_response(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
+        """Async generate_response: joins the same batches, awaiting a future instead of blocking a thread"""
+        if kwargs:
+            return await self.provider.agenerate_response(prompt, system_prompt=system_prompt, **kwargs)
+        
+        request = _PendingRequest(prompt, system_prompt, asyncio.get_running_loop().create_future())
+        self._queue.put(request)
+        try:
+            await asyncio.wait_for(request.future, self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Batched LLM request timed out after {self.timeout:.0f}s")
+        if request.error is not None:
+            raise request.error
+        return request.result
+    
+    def _collect(self):
+        """Collector loop: group queued requests by window and size, then dispatch"""
+        while True:
+            batch = [self._queue.get()]
+            closes_at = time.monotonic() + self.window_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = closes_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Counters are only written by this single collector thread
+            self.batches += 1
+            self.batched_requests += len(batch)
+            self._executor.submit(self._dispatch, batch)
+    
+    def _dispatch(self, batch: List[_PendingRequest]):
+        try:
+            results = self.provider.generate_batch([(r.prompt, r.system_prompt) for r in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        failed = []
+        for request, result in zip(batch, results):
+            if isinstance(result, Exception):
+                failed.append(request)
+            else:
+                request.result = result
+                request.finish()
+        
+        # One bad item must not fail its caller outright: retry failures on their own,
+        # through generate_response and so the transport's retry policy
+        for request in failed:
+            self.retried_requests += 1
+            try:
+                request.result = self.provider.generate_response(request.prompt, system_prompt=request.system_prompt)
+            except Exception as e:
+                request.error = e
+            request.finish()
+
+
 class LLMProviderFactory:
     """Factory class to create and manage LLM providers"""
     
     _providers = {
         'openai': OpenAIProvider,
         'gemini': GeminiProvider,
-        'anthropic': AnthropicProvider
+        'anthropic': AnthropicProvider,
+        'router': RoutingProvider
     }
     
     _instance = None
+    _cache: Dict[str, LLMProvider] = {}  # provider name -> shared instance
+    _lock = threading.RLock()  # re-entrant: the router builds its providers through _get_cached
+    
+    @classmethod
+    def _get_cached(cls, provider_name: str) -> LLMProvider:
+        """Get the shared instance of a provider, constructing it on first use"""
+        with cls._lock:
+            provider = cls._cache.get(provider_name)
+            if provider is None:
+                provider = cls._providers[provider_name]()
+                cls._cache[provider_name] = provider
+            return provider
+    
+    @classmethod
+    def _get_batched(cls, provider_name: str) -> LLMProvider:
+        """Get the shared micro-batching wrapper around a provider"""
+        with cls._lock:
+            key = f"{provider_name}:batched"
+            provider = cls._cache.get(key)
+            if provider is None:
+                provider = BatchingProvider(
+                    cls._get_cached(provider_name),
+                    window_seconds=config.Config.LLM_BATCH_WINDOW_MS / 1000,
+                    max_batch_size=config.Config.LLM_BATCH_MAX_SIZE
+                )
+                cls._cache[key] = provider
+            return provider
     
     @classmethod
     def get_provider(cls, provider_name: str = None) -> LLMProvider:
@@ -127,8 +942,9 @@ class LLMProviderFactory:
             if provider_name not in cls._providers:
                 raise ValueError(f"Unknown provider: {provider_name}. Available: {list(cls._providers.keys())}")
             
-            provider_class = cls._providers[provider_name]
-            cls._instance = provider_class()
+            cls._instance = cls._get_cached(provider_name)
+            if config.Config.LLM_BATCH_WINDOW_MS > 0 and cls._instance.supports_batching:
+                cls._instance = cls._get_batched(provider_name)
             
             if not cls._instance.is_available():
                 raise ValueError(f"Provider {provider_name} is not available. Please check your API keys.")
@@ -145,9 +961,9 @@ class LLMProviderFactory:
     def list_available_providers(cls) -> List[str]:
         """List all available and configured providers"""
         available = []
-        for name, provider_class in cls._providers.items():
+        for name in cls._providers:
             try:
-                provider = provider_class()
+                provider = cls._get_cached(name)
                 if provider.is_available():
                     available.append(name)
             except:
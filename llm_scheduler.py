@@ -0,0 +1,200 @@
+"""
+LLM Scheduler - Bounded concurrency for LLM calls with per-user fair queuing
+Excess requests wait in a short bounded queue or are turned away at once with a retry hint
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict
+
+
+class SchedulerBusy(Exception):
+    """Raised when a request cannot get an LLM slot in time; carries a Retry-After hint"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('granted', 'event')
+
+    def __init__(self):
+        self.granted = False
+        self.event = threading.Event()
+
+    def grant(self):
+        self.granted = True
+        self.event.set()
+
+
+class _AsyncWaiter:
+    """Waiter for a coroutine; granted from whichever thread releases the slot"""
+    __slots__ = ('granted', 'loop', 'future')
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.granted = False
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def grant(self):
+        self.granted = True
+        self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class LLMScheduler:
+    """Admits at most max_concurrent LLM-bound requests at a time
+
+    Requests that find every slot busy join a per-user FIFO queue. When a
+    slot frees it is handed straight to the head of the next user's queue,
+    round-robin over users, so one user's burst cannot crowd out everyone
+    else. Requests are rejected immediately (SchedulerBusy) when the queue
+    is full, when their user already has max_queue_per_user waiting, or
+    when the wait predicted from the recent average call time exceeds
+    max_wait_seconds; a queued request that still has no slot after
+    max_wait_seconds gives up the same way. Waiting threads therefore stay
+    bounded in number and time when the provider slows down.
+    """
+
+    def __init__(self, max_concurrent: int = 16, max_queue: int = 64, max_queue_per_user: int = 4,
+                 max_wait_seconds: float = 10):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_per_user = max_queue_per_user
+        self.max_wait_seconds = max_wait_seconds
+        self._active = 0
+        self._queued = 0
+        self._queues: "OrderedDict[str, Deque]" = OrderedDict()  # user -> waiters; next user first
+        self._lock = threading.Lock()
+        self._avg_seconds = 0.0  # moving average of slot hold time
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def acquire(self, user: str):
+        """Take a slot for user, waiting in the fair queue if needed; raises SchedulerBusy"""
+        waiter = _Waiter()
+        if self._admit_or_enqueue(user, waiter):
+            return
+        waiter.event.wait(self.max_wait_seconds)
+        self._settle(user, waiter)
+
+    async def aacquire(self, user: str):
+        """Async acquire(): waits on a future instead of blocking a thread"""
+        waiter = _AsyncWaiter(asyncio.get_running_loop())
+        if self._admit_or_enqueue(user, waiter):
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # The caller went away; hand back a slot granted meanwhile, or leave the queue
+            try:
+                self._settle(user, waiter)
+            except SchedulerBusy:
+                pass
+            else:
+                self.release()
+            raise
+        self._settle(user, waiter)
+
+    def _admit_or_enqueue(self, user: str, waiter) -> bool:
+        """Take a free slot (True), queue waiter (False) or raise SchedulerBusy"""
+        with self._lock:
+            if self._active < self.max_concurrent and not self._queued:
+                self._active += 1
+                self.admitted += 1
+                return True
+
+            queue = self._queues.get(user)
+            if self._queued >= self.max_queue:
+                self._reject("LLM queue is full")
+            if queue is not None and len(queue) >= self.max_queue_per_user:
+                self._reject("Too many pending requests for this user")
+            if self._predicted_wait(self._queued + 1) > self.max_wait_seconds:
+                self._reject("Predicted wait exceeds the deadline")
+
+            if queue is None:
+                queue = self._queues[user] = deque()
+            queue.append(waiter)
+            self._queued += 1
+            return False
+
+    def _settle(self, user: str, waiter):
+        """After waiting: keep a granted slot, or leave the queue and raise SchedulerBusy"""
+        with self._lock:
+            if waiter.granted:
+                self.admitted += 1
+                return
+            # Timed out: leave the queue before anyone can grant us the slot
+            queue = self._queues.get(user)
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[user]
+            self._queued -= 1
+            self.timed_out += 1
+            raise SchedulerBusy("Timed out waiting for an LLM slot", self._retry_after())
+
+    def release(self, held_seconds: float = None):
+        """Return a slot, handing it to the next queued user if any"""
+        with self._lock:
+            if held_seconds is not None:
+                self._avg_seconds = held_seconds if not self._avg_seconds else (
+                    0.8 * self._avg_seconds + 0.2 * held_seconds
+                )
+
+            if not self._queued:
+                self._active -= 1
+                return
+
+            user, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user)
+            else:
+                del self._queues[user]
+            self._queued -= 1
+            # The slot passes to the waiter directly, so _active is unchanged
+            waiter.grant()
+
+    @contextmanager
+    def slot(self, user: str):
+        """Hold a slot for the duration of the block"""
+        self.acquire(user)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def _predicted_wait(self, position: int) -> float:
+        return self._avg_seconds * position / self.max_concurrent
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._predicted_wait(self._queued + 1)))
+
+    def _reject(self, reason: str):
+        """Count and raise a rejection; caller holds the lock"""
+        self.rejected += 1
+        raise SchedulerBusy(reason, self._retry_after())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'active': self._active,
+                'queued': self._queued,
+                'queued_users': len(self._queues),
+                'avg_call_seconds': round(self._avg_seconds, 3),
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out
+            }
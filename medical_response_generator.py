@@ -1,86 +1,74 @@
 """
 Medical Response Generator - Creates structured medical responses
 """
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional, Iterator
 from llm_providers import LLMProviderFactory
+from prompt_builder import PromptBuilder
+from response_parser import SECTION_MARKERS, SectionParser, parse_sections
+from response_cache import response_cache
+from translation_memory import translation_memory
+from translation_pipeline import TranslationPipeline
 import config
 
 class MedicalResponseGenerator:
     """Generates structured medical responses using LLM"""
     
+    # Markers that open each section of the structured response
+    SECTION_MARKERS = SECTION_MARKERS
+    
     def __init__(self):
         self.llm_provider = LLMProviderFactory.get_provider()
+        self.strict_sections = config.Config.RESPONSE_PARSER_STRICT
+        self.prompt_builder = PromptBuilder(
+            estimate_tokens=self.llm_provider.estimate_tokens,
+            history_token_budget=config.Config.PROMPT_HISTORY_TOKEN_BUDGET,
+            max_message_tokens=config.Config.PROMPT_MESSAGE_MAX_TOKENS
+        )
+        self.response_cache = response_cache if config.Config.RESPONSE_CACHE_ENABLED else None
+        self.translation_memory = translation_memory
+        self.translation_pipeline = TranslationPipeline(
+            translate_batch=self._translate_batch,
+            estimate_tokens=self.llm_provider.estimate_tokens,
+            max_batch_tokens=config.Config.TRANSLATION_BATCH_TOKENS,
+            max_workers=config.Config.TRANSLATION_MAX_WORKERS,
+            max_retries=config.Config.TRANSLATION_MAX_RETRIES
+        )
     
     def get_system_prompt(self, language: str = 'english') -> str:
         """Get system prompt for medical chatbot"""
-        base_prompt = """You are a medical assistant chatbot that provides informational medical guidance. 
-Your role is to help users understand their symptoms and provide general health information.
-
-IMPORTANT GUIDELINES:
-1. You are NOT a replacement for professional medical advice. Always emphasize consulting healthcare professionals.
-2. Provide information that is educational and informative, not diagnostic.
-3. Be clear about limitations and when professional medical attention is required.
-4. Consider age-appropriate recommendations for medications and treatments.
-5. Provide responses in a structured format as requested.
-
-RESPONSE FORMAT:
-For every symptom-based query, you MUST provide responses in the following structured format:
-
-(A) Brief Summary of the Symptoms
-- Provide a concise explanation of the symptoms provided by the user.
-
-(B) Home Care Recommendations
-- Suggest safe, general remedies or actions the user can perform at home.
-- Include age-appropriate recommendations.
-
-(C) When to Seek Medical Attention
-- Clearly state warning signs or conditions that require consultation with a healthcare professional.
-- Be specific about emergency situations.
-
-(D) Possible Causes
-- List common or likely causes related to the reported symptoms.
-- Explain that these are possibilities, not definitive diagnoses.
-
-Always include a disclaimer that this information is for informational purposes only and does not replace professional medical advice."""
+        return self.prompt_builder.system_prompt(language)
+    
+    def _build_user_prompt(self, symptoms: str, age: str, conversation_history: list = None, conversation_summary: str = None) -> str:
+        """Build the user prompt for a symptom query"""
+        return self.prompt_builder.user_prompt(symptoms, age, conversation_history, summary=conversation_summary)
+    
+    def _cache_for(self, symptoms: str, conversation_history: list = None, conversation_summary: str = None):
+        """Return the response cache if this turn does not depend on earlier messages"""
+        if not self.response_cache:
+            return None
 
-        # Add language-specific instructions if needed
-        if language != 'english':
-            base_prompt += f"\n\nIMPORTANT: Provide all responses in {config.Config.SUPPORTED_LANGUAGES.get(language, language)} language."
-        
-        return base_prompt
+        # The history passed in already ends with the current user message
+        earlier = [m for m in (conversation_history or []) if m.get('content') != symptoms]
+        if earlier or conversation_summary:
+            self.response_cache.record_bypass()
+            return None
+        return self.response_cache
     
     def generate_medical_response(
         self, 
         symptoms: str, 
         age: str, 
         language: str = 'english',
-        conversation_history: list = None
+        conversation_history: list = None,
+        conversation_summary: str = None
     ) -> Dict[str, any]:
         """Generate structured medical response"""
+        cache = self._cache_for(symptoms, conversation_history, conversation_summary)
+        cached = self._cached_result(cache, symptoms, age, language)
+        if cached:
+            return cached
         
-        # Build the user prompt
-        user_prompt = f"""User Age Group: {age}
-User Reported Symptoms: {symptoms}
-
-Please provide medical guidance in the following structured format:
-
-(A) Brief Summary of the Symptoms
-(B) Home Care Recommendations (age-appropriate)
-(C) When to Seek Medical Attention
-(D) Possible Causes
-
-Remember to:
-- Consider the age group when recommending medications or treatments
-- Provide age-appropriate dosage information if suggesting any medications
-- Emphasize when professional medical consultation is necessary
-- Include appropriate disclaimers"""
-
-        # Add conversation context if available
-        if conversation_history:
-            context = "\n\nPrevious conversation context:\n"
-            for msg in conversation_history[-5:]:  # Last 5 messages for context
-                context += f"{msg['role']}: {msg['content']}\n"
-            user_prompt = context + user_prompt
+        user_prompt = self._build_user_prompt(symptoms, age, conversation_history, conversation_summary)
         
         try:
             system_prompt = self.get_system_prompt(language)
@@ -88,18 +76,7 @@ Remember to:
                 prompt=user_prompt,
                 system_prompt=system_prompt
             )
-            
-            # Parse response into structured format
-            structured_response = self._parse_response(response)
-            
-            # Add disclaimer
-            structured_response['disclaimer'] = self._get_disclaimer(language)
-            
-            return {
-                'success': True,
-                'response': structured_response,
-                'raw_response': response
-            }
+            return self._structured_result(response, cache, symptoms, age, language)
         
         except Exception as e:
             return {
@@ -108,60 +85,185 @@ Remember to:
                 'response': None
             }
     
-    def _parse_response(self, response: str) -> Dict[str, str]:
-        """Parse LLM response into structured format"""
-        structured = {
-            'summary': '',
-            'home_care': '',
-            'medical_attention': '',
-            'possible_causes': ''
-        }
+    async def agenerate_medical_response(
+        self, 
+        symptoms: str, 
+        age: str, 
+        language: str = 'english',
+        conversation_history: list = None,
+        conversation_summary: str = None
+    ) -> Dict[str, any]:
+        """Async generate_medical_response; awaits the provider instead of blocking a thread"""
+        cache = self._cache_for(symptoms, conversation_history, conversation_summary)
+        cached = self._cached_result(cache, symptoms, age, language)
+        if cached:
+            return cached
         
-        # Try to extract sections using markers
-        sections = {
-            'summary': ['(A)', 'Brief Summary', 'Summary of the Symptoms'],
-            'home_care': ['(B)', 'Home Care', 'Home Care Recommendations'],
-            'medical_attention': ['(C)', 'When to Seek Medical Attention', 'Seek Medical Attention'],
-            'possible_causes': ['(D)', 'Possible Causes', 'Causes']
-        }
+        user_prompt = self._build_user_prompt(symptoms, age, conversation_history, conversation_summary)
         
-        lines = response.split('\n')
-        current_section = None
-        current_content = []
+        try:
+            system_prompt = self.get_system_prompt(language)
+            response = await self.llm_provider.agenerate_response(
+                prompt=user_prompt,
+                system_prompt=system_prompt
+            )
+            return self._structured_result(response, cache, symptoms, age, language)
         
-        for line in lines:
-            line_upper = line.upper()
-            
-            # Check if this line starts a new section
-            found_section = False
-            for section_name, markers in sections.items():
-                for marker in markers:
-                    if marker.upper() in line_upper:
-                        # Save previous section
-                        if current_section:
-                            structured[current_section] = '\n'.join(current_content).strip()
-                        
-                        # Start new section
-                        current_section = section_name
-                        current_content = [line]
-                        found_section = True
-                        break
-                
-                if found_section:
-                    break
-            
-            if not found_section and current_section:
-                current_content.append(line)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'response': None
+            }
+    
+    @staticmethod
+    def _cached_result(cache, symptoms: str, age: str, language: str) -> Optional[Dict[str, any]]:
+        if not cache:
+            return None
+        cached = cache.get(symptoms, age, language)
+        if not cached:
+            return None
+        return {
+            'success': True,
+            'response': dict(cached['response']),
+            'raw_response': cached['raw_response'],
+            'cached': True
+        }
+    
+    def _structured_result(self, response: str, cache, symptoms: str, age: str, language: str) -> Dict[str, any]:
+        """Parse a raw LLM response, add the disclaimer and cache it"""
+        structured_response = self._parse_response(response)
         
-        # Save last section
-        if current_section:
-            structured[current_section] = '\n'.join(current_content).strip()
+        # Add disclaimer
+        structured_response['disclaimer'] = self._get_disclaimer(language)
         
-        # If parsing failed, return raw response in summary
-        if not any(structured.values()):
-            structured['summary'] = response
+        if cache:
+            cache.put(symptoms, age, language, {
+                'response': dict(structured_response),
+                'raw_response': response
+            })
         
-        return structured
+        return {
+            'success': True,
+            'response': structured_response,
+            'raw_response': response
+        }
+    
+    def stream_medical_response(
+        self,
+        symptoms: str,
+        age: str,
+        language: str = 'english',
+        conversation_history: list = None,
+        conversation_summary: str = None
+    ) -> Iterator[Dict]:
+        """Stream a structured medical response as it is generated
+
+        Yields event dicts keyed by 'event':
+        - 'section': a new section header was detected ('section' names it)
+        - 'delta': one completed line of text belonging to 'section'
+        - 'done': the final structured 'response' plus 'raw_response'
+        - 'error': generation failed ('error' holds the message)
+        """
+        user_prompt = self._build_user_prompt(symptoms, age, conversation_history, conversation_summary)
+        parser = SectionParser(strict=self.strict_sections)
+
+        cache = self._cache_for(symptoms, conversation_history, conversation_summary)
+        cached = cache.get(symptoms, age, language) if cache else None
+
+        try:
+            if cached:
+                # Replay the cached text so clients see the same event sequence
+                chunks = [cached['raw_response']]
+            else:
+                system_prompt = self.get_system_prompt(language)
+                chunks = self.llm_provider.stream_response(prompt=user_prompt, system_prompt=system_prompt)
+
+            raw_parts = []
+
+            for chunk in chunks:
+                raw_parts.append(chunk)
+                yield from parser.feed(chunk)
+
+            yield from parser.close()
+            yield self._stream_done(''.join(raw_parts), cached, cache, symptoms, age, language)
+
+        except Exception as e:
+            yield {
+                'event': 'error',
+                'error': str(e)
+            }
+    
+    async def astream_medical_response(
+        self,
+        symptoms: str,
+        age: str,
+        language: str = 'english',
+        conversation_history: list = None,
+        conversation_summary: str = None
+    ) -> AsyncIterator[Dict]:
+        """Async stream_medical_response; the same events, awaiting the provider's stream"""
+        user_prompt = self._build_user_prompt(symptoms, age, conversation_history, conversation_summary)
+        parser = SectionParser(strict=self.strict_sections)
+
+        cache = self._cache_for(symptoms, conversation_history, conversation_summary)
+        cached = cache.get(symptoms, age, language) if cache else None
+
+        try:
+            raw_parts = []
+
+            if cached:
+                # Replay the cached text so clients see the same event sequence
+                raw_parts.append(cached['raw_response'])
+                for event in parser.feed(cached['raw_response']):
+                    yield event
+            else:
+                system_prompt = self.get_system_prompt(language)
+                async for chunk in self.llm_provider.astream_response(prompt=user_prompt, system_prompt=system_prompt):
+                    raw_parts.append(chunk)
+                    for event in parser.feed(chunk):
+                        yield event
+
+            for event in parser.close():
+                yield event
+            yield self._stream_done(''.join(raw_parts), cached, cache, symptoms, age, language)
+
+        except Exception as e:
+            yield {
+                'event': 'error',
+                'error': str(e)
+            }
+    
+    def _stream_done(self, response: str, cached: Optional[Dict], cache, symptoms: str, age: str, language: str) -> Dict:
+        """The final 'done' event of a streamed response, caching a freshly generated one"""
+        if cached:
+            structured_response = dict(cached['response'])
+        else:
+            structured_response = self._parse_response(response)
+            structured_response['disclaimer'] = self._get_disclaimer(language)
+            if cache:
+                cache.put(symptoms, age, language, {
+                    'response': dict(structured_response),
+                    'raw_response': response
+                })
+
+        return {
+            'event': 'done',
+            'response': structured_response,
+            'raw_response': response
+        }
+    
+    def summarize_conversation(self, previous_summary: Optional[str], messages: list) -> str:
+        """Fold new messages into a conversation's running summary"""
+        max_tokens = config.Config.CONVERSATION_SUMMARY_MAX_TOKENS
+        return self.llm_provider.generate_response(
+            prompt=self.prompt_builder.summary_prompt(previous_summary, messages),
+            system_prompt=self.prompt_builder.summary_system_prompt(max_tokens)
+        )
+    
+    def _parse_response(self, response: str) -> Dict[str, str]:
+        """Parse LLM response into structured format"""
+        return parse_sections(response, strict=self.strict_sections)
     
     def _get_disclaimer(self, language: str = 'english') -> str:
         """Get appropriate disclaimer in the selected language"""
@@ -176,62 +278,93 @@ Remember to:
         
         return disclaimers.get(language.lower(), disclaimers['english'])
 
-    def translate_messages(self, messages: list, target_language: str) -> list:
+    def translate_messages(self, messages: list, target_language: str, source_language: str = None,
+                           llm_slot=None, fallback: bool = True) -> list:
         """Translate a list of message dicts to the target language using the LLM provider.
 
         messages: list of dicts with keys: role, content
+        source_language: language the messages are currently in, if known
+        llm_slot: optional factory for a context manager held around each LLM call
+        fallback: keep the original content for messages that could not be
+            translated; when False those entries are None
         Returns: list of translated content strings in same order
+
+        Messages already in the translation memory are served from it; the
+        remaining ones go through the chunked translation pipeline.
         """
         if not messages:
             return []
 
-        try:
-            # Build a JSON translation request to ensure structured output
-            conversation_text = ''
-            for i, m in enumerate(messages):
-                role = m.get('role', 'user')
-                content = m.get('content', '')
-                conversation_text += f"INDEX:{i} ROLE:{role}\n{content}\n---\n"
-
-            system_prompt = (
-                "You are a professional translator specialized in medical conversations. \n"
-                "Translate the following conversation into the requested language while preserving exact medical meaning, dosages, warnings, structure, and any disclaimers. \n"
-                "Do NOT add, remove, or change medical guidance; only translate.\n"
-                "Return a strict JSON array where each element is an object: {\"index\": <index>, \"role\": \"user|assistant\", \"content\": \"translated text\"}.\n"
-                "If a message contains structured lists or sections, preserve their formatting in the translated text.\n"
-            )
+        translated = [None] * len(messages)
+        pending = []
+        for i, m in enumerate(messages):
+            content = m.get('content', '')
+            remembered = self.translation_memory.lookup(content, target_language) if isinstance(content, str) else None
+            if remembered is not None:
+                translated[i] = remembered
+            else:
+                pending.append(i)
 
-            user_prompt = f"Target Language: {target_language}\n\nConversation:\n{conversation_text}\n\nReturn only a JSON array as described above."
-
-            response = self.llm_provider.generate_response(prompt=user_prompt, system_prompt=system_prompt)
-
-            # Try to parse JSON from the model output
-            import json
-            try:
-                parsed = json.loads(response)
-            except Exception:
-                # Attempt to extract JSON substring
-                import re
-                m = re.search(r"(\[\s*\{.*\}\s*\])", response, re.S)
-                if not m:
-                    raise ValueError("Could not parse translation output as JSON")
-                parsed = json.loads(m.group(1))
-
-            # Build list of translated texts according to indices
-            translated = [None] * len(messages)
-            for item in parsed:
-                idx = int(item.get('index'))
-                text = item.get('content', '')
-                translated[idx] = text
-
-            # Fill any None entries with original content (fallback)
+        if pending:
+            results = self.translation_pipeline.translate([messages[i] for i in pending], target_language, llm_slot)
+            for i, text in zip(pending, results):
+                if text is None:
+                    continue
+                translated[i] = text
+                content = messages[i].get('content', '')
+                if isinstance(content, str):
+                    self.translation_memory.store(content, text, target_language, source_language)
+
+        # Fill any None entries with original content (fallback)
+        if fallback:
             for i, t in enumerate(translated):
                 if t is None:
                     translated[i] = messages[i].get('content', '')
 
-            return translated
+        return translated
 
-        except Exception as e:
-            # On any failure, return original contents as a safe fallback
-            return [m.get('content', '') for m in messages]
+    def _translate_batch(self, messages: list, target_language: str) -> list:
+        """Translate messages with a single LLM call
+
+        Returns a list aligned with messages holding the translated text,
+        or None for any message missing from the model output.
+        """
+        # Build a JSON translation request to ensure structured output
+        conversation_text = ''
+        for i, m in enumerate(messages):
+            role = m.get('role', 'user')
+            content = m.get('content', '')
+            conversation_text += f"INDEX:{i} ROLE:{role}\n{content}\n---\n"
+
+        system_prompt = (
+            "You are a professional translator specialized in medical conversations. \n"
+            "Translate the following conversation into the requested language while preserving exact medical meaning, dosages, warnings, structure, and any disclaimers. \n"
+            "Do NOT add, remove, or change medical guidance; only translate.\n"
+            "Return a strict JSON array where each element is an object: {\"index\": <index>, \"role\": \"user|assistant\", \"content\": \"translated text\"}.\n"
+            "If a message contains structured lists or sections, preserve their formatting in the translated text.\n"
+        )
+
+        user_prompt = f"Target Language: {target_language}\n\nConversation:\n{conversation_text}\n\nReturn only a JSON array as described above."
+
+        response = self.llm_provider.generate_response(prompt=user_prompt, system_prompt=system_prompt)
+
+        # Try to parse JSON from the model output
+        import json
+        try:
+            parsed = json.loads(response)
+        except Exception:
+            # Attempt to extract JSON substring
+            import re
+            m = re.search(r"(\[\s*\{.*\}\s*\])", response, re.S)
+            if not m:
+                raise ValueError("Could not parse translation output as JSON")
+            parsed = json.loads(m.group(1))
+
+        # Build list of translated texts according to indices
+        translated = [None] * len(messages)
+        for item in parsed:
+            idx = int(item.get('index'))
+            if 0 <= idx < len(messages):
+                translated[idx] = item.get('content', '')
 
+        return translated
@@ -0,0 +1,205 @@
+"""
+Message Store - Compact conversation messages shared by the conversation manager and auth store
+Messages are __slots__ records with interned roles and integer epoch timestamps
+"""
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+_FIELDS = ('role', 'content', 'timestamp')
+
+
+def _to_epoch_us(timestamp: Union[str, int, float, None]) -> Union[int, str, None]:
+    """Compact form of a timestamp: epoch microseconds when that renders back to the same string
+
+    Naive ISO strings (as this server writes them) become ints. Anything
+    that would not round-trip exactly, such as "...Z", UTC offsets or
+    unparseable text, is kept as the original string, and a missing
+    timestamp stays None.
+    """
+    if timestamp is None or isinstance(timestamp, int):
+        return timestamp
+    if isinstance(timestamp, float):
+        return int(timestamp)
+    try:
+        dt = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return timestamp
+    if dt.tzinfo is not None:
+        return timestamp
+    epoch_us = int(dt.timestamp()) * 1_000_000 + dt.microsecond
+    return epoch_us if _to_iso(epoch_us) == timestamp else timestamp
+
+
+def _to_iso(epoch_us: Union[int, str, None]) -> Optional[str]:
+    if not isinstance(epoch_us, int):
+        return epoch_us  # Kept as sent (or None)
+    seconds, micros = divmod(epoch_us, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=micros).isoformat()
+
+
+def _now_us() -> int:
+    return time.time_ns() // 1000
+
+
+class Message:
+    """One conversation message
+
+    Reads like the {'role', 'content', 'timestamp'} dicts it replaces
+    (m['content'], m.get('role')), with the timestamp rendered back to ISO
+    format, but stores the role interned and the timestamp as an int where
+    that reproduces the original string exactly. Any other keys a client
+    sends (e.g. the frontend's 'mode') are kept in extra as (key, value)
+    pairs. Use to_dict() wherever a real dict is needed (JSON, persistence).
+    """
+
+    __slots__ = _FIELDS + ('extra',)
+
+    def __init__(self, role: str, content, timestamp: Union[int, str] = None, extra: Tuple = None):
+        self.role = sys.intern(role) if isinstance(role, str) else role
+        self.content = content
+        self.timestamp = _now_us() if timestamp is None else timestamp
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Union[Dict, 'Message']) -> 'Message':
+        if isinstance(data, Message):
+            return data
+        message = cls(data.get('role'), data.get('content'))
+        message.timestamp = _to_epoch_us(data.get('timestamp'))
+        extra = tuple((key, value) for key, value in data.items() if key not in _FIELDS)
+        message.extra = extra or None
+        return message
+
+    def to_dict(self) -> Dict:
+        data = {'role': self.role, 'content': self.content}
+        if self.timestamp is not None:
+            data['timestamp'] = _to_iso(self.timestamp)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key: str):
+        if key == 'timestamp':
+            return _to_iso(self.timestamp)
+        if key in _FIELDS:
+            return getattr(self, key)
+        for name, value in self.extra or ():
+            if name == key:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key == 'timestamp':
+            self.timestamp = _to_epoch_us(value)
+        elif key == 'role':
+            self.role = sys.intern(value)
+        elif key == 'content':
+            self.content = value
+        else:
+            others = tuple(item for item in self.extra or () if item[0] != key)
+            self.extra = others + ((key, value),)
+
+    def pop(self, key: str, default=None):
+        """Remove an extra field, returning its value"""
+        if key in _FIELDS:
+            raise KeyError(key)
+        value = self.get(key, default)
+        others = tuple(item for item in self.extra or () if item[0] != key)
+        self.extra = others or None
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self.keys()
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return _FIELDS + tuple(name for name, _ in self.extra or ())
+
+    def __repr__(self) -> str:
+        return (f"Message(role={self.role!r}, content={self.content!r}, timestamp={self.timestamp!r}"
+                f"{f', extra={self.extra!r}' if self.extra else ''})")
+
+
+def to_dicts(messages: Iterable[Message]) -> List[Dict]:
+    """Plain dict copies of messages, for JSON responses and persistence"""
+    return [m.to_dict() if isinstance(m, Message) else dict(m) for m in messages]
+
+
+class MessageStore:
+    """The single in-memory copy of every conversation's messages
+
+    get() hands out the live list for a conversation; the conversation
+    manager and the auth store both hold that same list, so a message
+    appended by one is immediately visible to the other.
+
+    Conversations open in the conversation manager are pinned, so the auth
+    store never pages their messages out from under it.
+    """
+
+    def __init__(self):
+        self._messages: Dict[str, List[Message]] = {}
+        self._pinned = set()
+        self._lock = threading.Lock()
+
+    def get(self, conversation_id: str) -> List[Message]:
+        """Get the live message list of a conversation, creating it empty"""
+        messages = self._messages.get(conversation_id)
+        if messages is None:
+            with self._lock:
+                messages = self._messages.setdefault(conversation_id, [])
+        return messages
+
+    def peek(self, conversation_id: str) -> Optional[List[Message]]:
+        return self._messages.get(conversation_id)
+
+    def replace(self, conversation_id: str, messages: Iterable) -> List[Message]:
+        """Set a conversation's messages from dicts or Messages, keeping the shared list object"""
+        live = self.get(conversation_id)
+        if messages is not live:
+            live[:] = [Message.from_dict(m) for m in messages]
+        return live
+
+    def append(self, conversation_id: str, role: str, content) -> Message:
+        message = Message(role, content)
+        self.get(conversation_id).append(message)
+        return message
+
+    def discard(self, conversation_id: str):
+        with self._lock:
+            self._messages.pop(conversation_id, None)
+
+    def pin(self, conversation_id: str):
+        with self._lock:
+            self._pinned.add(conversation_id)
+
+    def unpin(self, conversation_id: str):
+        with self._lock:
+            self._pinned.discard(conversation_id)
+
+    def is_pinned(self, conversation_id: str) -> bool:
+        return conversation_id in self._pinned
+
+    def clear(self):
+        with self._lock:
+            self._messages.clear()
+            self._pinned.clear()
+
+    def stats(self) -> Dict:
+        messages = list(self._messages.values())
+        return {
+            'conversations': len(messages),
+            'pinned': len(self._pinned),
+            'messages': sum(len(m) for m in messages)
+        }
+
+
+# Global message store instance
+message_store = MessageStore()
@@ -0,0 +1,127 @@
+"""
+Password Hasher - Salted KDF password hashes computed on a bounded worker pool
+scrypt (memory-hard) or PBKDF2-SHA256, with upgrade of legacy salt:sha256 records
+"""
+import hashlib
+import hmac
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+import config
+
+ALGORITHMS = ('scrypt', 'pbkdf2_sha256')
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem must cover 128 * r * n bytes plus headroom, or OpenSSL refuses larger costs
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * r * (n + p + 2) + 2 ** 20, dklen=32)
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations, dklen=32)
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords with a configurable-cost KDF
+
+    Hashes are self-describing ('scrypt$n$r$p$salt$hash' or
+    'pbkdf2_sha256$iterations$salt$hash'), so the cost can be raised
+    without invalidating stored records; needs_rehash() reports records
+    made with other settings, including legacy 'salt:sha256' ones.
+
+    hashlib releases the GIL while deriving keys, so the work runs on a
+    small thread pool: at most max_workers derivations (each holding
+    128 * r * n bytes for scrypt) run at once, and request threads waiting
+    on them use no CPU, leaving cores free for other requests.
+    """
+
+    def __init__(self, algorithm: str = 'scrypt', scrypt_n: int = 2 ** 14, scrypt_r: int = 8, scrypt_p: int = 1,
+                 pbkdf2_iterations: int = 600_000, max_workers: int = 4):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown password hash algorithm: {algorithm}. Available: {list(ALGORITHMS)}")
+        self.algorithm = algorithm
+        self.scrypt_params = (scrypt_n, scrypt_r, scrypt_p)
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hash')
+        self.hashed = 0
+        self.verified = 0
+
+    def hash(self, password: str) -> str:
+        """Hash password with the current settings"""
+        salt = secrets.token_bytes(16)
+        if self.algorithm == 'scrypt':
+            n, r, p = self.scrypt_params
+            digest = self._executor.submit(_scrypt, password, salt, n, r, p).result()
+            encoded = f"scrypt${n}${r}${p}${salt.hex()}${digest.hex()}"
+        else:
+            digest = self._executor.submit(_pbkdf2, password, salt, self.pbkdf2_iterations).result()
+            encoded = f"pbkdf2_sha256${self.pbkdf2_iterations}${salt.hex()}${digest.hex()}"
+        self.hashed += 1
+        return encoded
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        """Check password against a stored hash in any supported format"""
+        try:
+            if '$' not in stored_hash:
+                # Legacy format: salt:sha256(salt + password), both hex
+                salt, hash_value = stored_hash.split(':')
+                computed = hashlib.sha256(f"{salt}{password}".encode()).hexdigest()
+                return hmac.compare_digest(computed, hash_value)
+
+            algorithm, *params = stored_hash.split('$')
+            if algorithm == 'scrypt':
+                n, r, p, salt, hash_value = params
+                future = self._executor.submit(_scrypt, password, bytes.fromhex(salt), int(n), int(r), int(p))
+            elif algorithm == 'pbkdf2_sha256':
+                iterations, salt, hash_value = params
+                future = self._executor.submit(_pbkdf2, password, bytes.fromhex(salt), int(iterations))
+            else:
+                return False
+            self.verified += 1
+            return hmac.compare_digest(future.result().hex(), hash_value)
+        except (ValueError, TypeError, AttributeError):
+            return False
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True if stored_hash was not made with the current algorithm and cost"""
+        return self._describe(stored_hash) != self._current()
+
+    def _current(self) -> Tuple:
+        if self.algorithm == 'scrypt':
+            return ('scrypt',) + self.scrypt_params
+        return ('pbkdf2_sha256', self.pbkdf2_iterations)
+
+    @staticmethod
+    def _describe(stored_hash: str) -> Tuple:
+        algorithm, *params = stored_hash.split('$')
+        try:
+            if algorithm == 'scrypt':
+                return ('scrypt',) + tuple(int(v) for v in params[:3])
+            if algorithm == 'pbkdf2_sha256':
+                return ('pbkdf2_sha256', int(params[0]))
+        except (ValueError, IndexError):
+            pass
+        return ('legacy',)
+
+    def stats(self) -> Dict:
+        return {
+            'algorithm': self.algorithm,
+            'cost': self._current()[1:],
+            'workers': self.max_workers,
+            'hashed': self.hashed,
+            'verified': self.verified
+        }
+
+
+def create_password_hasher() -> PasswordHasher:
+    """Create a hasher from the configured algorithm and cost"""
+    return PasswordHasher(
+        algorithm=config.Config.PASSWORD_HASH_ALGORITHM,
+        scrypt_n=config.Config.PASSWORD_SCRYPT_N,
+        scrypt_r=config.Config.PASSWORD_SCRYPT_R,
+        scrypt_p=config.Config.PASSWORD_SCRYPT_P,
+        pbkdf2_iterations=config.Config.PASSWORD_PBKDF2_ITERATIONS,
+        max_workers=config.Config.PASSWORD_HASH_WORKERS
+    )
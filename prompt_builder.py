@@ -0,0 +1,170 @@
+"""
+Prompt Builder - Assembles system and user prompts for medical queries
+System prompts are rendered once per language; conversation history is fitted to a token budget
+"""
+import threading
+from typing import Callable, Dict, List
+import config
+
+SYSTEM_PROMPT = """You are a medical assistant chatbot that provides informational medical guidance.
+Your role is to help users understand their symptoms and provide general health information.
+
+IMPORTANT GUIDELINES:
+1. You are NOT a replacement for professional medical advice. Always emphasize consulting healthcare professionals.
+2. Provide information that is educational and informative, not diagnostic.
+3. Be clear about limitations and when professional medical attention is required.
+4. Consider age-appropriate recommendations for medications and treatments.
+5. Provide responses in a structured format as requested.
+
+RESPONSE FORMAT:
+For every symptom-based query, you MUST provide responses in the following structured format:
+
+(A) Brief Summary of the Symptoms
+- Provide a concise explanation of the symptoms provided by the user.
+
+(B) Home Care Recommendations
+- Suggest safe, general remedies or actions the user can perform at home.
+- Include age-appropriate recommendations.
+
+(C) When to Seek Medical Attention
+- Clearly state warning signs or conditions that require consultation with a healthcare professional.
+- Be specific about emergency situations.
+
+(D) Possible Causes
+- List common or likely causes related to the reported symptoms.
+- Explain that these are possibilities, not definitive diagnoses.
+
+Always include a disclaimer that this information is for informational purposes only and does not replace professional medical advice."""
+
+LANGUAGE_INSTRUCTION = "\n\nIMPORTANT: Provide all responses in {language} language."
+
+USER_PROMPT = """User Age Group: {age}
+User Reported Symptoms: {symptoms}
+
+Please provide medical guidance in the following structured format:
+
+(A) Brief Summary of the Symptoms
+(B) Home Care Recommendations (age-appropriate)
+(C) When to Seek Medical Attention
+(D) Possible Causes
+
+Remember to:
+- Consider the age group when recommending medications or treatments
+- Provide age-appropriate dosage information if suggesting any medications
+- Emphasize when professional medical consultation is necessary
+- Include appropriate disclaimers"""
+
+HISTORY_HEADER = "\n\nPrevious conversation context:\n"
+
+SUMMARY_HEADER = "\n\nConversation summary so far:\n{summary}\n"
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a medical chatbot conversation.
+Write in English, in at most {max_words} words. Keep the reported symptoms, their duration and
+severity, relevant age or medical details, advice already given and any warning signs mentioned.
+Drop pleasantries and repeated disclaimers. Reply with the summary text only."""
+
+SUMMARY_PROMPT = """Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Update the summary so it also covers the new messages."""
+
+TRUNCATION_MARK = " [...]"
+
+# Shorter fragments than this are dropped rather than truncated
+MIN_FRAGMENT_TOKENS = 16
+
+
+class PromptBuilder:
+    """Builds prompts with cached system text and a token-budgeted history window
+
+    The history window walks backwards from the newest message, keeping
+    turns verbatim while they fit history_token_budget. A single turn longer
+    than max_message_tokens is cut down to that size first, and whatever
+    older turns no longer fit are replaced by a one-line omission note.
+    """
+
+    def __init__(
+        self,
+        estimate_tokens: Callable[[str], int],
+        history_token_budget: int = 1000,
+        max_message_tokens: int = 300
+    ):
+        self.estimate_tokens = estimate_tokens
+        self.history_token_budget = history_token_budget
+        self.max_message_tokens = max_message_tokens
+        self._system_prompts: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def system_prompt(self, language: str = 'english') -> str:
+        """System prompt for a language, rendered on first use"""
+        prompt = self._system_prompts.get(language)
+        if prompt is None:
+            prompt = SYSTEM_PROMPT
+            if language != 'english':
+                prompt += LANGUAGE_INSTRUCTION.format(
+                    language=config.Config.SUPPORTED_LANGUAGES.get(language, language)
+                )
+            with self._lock:
+                self._system_prompts[language] = prompt
+        return prompt
+
+    def user_prompt(self, symptoms: str, age: str, conversation_history: list = None, summary: str = None) -> str:
+        """User prompt for a symptom query, preceded by the summary and fitted history window
+
+        When a running summary is given, conversation_history should only hold
+        the messages the summary does not cover yet.
+        """
+        prompt = USER_PROMPT.format(age=age, symptoms=symptoms)
+
+        history = list(conversation_history or [])
+        # The current turn is already in the prompt as the reported symptoms
+        if history and history[-1].get('role') == 'user' and history[-1].get('content') == symptoms:
+            history.pop()
+
+        context = SUMMARY_HEADER.format(summary=summary) if summary else ''
+        lines = self.history_window(history)
+        if lines:
+            context += HISTORY_HEADER + '\n'.join(lines) + '\n'
+        return context + prompt
+
+    def summary_system_prompt(self, max_tokens: int) -> str:
+        return SUMMARY_SYSTEM_PROMPT.format(max_words=max(20, max_tokens * 3 // 4))
+
+    def summary_prompt(self, summary: str, messages: List[Dict]) -> str:
+        """Prompt asking the LLM to fold new messages into a running summary"""
+        lines = [
+            self._truncate(f"{m['role']}: {m['content']}", self.max_message_tokens) or f"{m['role']}: [...]"
+            for m in messages
+        ]
+        return SUMMARY_PROMPT.format(summary=summary or '(none yet)', messages='\n'.join(lines))
+
+    def history_window(self, messages: List[Dict]) -> List[str]:
+        """Format the most recent messages that fit the history token budget, oldest first"""
+        remaining = self.history_token_budget
+        lines = []
+
+        for index in range(len(messages) - 1, -1, -1):
+            msg = messages[index]
+            line = self._truncate(f"{msg['role']}: {msg['content']}", min(self.max_message_tokens, remaining))
+            if line is None:
+                lines.append(f"[{index + 1} earlier message(s) omitted]")
+                break
+            lines.append(line)
+            remaining -= self.estimate_tokens(line)
+
+        lines.reverse()
+        return lines
+
+    def _truncate(self, text: str, max_tokens: int):
+        """Cut text down to max_tokens, or None if not even a useful fragment fits"""
+        tokens = self.estimate_tokens(text)
+        if tokens <= max_tokens:
+            return text
+        if max_tokens < MIN_FRAGMENT_TOKENS:
+            return None
+
+        keep = len(text) * (max_tokens - self.estimate_tokens(TRUNCATION_MARK)) // tokens
+        return text[:keep].rstrip() + TRUNCATION_MARK
@@ -0,0 +1,111 @@
+"""
+Rate Limiter - Per-key token buckets and per-route-group concurrency limits
+Keeps auth floods (credential stuffing, mass registration) from starving chat traffic
+"""
+import threading
+import time
+from typing import Dict, Tuple
+
+
+class TokenBucketLimiter:
+    """Token bucket per key (client IP, email, ...)
+
+    Each key may spend `burst` requests at once and regains `rate` per
+    second. A bucket untouched for burst / rate seconds is full again,
+    which is the same as having no entry, so such entries are dropped.
+    Entries are re-inserted on every update, keeping the dict ordered by
+    last use: expired ones are always at the front and are popped in
+    amortized O(1), without a background thread. At most max_keys entries
+    are kept (the least recently used are dropped first).
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.idle_seconds = burst / rate
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated_at), least recent first
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: str) -> float:
+        """Spend one token for key; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.limited += 1
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                del self._buckets[next(iter(self._buckets))]
+        return wait
+
+    def _expire(self, now: float):
+        """Drop buckets that have refilled completely; caller holds the lock"""
+        buckets = self._buckets
+        while buckets:
+            key = next(iter(buckets))
+            if now - buckets[key][1] < self.idle_seconds:
+                break
+            del buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict:
+        return {
+            'keys': len(self._buckets),
+            'rate_per_second': self.rate,
+            'burst': self.burst,
+            'allowed': self.allowed,
+            'limited': self.limited
+        }
+
+
+class ConcurrencyLimiter:
+    """Caps the requests of one route group in flight at once
+
+    try_acquire() never waits: when the group is full the caller rejects
+    the request immediately, so a flood on one group queues nowhere and
+    leaves threads and CPU for the others.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'peak': self.peak,
+            'rejected': self.rejected
+        }
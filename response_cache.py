@@ -0,0 +1,183 @@
+"""
+Response Cache - Reuses medical responses for repeated symptom descriptions
+Bounded LRU/TTL cache keyed on normalized symptoms, age group and language
+"""
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import config
+
+CacheKey = Tuple[str, str, str]  # (normalized symptoms, age group, language)
+
+
+def normalize_symptoms(text: str) -> str:
+    """Normalize free-text symptoms so trivially different spellings share a key
+
+    Case-folds and turns punctuation and runs of whitespace into single
+    spaces, so "Headache, mild fever." and "headache mild  fever" match.
+    Word order and repeats are kept: "chest pain, no fever" and "fever,
+    no chest pain" mean different things and must not share advice.
+    """
+    text = unicodedata.normalize('NFC', text).casefold()
+    text = ''.join(' ' if unicodedata.category(ch).startswith('P') else ch for ch in text)
+    return ' '.join(text.split())
+
+
+def _ngrams(text: str, n: int = 3) -> frozenset:
+    """Character n-grams of a normalized string"""
+    padded = f" {text} "
+    if len(padded) <= n:
+        return frozenset([padded])
+    return frozenset(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry TTL and an optional similarity tier
+
+    The similarity tier keeps an inverted character-trigram index per
+    (age group, language) and serves the closest cached entry whose Jaccard
+    similarity reaches similarity_threshold. A threshold of 0 disables it.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, similarity_threshold: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict]]" = OrderedDict()
+        self._grams: Dict[CacheKey, frozenset] = {}
+        self._index: Dict[Tuple[str, str], Dict[str, set]] = {}  # (age, language) -> ngram -> keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def get(self, symptoms: str, age: str, language: str) -> Optional[Dict]:
+        """Return a cached value for the query, or None on a miss"""
+        normalized = normalize_symptoms(symptoms)
+        key = (normalized, age, language)
+        now = time.monotonic()
+
+        with self._lock:
+            value = self._lookup(key, now)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            if self.similarity_threshold > 0:
+                similar_key = self._find_similar(key)
+                if similar_key is not None:
+                    value = self._lookup(similar_key, now)
+                    if value is not None:
+                        self.similar_hits += 1
+                        return value
+
+            self.misses += 1
+            return None
+
+    def put(self, symptoms: str, age: str, language: str, value: Dict):
+        """Store a value for the query, evicting the least recently used entry if full"""
+        if self.max_entries <= 0:
+            return
+
+        key = (normalize_symptoms(symptoms), age, language)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._add_to_index(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def record_bypass(self):
+        """Count a lookup skipped because the turn depends on conversation context"""
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._grams.clear()
+            self._index.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': (self.hits + self.similar_hits) / lookups if lookups else 0.0
+            }
+
+    def _lookup(self, key: CacheKey, now: float) -> Optional[Dict]:
+        """Return a live entry and mark it most recently used; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < now:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return dict(value)
+
+    def _find_similar(self, key: CacheKey) -> Optional[CacheKey]:
+        """Find the most similar cached key in the same age/language bucket"""
+        bucket = self._index.get(key[1:])
+        if not bucket:
+            return None
+
+        grams = _ngrams(key[0])
+        overlap: Dict[CacheKey, int] = {}
+        for gram in grams:
+            for candidate in bucket.get(gram, ()):
+                overlap[candidate] = overlap.get(candidate, 0) + 1
+
+        best_key, best_score = None, 0.0
+        for candidate, shared in overlap.items():
+            score = shared / (len(grams) + len(self._grams[candidate]) - shared)
+            if score > best_score:
+                best_key, best_score = candidate, score
+
+        return best_key if best_score >= self.similarity_threshold else None
+
+    def _add_to_index(self, key: CacheKey):
+        if self.similarity_threshold <= 0:
+            return
+        grams = _ngrams(key[0])
+        self._grams[key] = grams
+        bucket = self._index.setdefault(key[1:], {})
+        for gram in grams:
+            bucket.setdefault(gram, set()).add(key)
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        grams = self._grams.pop(key, None)
+        if grams:
+            bucket = self._index.get(key[1:], {})
+            for gram in grams:
+                keys = bucket.get(gram)
+                if keys:
+                    keys.discard(key)
+                    if not keys:
+                        del bucket[gram]
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    max_entries=config.Config.RESPONSE_CACHE_MAX_ENTRIES if config.Config.RESPONSE_CACHE_ENABLED else 0,
+    ttl_seconds=config.Config.RESPONSE_CACHE_TTL_SECONDS,
+    similarity_threshold=config.Config.RESPONSE_CACHE_SIMILARITY_THRESHOLD
+)
@@ -0,0 +1,154 @@
+"""
+Response Parser - Splits LLM output into the structured medical response sections
+One precompiled regex finds section headers in a single pass over the text
+"""
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Markers that open each section of the structured response
+SECTION_MARKERS = {
+    'summary': ['(A)', 'Brief Summary', 'Summary of the Symptoms', 'Brief Summary of the Symptoms'],
+    'home_care': ['(B)', 'Home Care', 'Home Care Recommendations'],
+    'medical_attention': ['(C)', 'When to Seek Medical Attention', 'Seek Medical Attention'],
+    'possible_causes': ['(D)', 'Possible Causes', 'Causes']
+}
+
+# Markdown decoration allowed before a header in strict mode: "## ", "**", "> ", "1. ", "A. ", "b) "
+# (patterns are matched against lower-cased text)
+_HEADER_PREFIX = r'[ \t#>*_\-]*(?:(?:\d+|[a-z])[.)][ \t]*)?[*_]*'
+
+# A word marker only counts as a header when nothing but punctuation follows it,
+# optionally after a parenthetical: "Home Care Recommendations (Age-Appropriate):"
+_HEADER_END = r'(?=[ \t]*(?:\([^)\n]*\)[ \t]*)?(?:[:*_#.\-]|$))'
+
+_LETTER_CODE = re.compile(r'\(\w\)')
+
+
+def _section_alternation(strict: bool) -> str:
+    groups = []
+    for section, markers in SECTION_MARKERS.items():
+        options = []
+        # Longest first so "Home Care Recommendations" wins over "Home Care"
+        for marker in sorted(markers, key=len, reverse=True):
+            option = re.escape(marker.lower())
+            if strict and not _LETTER_CODE.fullmatch(marker):
+                option += _HEADER_END
+            options.append(option)
+        groups.append(f"(?P<{section}>{'|'.join(options)})")
+    return '|'.join(groups)
+
+
+def compile_section_pattern(strict: bool = False) -> re.Pattern:
+    """Build the header pattern, matched against lower-cased text
+
+    Loose mode matches a marker anywhere in a line (the original behaviour);
+    a lookahead on the markers' first characters lets the scan skip most
+    positions cheaply. Strict mode only matches lines that start with a
+    marker, after optional markdown decoration, so body text mentioning
+    "causes" is not taken for a header.
+    """
+    if strict:
+        return re.compile(rf"^{_HEADER_PREFIX}(?:{_section_alternation(True)})", re.MULTILINE)
+
+    first_chars = ''.join(sorted({m[0].lower() for markers in SECTION_MARKERS.values() for m in markers}))
+    return re.compile(rf"(?=[{re.escape(first_chars)}])(?:{_section_alternation(False)})")
+
+
+_PATTERNS = {
+    False: compile_section_pattern(strict=False),
+    True: compile_section_pattern(strict=True)
+}
+
+
+def _find_headers(text: str, strict: bool) -> Iterator[Tuple[int, str]]:
+    """Yield (line start offset, section) for each header line in text"""
+    folded = text.lower()
+    if len(folded) != len(text):
+        # Rare characters change length when lower-cased; fall back per character
+        folded = ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+    line_end = -1
+    for match in _PATTERNS[strict].finditer(folded):
+        if match.start() <= line_end:
+            continue  # Only the first marker on a line counts
+        line_start = folded.rfind('\n', 0, match.start()) + 1
+        line_end = folded.find('\n', match.start())
+        if line_end == -1:
+            line_end = len(folded)
+        yield line_start, match.lastgroup
+
+
+def empty_sections() -> Dict[str, str]:
+    return {section: '' for section in SECTION_MARKERS}
+
+
+def parse_sections(response: str, strict: bool = False) -> Dict[str, str]:
+    """Parse LLM response text into the structured sections in one pass
+
+    Each section runs from its header line up to the next header. Text
+    before the first header is dropped; if no header is found the whole
+    response becomes the summary.
+    """
+    structured = empty_sections()
+    current_section, current_start = None, 0
+
+    for line_start, section in _find_headers(response, strict):
+        if current_section:
+            structured[current_section] = response[current_start:line_start].strip()
+        current_section, current_start = section, line_start
+
+    if current_section:
+        structured[current_section] = response[current_start:].strip()
+
+    if not any(structured.values()):
+        structured['summary'] = response
+
+    return structured
+
+
+class SectionParser:
+    """Incremental parser for streamed responses
+
+    feed() accepts arbitrary text chunks and returns events for every line
+    completed so far; close() flushes the final partial line. Events are
+    dicts keyed by 'event': 'section' when a header opens a section and
+    'delta' for each line belonging to the current section.
+    """
+
+    def __init__(self, strict: bool = False):
+        self.strict = strict
+        self._pending = ''
+        self.current_section: Optional[str] = None
+
+    def match_line(self, line: str) -> Optional[str]:
+        """Return the section a single line opens, if any"""
+        for _, section in _find_headers(line, self.strict):
+            return section
+        return None
+
+    def feed(self, chunk: str) -> List[Dict]:
+        self._pending += chunk
+        if '\n' not in chunk:
+            return []
+        complete, _, self._pending = self._pending.rpartition('\n')
+        return self._block_events(complete)
+
+    def close(self) -> List[Dict]:
+        events = self._block_events(self._pending) if self._pending else []
+        self._pending = ''
+        return events
+
+    def _block_events(self, block: str) -> List[Dict]:
+        """Events for a run of complete lines, scanning the block once"""
+        headers = dict(_find_headers(block, self.strict))
+        events = []
+        offset = 0
+        for line in block.split('\n'):
+            section = headers.get(offset)
+            if section:
+                self.current_section = section
+                events.append({'event': 'section', 'section': section})
+            if self.current_section:
+                events.append({'event': 'delta', 'section': self.current_section, 'text': line})
+            offset += len(line) + 1
+        return events
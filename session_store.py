@@ -0,0 +1,348 @@
+"""
+Session Store - Session tokens with expiry, revocation and cached user views
+In-process sessions with a heap sweeper, or signed tokens any worker can validate
+"""
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import config
+
+
+class UserView(dict):
+    """Read-only user info returned by session validation
+
+    A dict subclass so it serializes with jsonify like the plain dicts it
+    replaces, but one instance is shared by every request for that user,
+    so mutation is refused.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("UserView is read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class SessionStore:
+    """Thread-safe in-process session map with TTL expiry
+
+    Each session expires ttl_seconds after it is created. Validation is a
+    single dict lookup plus an expiry check. Expiry times are also pushed
+    onto a min-heap, and every create() pops whatever has expired, so
+    abandoned sessions are reclaimed without a background thread. A per-user
+    index supports revoking all of a user's sessions and caps how many one
+    user may hold (the oldest is dropped first).
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_per_user: int = 10):
+        self.ttl_seconds = ttl_seconds
+        self.max_per_user = max_per_user
+        self._sessions: Dict[str, Tuple[str, float]] = {}  # token -> (email, expires_at)
+        self._by_user: Dict[str, Dict[str, float]] = {}  # email -> {token: expires_at}, oldest first
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, email: str) -> str:
+        """Start a session for email and return its token"""
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        expires_at = now + self.ttl_seconds
+
+        with self._lock:
+            self._sweep(now)
+
+            self._sessions[token] = (email, expires_at)
+            user_tokens = self._by_user.setdefault(email, {})
+            user_tokens[token] = expires_at
+            while len(user_tokens) > self.max_per_user > 0:
+                self._remove(next(iter(user_tokens)))
+
+            heapq.heappush(self._expiry_heap, (expires_at, token))
+            # Revoked sessions leave stale heap entries; rebuild once they dominate
+            if len(self._expiry_heap) > 2 * len(self._sessions) + 64:
+                self._expiry_heap = [(exp, tok) for tok, (_, exp) in self._sessions.items()]
+                heapq.heapify(self._expiry_heap)
+
+        return token
+
+    def get(self, token: str) -> Optional[str]:
+        """Return the email for a live session token"""
+        entry = self._sessions.get(token)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            with self._lock:
+                if self._sessions.get(token) is entry:
+                    self._remove(token)
+                    self.expired += 1
+            return None
+        return entry[0]
+
+    def revoke(self, token: str) -> bool:
+        """End one session"""
+        with self._lock:
+            return self._remove(token)
+
+    def revoke_user(self, email: str) -> bool:
+        """End every session belonging to email"""
+        with self._lock:
+            tokens = list(self._by_user.get(email, ()))
+            for token in tokens:
+                self._remove(token)
+            return bool(tokens)
+
+    def sweep(self) -> int:
+        """Drop expired sessions now; returns how many were dropped"""
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._by_user.clear()
+            self._expiry_heap.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'active_sessions': len(self._sessions),
+                'users': len(self._by_user),
+                'expired': self.expired,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+    def _sweep(self, now: float) -> int:
+        """Pop expired heap entries; caller holds the lock"""
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, token = heapq.heappop(heap)
+            entry = self._sessions.get(token)
+            if entry is not None and entry[1] == expires_at:
+                self._remove(token)
+                removed += 1
+        self.expired += removed
+        return removed
+
+    def _remove(self, token: str) -> bool:
+        entry = self._sessions.pop(token, None)
+        if entry is None:
+            return False
+        user_tokens = self._by_user.get(entry[0])
+        if user_tokens is not None:
+            user_tokens.pop(token, None)
+            if not user_tokens:
+                del self._by_user[entry[0]]
+        return True
+
+
+REVOCATION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS revoked_sessions (
+    nonce TEXT PRIMARY KEY,
+    expires_at INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS user_revocations (
+    email TEXT PRIMARY KEY,
+    revoked_before INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+SELECT_REVOKED = (
+    "SELECT 1 FROM revoked_sessions WHERE nonce = ? "
+    "UNION ALL SELECT 1 FROM user_revocations WHERE email = ? AND revoked_before >= ?"
+)
+INSERT_REVOKED = "INSERT OR IGNORE INTO revoked_sessions (nonce, expires_at) VALUES (?, ?)"
+UPSERT_USER_REVOCATION = (
+    "INSERT INTO user_revocations (email, revoked_before) VALUES (?, ?) "
+    "ON CONFLICT (email) DO UPDATE SET revoked_before = excluded.revoked_before"
+)
+DELETE_EXPIRED_REVOKED = "DELETE FROM revoked_sessions WHERE expires_at < ?"
+DELETE_STALE_USER_REVOCATIONS = "DELETE FROM user_revocations WHERE revoked_before < ?"
+
+# Sweep expired revocation rows every this many new sessions
+SWEEP_EVERY = 256
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def load_session_secret(secret: str = None, secret_file: str = None) -> bytes:
+    """Get the HMAC key shared by all workers
+
+    Uses SESSION_SECRET when set; otherwise reads secret_file, creating it
+    with a random key on first start so restarts and workers on this host
+    agree on the same key.
+    """
+    secret = secret if secret is not None else config.Config.SESSION_SECRET
+    if secret:
+        return secret.encode('utf-8')
+
+    secret_file = secret_file or config.Config.SESSION_SECRET_FILE
+    if not os.path.exists(secret_file):
+        # Write a complete key beside the target, then link it into place:
+        # if several workers race, exactly one key wins and all read it
+        tmp_file = f"{secret_file}.{os.getpid()}.tmp"
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_urlsafe(48))
+        try:
+            os.link(tmp_file, secret_file)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_file)
+
+    with open(secret_file, 'r') as f:
+        return f.read().strip().encode('utf-8')
+
+
+class SignedSessionStore:
+    """Stateless sessions: HMAC-signed tokens carrying the email and expiry
+
+    Any process holding the shared secret validates a token by checking its
+    signature and expiry, so sessions survive restarts and work across
+    worker processes. Logout is the only shared state: revoked token nonces
+    and per-user "revoked before" timestamps live in a small SQLite file
+    (WAL mode) that every worker consults.
+    """
+
+    def __init__(self, secret: bytes, ttl_seconds: float = 86400, revocation_db: str = None):
+        self.secret = secret
+        self.ttl_seconds = ttl_seconds
+        self.revocation_db = revocation_db or config.Config.SESSION_REVOCATION_DB
+        self._local = threading.local()
+        self._created = 0
+        self.rejected = 0
+
+        conn = self._connection()
+        conn.executescript(REVOCATION_SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.revocation_db, timeout=30, cached_statements=16)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self.secret, payload.encode('ascii'), hashlib.sha256).digest())
+
+    def _decode(self, token: str) -> Optional[Tuple[str, int, int, str]]:
+        """Verify a token's signature and expiry; returns (email, issued_ms, expires_ms, nonce)"""
+        payload, _, signature = token.partition('.')
+        try:
+            if not signature or not hmac.compare_digest(signature, self._sign(payload)):
+                return None
+            email, issued_ms, expires_ms, nonce = json.loads(_b64decode(payload))
+        except (ValueError, TypeError):
+            return None
+        if expires_ms <= time.time() * 1000:
+            return None
+        return email, issued_ms, expires_ms, nonce
+
+    def create(self, email: str) -> str:
+        """Issue a signed token for email"""
+        now_ms = int(time.time() * 1000)
+        claims = [email, now_ms, now_ms + int(self.ttl_seconds * 1000), secrets.token_urlsafe(12)]
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+
+        self._created += 1
+        if self._created % SWEEP_EVERY == 0:
+            self.sweep()
+        return f"{payload}.{self._sign(payload)}"
+
+    def get(self, token: str) -> Optional[str]:
+        """Return the email for a valid, unexpired and unrevoked token"""
+        claims = self._decode(token)
+        if claims is None:
+            self.rejected += 1
+            return None
+
+        email, issued_ms, _, nonce = claims
+        if self._connection().execute(SELECT_REVOKED, (nonce, email, issued_ms)).fetchone():
+            return None
+        return email
+
+    def revoke(self, token: str) -> bool:
+        """Revoke one token for every worker"""
+        claims = self._decode(token)
+        if claims is None:
+            return False
+
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(INSERT_REVOKED, (claims[3], claims[2]))
+        return cursor.rowcount > 0
+
+    def revoke_user(self, email: str) -> bool:
+        """Revoke every token issued to email up to now"""
+        conn = self._connection()
+        with conn:
+            conn.execute(UPSERT_USER_REVOCATION, (email, int(time.time() * 1000)))
+        return True
+
+    def sweep(self) -> int:
+        """Drop revocation rows that can no longer match a live token"""
+        now_ms = int(time.time() * 1000)
+        conn = self._connection()
+        with conn:
+            removed = conn.execute(DELETE_EXPIRED_REVOKED, (now_ms,)).rowcount
+            removed += conn.execute(DELETE_STALE_USER_REVOCATIONS, (now_ms - int(self.ttl_seconds * 1000),)).rowcount
+        return removed
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM revoked_sessions")
+            conn.execute("DELETE FROM user_revocations")
+
+    def stats(self) -> Dict:
+        revoked = self._connection().execute("SELECT COUNT(*) FROM revoked_sessions").fetchone()[0]
+        return {
+            'backend': 'signed',
+            'revoked_sessions': revoked,
+            'rejected': self.rejected,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+
+def create_session_store(backend: str = None):
+    """Create the configured session store ('memory' or 'signed')"""
+    backend = (backend or config.Config.SESSION_BACKEND).lower()
+    if backend == 'memory':
+        return SessionStore(
+            ttl_seconds=config.Config.SESSION_TTL_SECONDS,
+            max_per_user=config.Config.SESSION_MAX_PER_USER
+        )
+    if backend == 'signed':
+        return SignedSessionStore(load_session_secret(), ttl_seconds=config.Config.SESSION_TTL_SECONDS)
+    raise ValueError(f"Unknown session backend: {backend}. Available: ['memory', 'signed']")
@@ -6,7 +6,7 @@ import os
 def create_env_file():
     """Create .env file from template if it doesn't exist"""
     env_content = """# LLM Configuration
-LLM_PROVIDER=openai  # Options: openai, gemini, anthropic
+LLM_PROVIDER=openai  # Options: openai, gemini, anthropic, router
 
 # OpenAI Configuration
 OPENAI_API_KEY=your_openai_api_key_here
@@ -0,0 +1,344 @@
+"""
+SQLite Authentication and Data Store
+Embedded database backend for users and conversation history
+"""
+import sqlite3
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+from auth_memory_store import AuthStore, User, Conversation, _message_fingerprints
+from conversation_index import decode_cursor, encode_cursor
+from message_store import Message
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    full_name TEXT,
+    date_of_birth TEXT,
+    password_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    age TEXT,
+    language TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversations_user_updated_id
+    ON conversations (user_id, updated_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (conversation_id, seq)
+) WITHOUT ROWID;
+"""
+
+# Schema changes for existing databases, applied once each in order; PRAGMA user_version counts those applied
+MIGRATIONS = [
+    # 1: the (user_id, updated_at) index was replaced by idx_conversations_user_updated_id
+    "DROP INDEX IF EXISTS idx_conversations_user_updated;",
+]
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache reuses the compiled form on every call
+SELECT_USER = "SELECT id, full_name, date_of_birth, email, password_hash, created_at FROM users WHERE email = ?"
+INSERT_USER = "INSERT INTO users (email, id, full_name, date_of_birth, password_hash, created_at) VALUES (?, ?, ?, ?, ?, ?)"
+UPDATE_PASSWORD_HASH = "UPDATE users SET password_hash = ? WHERE email = ?"
+SELECT_CONVERSATION = "SELECT id, user_id, title, age, language, created_at, updated_at FROM conversations WHERE id = ?"
+SELECT_USER_CONVERSATIONS = (
+    "SELECT id, user_id, title, age, language, created_at, updated_at FROM conversations "
+    "WHERE user_id = ? ORDER BY updated_at DESC"
+)
+# Keyset pagination: the (updated_at, id) of the last row returned is the cursor
+SUMMARY_COLUMNS = (
+    "SELECT id, title, updated_at, (SELECT COUNT(*) FROM messages WHERE conversation_id = conversations.id) "
+    "FROM conversations "
+)
+SELECT_SUMMARIES_FIRST = SUMMARY_COLUMNS + "WHERE user_id = ? ORDER BY updated_at DESC, id DESC LIMIT ?"
+SELECT_SUMMARIES_AFTER = (
+    SUMMARY_COLUMNS + "WHERE user_id = ? AND (updated_at, id) < (?, ?) ORDER BY updated_at DESC, id DESC LIMIT ?"
+)
+UPSERT_CONVERSATION = (
+    "INSERT INTO conversations (id, user_id, title, age, language, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET title = excluded.title, age = excluded.age, "
+    "language = excluded.language, created_at = excluded.created_at, updated_at = excluded.updated_at"
+)
+TOUCH_CONVERSATION = "UPDATE conversations SET updated_at = ? WHERE id = ?"
+SELECT_MESSAGES = "SELECT data FROM messages WHERE conversation_id = ? ORDER BY seq"
+SELECT_MESSAGES_PAGE = "SELECT data FROM messages WHERE conversation_id = ? AND seq >= ? ORDER BY seq LIMIT ?"
+COUNT_MESSAGES = "SELECT COUNT(*) FROM messages WHERE conversation_id = ?"
+DELETE_MESSAGES_FROM = "DELETE FROM messages WHERE conversation_id = ? AND seq >= ?"
+INSERT_MESSAGE = "INSERT INTO messages (conversation_id, seq, data) VALUES (?, ?, ?)"
+
+
+def _encode_message(message: Dict) -> str:
+    if isinstance(message, Message):
+        message = message.to_dict()
+    return json.dumps(message, separators=(',', ':'), ensure_ascii=False)
+
+
+class SQLiteAuthStore(AuthStore):
+    """SQLite-backed authentication and data store
+
+    Uses one connection per thread in WAL mode, so readers never block the
+    writer and several worker processes can share the same database file.
+    Message writes are diffed against fingerprints of what this process
+    last wrote, valid while the conversation's updated_at is still the one
+    it wrote; after another process's write the stored rows are compared.
+    """
+
+    def __init__(self, db_path: str = None):
+        super().__init__()
+        self.db_path = db_path or config.Config.AUTH_SQLITE_PATH
+        self._local = threading.local()
+        # conversation_id -> (updated_at written, message fingerprints), least recently written first
+        self._written: "OrderedDict[str, tuple]" = OrderedDict()
+        self._written_lock = threading.Lock()
+        self.max_written = config.Config.AUTH_RESIDENT_CONVERSATIONS
+
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            conn.executescript(migration)
+            conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get_user(self, email: str) -> Optional[User]:
+        row = self._connection().execute(SELECT_USER, (email,)).fetchone()
+        if not row:
+            return None
+        return User(*row)
+
+    def _add_user(self, user: User) -> bool:
+        conn = self._connection()
+        try:
+            with conn:
+                conn.execute(INSERT_USER, (
+                    user.email, user.id, user.full_name, user.date_of_birth,
+                    user.password_hash, user.created_at
+                ))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def _set_password_hash(self, email: str, password_hash: str) -> bool:
+        conn = self._connection()
+        with conn:
+            return conn.execute(UPDATE_PASSWORD_HASH, (password_hash, email)).rowcount > 0
+
+    def _load_conversation(self, row) -> Conversation:
+        """Build a Conversation from a conversations row plus its messages"""
+        messages = [
+            json.loads(data)
+            for (data,) in self._connection().execute(SELECT_MESSAGES, (row[0],))
+        ]
+        return Conversation(
+            id=row[0],
+            user_id=row[1],
+            title=row[2],
+            messages=messages,
+            age=row[3],
+            language=row[4],
+            created_at=row[5],
+            updated_at=row[6]
+        )
+
+    def _write_messages(self, conn: sqlite3.Connection, conversation_id: str, messages: List,
+                        previous_updated_at: Optional[str], updated_at: str):
+        """Rewrite only the stored messages that differ from the new list
+
+        Runs inside the caller's write transaction, which moves the
+        conversation's updated_at from previous_updated_at to updated_at.
+        """
+        messages = [m if isinstance(m, Message) else Message.from_dict(m) for m in messages]
+        fingerprints = _message_fingerprints(messages)
+        with self._written_lock:
+            written = self._written.get(conversation_id)
+
+        if written is not None and written[0] == previous_updated_at:
+            persisted = written[1]
+            stored_count = len(persisted)
+            if persisted == fingerprints[:stored_count]:
+                start = stored_count  # Appends only, the usual case
+            else:
+                start = 0
+                limit = min(stored_count, len(fingerprints))
+                while start < limit and persisted[start] == fingerprints[start]:
+                    start += 1
+            encoded = [_encode_message(m) for m in messages[start:]]
+        else:
+            # Last written by another process, or not since this one started
+            stored = [data for (data,) in conn.execute(SELECT_MESSAGES, (conversation_id,))]
+            stored_count = len(stored)
+            encoded = [_encode_message(m) for m in messages]
+            start = 0
+            limit = min(stored_count, len(encoded))
+            while start < limit and stored[start] == encoded[start]:
+                start += 1
+            encoded = encoded[start:]
+
+        if start < stored_count:
+            conn.execute(DELETE_MESSAGES_FROM, (conversation_id, start))
+        conn.executemany(INSERT_MESSAGE, [
+            (conversation_id, start + i, data) for i, data in enumerate(encoded)
+        ])
+
+        # Kept even if the transaction then fails: updated_at will not match, so the rows get compared
+        with self._written_lock:
+            self._written[conversation_id] = (updated_at, fingerprints)
+            self._written.move_to_end(conversation_id)
+            while len(self._written) > self.max_written:
+                self._written.popitem(last=False)
+
+    def save_conversation(self, user_email: str, conversation_data: Dict) -> bool:
+        """Save conversation for user"""
+        user = self._get_user(user_email)
+        if not user:
+            return False
+
+        conversation_id = conversation_data.get('id')
+        if not conversation_id:
+            return False
+
+        conn = self._connection()
+        with conn:
+            # Take the write lock first so the row read below is the one this save replaces
+            conn.execute("BEGIN IMMEDIATE")
+            existing = conn.execute(SELECT_CONVERSATION, (conversation_id,)).fetchone()
+            if existing and existing[1] != user.id:
+                return False
+
+            updated_at = datetime.now().isoformat()
+            conn.execute(UPSERT_CONVERSATION, (
+                conversation_id,
+                user.id,
+                conversation_data.get('title', existing[2] if existing else 'New Conversation'),
+                conversation_data.get('age'),
+                conversation_data.get('language', 'english'),
+                conversation_data.get('created_at', existing[5] if existing else updated_at),
+                updated_at
+            ))
+            messages = self._incoming_messages(conversation_id, conversation_data.get('messages', []))
+            self._write_messages(conn, conversation_id, messages, existing[6] if existing else None, updated_at)
+        return True
+
+    def get_user_conversations(self, user_email: str) -> List[Dict]:
+        """Get all conversations for a user"""
+        user = self._get_user(user_email)
+        if not user:
+            return []
+
+        rows = self._connection().execute(SELECT_USER_CONVERSATIONS, (user.id,)).fetchall()
+        return [self._conversation_to_dict(self._load_conversation(row)) for row in rows]
+
+    def list_conversation_summaries(self, user_email: str, limit: int, cursor: str = None) -> Dict:
+        """Get one page of a user's conversation summaries, most recently updated first"""
+        after = decode_cursor(cursor) if cursor else None
+        user = self._get_user(user_email)
+        if not user:
+            return {'conversations': [], 'next_cursor': None}
+
+        # Fetch one extra row to learn whether another page follows
+        conn = self._connection()
+        if after is None:
+            rows = conn.execute(SELECT_SUMMARIES_FIRST, (user.id, limit + 1)).fetchall()
+        else:
+            rows = conn.execute(SELECT_SUMMARIES_AFTER, (user.id, after[0], after[1], limit + 1)).fetchall()
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'conversations': [
+                {'id': row[0], 'title': row[1], 'updated_at': row[2], 'message_count': row[3]}
+                for row in rows
+            ],
+            'next_cursor': encode_cursor((rows[-1][2], rows[-1][0])) if more else None
+        }
+
+    def get_conversation(self, conversation_id: str, user_email: str) -> Optional[Dict]:
+        """Get specific conversation for user"""
+        row = self._connection().execute(SELECT_CONVERSATION, (conversation_id,)).fetchone()
+        if not row:
+            return None
+
+        # Verify ownership
+        user = self._get_user(user_email)
+        if not user or row[1] != user.id:
+            return None
+
+        return self._conversation_to_dict(self._load_conversation(row))
+
+    def get_conversation_messages(self, conversation_id: str, user_email: str, offset: int, limit: int) -> Optional[Dict]:
+        """Get one page of a conversation's messages, oldest first"""
+        conn = self._connection()
+        row = conn.execute(SELECT_CONVERSATION, (conversation_id,)).fetchone()
+        if not row:
+            return None
+
+        # Verify ownership
+        user = self._get_user(user_email)
+        if not user or row[1] != user.id:
+            return None
+
+        # Read both in one transaction so the total matches the page
+        with conn:
+            conn.execute("BEGIN")
+            messages = [
+                json.loads(data)
+                for (data,) in conn.execute(SELECT_MESSAGES_PAGE, (conversation_id, offset, limit))
+            ]
+            total = conn.execute(COUNT_MESSAGES, (conversation_id,)).fetchone()[0]
+        return self._messages_page(conversation_id, messages, offset, total)
+
+    def update_conversation_messages(self, conversation_id: str, messages: List[Dict], user_email: str) -> bool:
+        """Update messages in a conversation"""
+        user = self._get_user(user_email)
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(SELECT_CONVERSATION, (conversation_id,)).fetchone()
+            # Verify ownership
+            if not row or not user or row[1] != user.id:
+                return False
+
+            updated_at = datetime.now().isoformat()
+            conn.execute(TOUCH_CONVERSATION, (updated_at, conversation_id))
+            self._write_messages(
+                conn, conversation_id, self._incoming_messages(conversation_id, messages), row[6], updated_at
+            )
+        return True
+
+    def clear_all_data(self):
+        """Clear all data (for testing/reset)"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM messages")
+            conn.execute("DELETE FROM conversations")
+            conn.execute("DELETE FROM users")
+        with self._written_lock:
+            self._written.clear()
+        self.sessions.clear()
+        self._user_views.clear()
@@ -0,0 +1,73 @@
+"""
+Shared test setup - Keeps every data file the modules create at import in a temporary directory
+"""
+import itertools
+import os
+import sys
+import tempfile
+import pytest
+
+_data_dir = tempfile.TemporaryDirectory(prefix='tests-')  # removed when the test run exits
+os.environ.setdefault('SESSION_BACKEND', 'memory')
+os.environ.setdefault('AUTH_DATA_FILE', os.path.join(_data_dir.name, 'auth_data.json'))
+os.environ.setdefault('TRANSLATION_JOBS_DB', os.path.join(_data_dir.name, 'translation_jobs.db'))
+os.environ.setdefault('PASSWORD_SCRYPT_N', '1024')  # keep registrations fast
+os.environ.setdefault('AUTH_RATE_LIMIT_ENABLED', 'False')
+os.environ.setdefault('CONVERSATION_SUMMARY_ENABLED', 'False')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUB_REPLY = "(A) Brief Summary\nRest and fluids\n(B) Home Care Recommendations\nDrink water"
+
+_emails = itertools.count()
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    """app.py imported with a stub LLM provider that records its prompts"""
+    from llm_providers import LLMProvider, LLMProviderFactory
+
+    class StubProvider(LLMProvider):
+        def __init__(self):
+            self.prompts = []
+
+        def is_available(self):
+            return True
+
+        def generate_response(self, prompt, system_prompt=None, **kwargs):
+            self.prompts.append(prompt)
+            return STUB_REPLY
+
+    get_provider = LLMProviderFactory.__dict__['get_provider']
+    LLMProviderFactory.get_provider = classmethod(lambda cls, provider_name=None: StubProvider())
+    try:
+        import app
+    finally:
+        LLMProviderFactory.get_provider = get_provider
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Headers for a freshly registered user"""
+    response = client.post('/api/auth/register', json={
+        'full_name': 'Test User',
+        'date_of_birth': '1990-01-01',
+        'email': f"user{next(_emails)}@example.com",
+        'password': 'secret123'
+    })
+    return {'Authorization': f"Bearer {response.get_json()['session_token']}"}
+
+
+@pytest.fixture
+def ready_conversation(client, auth_headers):
+    """Id of a conversation with age and language set"""
+    conversation_id = client.post('/api/conversation/start', headers=auth_headers, json={}).get_json()['conversation_id']
+    client.post(f'/api/conversation/{conversation_id}/age', headers=auth_headers, json={'age': '18-64 years (Adult)'})
+    client.post(f'/api/conversation/{conversation_id}/language', headers=auth_headers, json={'language': 'english'})
+    return conversation_id
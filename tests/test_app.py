@@ -0,0 +1,85 @@
+"""
+Tests for the Flask API routes
+"""
+import os
+import subprocess
+import sys
+import time
+
+
+def test_client_save_does_not_rewrite_live_conversation(app_module, client, auth_headers, ready_conversation):
+    chat = client.post(f'/api/conversation/{ready_conversation}/chat', headers=auth_headers, json={'message': 'headache'})
+    assert chat.status_code == 200
+    live = app_module.conversation_manager.get_conversation(ready_conversation)['messages']
+    before = [(m['role'], m['content']) for m in live]
+
+    # The frontend saves its own copy, with the assistant reply as a parsed dict
+    saved = client.post('/api/user/conversations', headers=auth_headers, json={'conversation': {
+        'id': ready_conversation,
+        'title': 'Headache',
+        'messages': [
+            {'role': 'user', 'content': 'headache', 'mode': 'symptom'},
+            {'role': 'user', 'content': 'headache'},
+            {'role': 'assistant', 'content': chat.get_json()['response'], 'mode': 'symptom'}
+        ]
+    }})
+    assert saved.status_code == 200
+
+    assert app_module.conversation_manager.get_conversation(ready_conversation)['messages'] is live
+    assert [(m['role'], m['content']) for m in live] == before
+
+    client.post(f'/api/conversation/{ready_conversation}/chat', headers=auth_headers, json={'message': 'still hurts'})
+    prompt = app_module.medical_generator.llm_provider.prompts[-1]
+    assert prompt.count('headache') == 1
+    assert "{'summary'" not in prompt
+
+    stored = client.get('/api/user/conversations', headers=auth_headers).get_json()['conversations']
+    assert stored[0]['title'] == 'Headache'
+    messages = stored[0]['messages']
+    assert [m['role'] for m in messages] == [m['role'] for m in live]
+    # The reply comes back structured, with the client's mode, as the frontend saved it
+    assert messages[1]['content'] == chat.get_json()['response']
+    assert messages[0]['mode'] == messages[1]['mode'] == 'symptom'
+    assert 'response' not in messages[1]
+
+
+def test_invalid_chat_does_not_take_a_scheduler_slot(app_module, client, auth_headers, ready_conversation):
+    admitted = app_module.llm_scheduler.stats()['admitted']
+
+    empty = client.post(f'/api/conversation/{ready_conversation}/chat', headers=auth_headers, json={'message': ' '})
+    unknown = client.post('/api/conversation/no-such-id/chat', headers=auth_headers, json={'message': 'headache'})
+    streamed = client.post('/api/conversation/no-such-id/chat/stream', headers=auth_headers, json={'message': 'hi'})
+
+    assert (empty.status_code, unknown.status_code, streamed.status_code) == (400, 404, 404)
+    assert app_module.llm_scheduler.stats()['admitted'] == admitted
+
+
+def test_language_switch_runs_a_pollable_translation_job(client, auth_headers, ready_conversation):
+    client.post(f'/api/conversation/{ready_conversation}/chat', headers=auth_headers, json={'message': 'headache'})
+    switched = client.post(f'/api/conversation/{ready_conversation}/language', headers=auth_headers,
+                           json={'language': 'hindi'}).get_json()
+    job_id = switched['translation_job']['id']
+
+    for _ in range(200):
+        job = client.get(f'/api/translation-jobs/{job_id}', headers=auth_headers).get_json()
+        if job['status'] not in ('queued', 'running'):
+            break
+        time.sleep(0.01)
+
+    # The stub LLM never answers in the translation format, so nothing is translated
+    assert (job['status'], job['partial']) == ('failed', False)
+    assert job['conversation_id'] == ready_conversation
+
+
+def test_session_files_default_to_the_auth_data_directory(tmp_path):
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data_dir = tmp_path / 'data'
+    env = dict(os.environ, PYTHONPATH=repo, AUTH_DATA_FILE=str(data_dir / 'auth_data.json'))
+    env.pop('SESSION_SECRET_FILE', None)
+    env.pop('SESSION_REVOCATION_DB', None)
+    output = subprocess.run(
+        [sys.executable, '-c', 'import config; print(config.Config.SESSION_SECRET_FILE); '
+                               'print(config.Config.SESSION_REVOCATION_DB)'],
+        cwd=str(tmp_path), env=env, check=True, capture_output=True, text=True
+    ).stdout.split()
+    assert output == [str(data_dir / 'session_secret.key'), str(data_dir / 'sessions.db')]
@@ -0,0 +1,133 @@
+"""
+Tests for the ASGI entry point, driven directly with asyncio
+"""
+import asyncio
+import json
+import threading
+import time
+import pytest
+from llm_providers import LLMProvider
+from conftest import STUB_REPLY
+
+
+@pytest.fixture
+def asgi(app_module):
+    import asgi
+    return asgi
+
+
+def _call(asgi, method, path, headers, payload=None, disconnect=False, disconnect_after=None):
+    body = json.dumps(payload).encode() if payload is not None else b''
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+        'headers': [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+                   + [(b'content-type', b'application/json')]
+    }
+    incoming = [{'type': 'http.disconnect'}] if disconnect else [{'type': 'http.request', 'body': body}]
+    sent = []
+    gone = None
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        await gone.wait()  # Like a server, only answer once the client goes away
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+        if disconnect_after and disconnect_after(message):
+            gone.set()
+
+    async def run():
+        nonlocal gone
+        gone = asyncio.Event()
+        await asgi.app(scope, receive, send)
+
+    asyncio.run(run())
+    return sent
+
+
+def test_chat_keeps_blocking_work_off_the_event_loop(asgi, auth_headers, ready_conversation, monkeypatch):
+    threads = []
+    prepare_chat = asgi._prepare_chat
+
+    def recording_prepare_chat(conversation_id):
+        threads.append(threading.current_thread().name)
+        return prepare_chat(conversation_id)
+
+    monkeypatch.setattr(asgi, '_prepare_chat', recording_prepare_chat)
+    sent = _call(asgi, 'POST', f'/api/conversation/{ready_conversation}/chat', auth_headers, {'message': 'headache'})
+
+    assert sent[0]['status'] == 200
+    assert json.loads(sent[1]['body'])['success']
+    assert threads and threads[0].startswith('asgi-wsgi')
+
+
+def test_invalid_asgi_chat_does_not_take_a_scheduler_slot(asgi, auth_headers):
+    admitted = asgi.llm_scheduler.stats()['admitted']
+    sent = _call(asgi, 'POST', '/api/conversation/no-such-id/chat', auth_headers, {'message': 'headache'})
+    assert sent[0]['status'] == 404
+    assert asgi.llm_scheduler.stats()['admitted'] == admitted
+
+
+def test_disconnect_before_body_ends_quietly(asgi, auth_headers, ready_conversation):
+    assert _call(asgi, 'POST', f'/api/conversation/{ready_conversation}/chat', auth_headers, disconnect=True) == []
+
+
+class AsyncStreamingProvider(LLMProvider):
+    """Streams STUB_REPLY line by line through astream_response only, optionally stalling after the first"""
+
+    def __init__(self, stall=False):
+        self.stall = stall
+        self.closed = False
+
+    def is_available(self):
+        return True
+
+    def generate_response(self, prompt, system_prompt=None, **kwargs):
+        raise AssertionError("the stream must not block a thread")
+
+    async def astream_response(self, prompt, system_prompt=None, **kwargs):
+        try:
+            for i, line in enumerate(STUB_REPLY.splitlines(keepends=True)):
+                if i and self.stall:
+                    await asyncio.sleep(60)
+                yield line
+        finally:
+            self.closed = True
+
+
+def _events(sent):
+    body = b''.join(m.get('body', b'') for m in sent[1:]).decode()
+    return [block.split('\n')[0][len('event: '):] for block in body.split('\n\n') if block]
+
+
+def test_stream_is_served_on_the_event_loop(asgi, app_module, auth_headers, ready_conversation, monkeypatch):
+    monkeypatch.setattr(app_module.medical_generator, 'llm_provider', AsyncStreamingProvider())
+
+    sent = _call(asgi, 'POST', f'/api/conversation/{ready_conversation}/chat/stream', auth_headers,
+                 {'message': 'sore throat streamed natively'})
+
+    assert sent[0]['status'] == 200
+    assert (b'content-type', b'text/event-stream; charset=utf-8') in sent[0]['headers']
+    events = _events(sent)
+    assert events[0] == 'section' and events[-1] == 'done'
+    messages = app_module.conversation_manager.get_conversation(ready_conversation)['messages']
+    assert [m['role'] for m in messages] == ['user', 'assistant']
+
+
+def test_disconnect_mid_stream_stops_generation_and_frees_slots(asgi, app_module, auth_headers, ready_conversation,
+                                                                monkeypatch):
+    provider = AsyncStreamingProvider(stall=True)
+    monkeypatch.setattr(app_module.medical_generator, 'llm_provider', provider)
+    admitted = asgi.chat_admission.in_flight
+
+    started = time.monotonic()
+    sent = _call(asgi, 'POST', f'/api/conversation/{ready_conversation}/chat/stream', auth_headers,
+                 {'message': 'earache then hang up'}, disconnect_after=lambda m: m['type'] == 'http.response.body')
+
+    assert time.monotonic() - started < 5
+    assert provider.closed
+    assert 'done' not in _events(sent)
+    assert asgi.chat_admission.in_flight == admitted
+    assert asgi.llm_scheduler.stats()['active'] == 0
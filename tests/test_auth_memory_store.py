@@ -0,0 +1,84 @@
+"""
+Tests for the journaled in-memory auth store
+"""
+from auth_memory_store import InMemoryAuthStore
+from message_store import Message, message_store
+
+
+def _store(tmp_path):
+    return InMemoryAuthStore(data_file=str(tmp_path / 'auth_data.json'))
+
+
+def test_save_conversation_with_dict_content(tmp_path):
+    store = _store(tmp_path)
+    assert store.register_user('Ann', '1990-01-01', 'ann@example.com', 'secret123')['success']
+
+    reply = {'summary': 'Rest', 'home_care': 'Fluids', 'disclaimer': 'Not medical advice'}
+    conversation = {
+        'id': 'conv-dict',
+        'title': 'Headache',
+        'messages': [
+            {'role': 'user', 'content': 'headache', 'timestamp': '2024-01-01T10:00:00'},
+            {'role': 'assistant', 'content': reply, 'timestamp': '2024-01-01T10:00:05'}
+        ]
+    }
+    assert store.save_conversation('ann@example.com', conversation)
+    # A second save diffs against the first by fingerprint
+    conversation['messages'].append({'role': 'user', 'content': 'thanks', 'timestamp': '2024-01-01T10:01:00'})
+    assert store.save_conversation('ann@example.com', conversation)
+
+    message_store.discard('conv-dict')
+    reloaded = _store(tmp_path)
+    saved = reloaded.get_conversation('conv-dict', 'ann@example.com')
+    assert [m['content'] for m in saved['messages']] == ['headache', reply, 'thanks']
+
+
+def test_in_place_edit_is_persisted_after_appends(tmp_path):
+    store = _store(tmp_path)
+    assert store.register_user('Bo', '1990-01-01', 'bo@example.com', 'secret123')['success']
+    messages = [{'role': 'user', 'content': f"message {i}", 'timestamp': '2024-01-01T10:00:00'} for i in range(3)]
+    assert store.save_conversation('bo@example.com', {'id': 'conv-edit', 'messages': messages})
+
+    live = store.conversations['conv-edit'].messages
+    live.append(Message('assistant', 'reply'))
+    assert store.update_conversation_messages('conv-edit', live, 'bo@example.com')
+    live[1]['content'] = 'translated'  # as translate_conversation does
+    assert store.update_conversation_messages('conv-edit', live, 'bo@example.com')
+
+    message_store.discard('conv-edit')
+    saved = _store(tmp_path).get_conversation('conv-edit', 'bo@example.com')
+    assert [m['content'] for m in saved['messages']] == ['message 0', 'translated', 'message 2', 'reply']
+
+
+def test_client_fields_and_timestamps_survive_save_and_reload(tmp_path):
+    store = _store(tmp_path)
+    assert store.register_user('Cy', '1990-01-01', 'cy@example.com', 'secret123')['success']
+    messages = [
+        {'role': 'user', 'content': 'headache', 'timestamp': '2024-01-01T10:00:00.123Z'},
+        {'role': 'assistant', 'content': {'summary': 'Rest'}, 'timestamp': '2024-01-01T10:00:05+05:30',
+         'mode': 'medical'},
+        {'role': 'assistant', 'content': 'Hello', 'mode': 'general'},
+        {'role': 'user', 'content': 'thanks', 'timestamp': '2024-01-01T10:01:00'}
+    ]
+    assert store.save_conversation('cy@example.com', {'id': 'conv-fields', 'messages': messages})
+
+    message_store.discard('conv-fields')
+    assert _store(tmp_path).get_conversation('conv-fields', 'cy@example.com')['messages'] == messages
+
+    # Compaction writes the snapshot and bodies files instead of the journal
+    reloaded = _store(tmp_path)
+    reloaded._compact()
+    message_store.discard('conv-fields')
+    assert _store(tmp_path).get_conversation('conv-fields', 'cy@example.com')['messages'] == messages
+
+
+def test_changing_only_a_client_field_is_persisted(tmp_path):
+    store = _store(tmp_path)
+    assert store.register_user('Di', '1990-01-01', 'di@example.com', 'secret123')['success']
+    message = {'role': 'assistant', 'content': 'Hello', 'timestamp': '2024-01-01T10:00:00', 'mode': 'general'}
+    assert store.save_conversation('di@example.com', {'id': 'conv-mode', 'messages': [message]})
+    assert store.save_conversation('di@example.com', {'id': 'conv-mode', 'messages': [dict(message, mode='medical')]})
+
+    message_store.discard('conv-mode')
+    saved = _store(tmp_path).get_conversation('conv-mode', 'di@example.com')
+    assert saved['messages'][0]['mode'] == 'medical'
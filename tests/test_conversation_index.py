@@ -0,0 +1,51 @@
+"""
+Tests for the per-user conversation index
+"""
+import random
+from conversation_index import ConversationIndex
+
+
+def test_loaded_refs_page_newest_first():
+    index = ConversationIndex([
+        {'id': 'b', 'title': 'B', 'updated_at': '2024-01-02'},
+        {'id': 'a', 'title': 'A', 'updated_at': '2024-01-03'},
+        {'id': 'c', 'title': 'C', 'updated_at': '2024-01-01'},
+        {'id': 'b', 'title': 'B again', 'updated_at': '2024-01-04'}
+    ])
+
+    ids, after = index.page(2)
+    assert ids == ['b', 'a']
+    assert index.page(2, after) == (['c'], None)
+    assert index.get('b')['title'] == 'B again'
+    assert [ref['id'] for ref in index.to_list()] == ['b', 'a', 'c']
+
+
+def test_touch_and_discard_keep_the_order():
+    index = ConversationIndex([{'id': 'a', 'updated_at': '1'}, {'id': 'b', 'updated_at': '2'}])
+    index.touch('a', '3', title='A')
+    index.touch('c', '0')
+    index.discard('b')
+    assert index.page(10) == (['a', 'c'], None)
+
+
+def test_random_updates_page_like_a_sorted_list():
+    rng = random.Random(7)
+    index, updated = ConversationIndex(), {}
+    for step in range(2000):
+        conversation_id = f"c{rng.randrange(200)}"
+        if rng.random() < 0.2:
+            index.discard(conversation_id)
+            updated.pop(conversation_id, None)
+        else:
+            updated[conversation_id] = f"{rng.randrange(500):04d}"
+            index.touch(conversation_id, updated[conversation_id])
+
+    expected = [cid for _, cid in sorted(((at, cid) for cid, at in updated.items()), reverse=True)]
+    pages, after = [], None
+    while True:
+        ids, after = index.page(7, after)
+        pages.extend(ids)
+        if after is None:
+            break
+    assert pages == expected
+    assert len(index) == len(updated)
@@ -0,0 +1,204 @@
+"""
+Tests for the provider wrappers (routing, micro-batching)
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from llm_providers import BatchingProvider, LLMProvider, LLMProviderFactory, RoutingProvider
+
+
+class FlakyBatchProvider(LLMProvider):
+    """Fails prompts in `fail_in_batch` when batched; single calls succeed unless in `always_fail`"""
+
+    def __init__(self, fail_in_batch=(), always_fail=()):
+        self.fail_in_batch = set(fail_in_batch)
+        self.always_fail = set(always_fail)
+        self.single_calls = []
+        self.lock = threading.Lock()
+
+    def is_available(self):
+        return True
+
+    def generate_response(self, prompt, system_prompt=None, **kwargs):
+        with self.lock:
+            self.single_calls.append(prompt)
+        if prompt in self.always_fail:
+            raise ValueError(f"bad {prompt}")
+        return f"re: {prompt}"
+
+    def generate_batch(self, requests):
+        return [
+            ValueError(f"batch item {prompt}") if prompt in self.fail_in_batch else f"re: {prompt}"
+            for prompt, _ in requests
+        ]
+
+
+def _run_concurrently(provider, prompts):
+    def call(prompt):
+        try:
+            return provider.generate_response(prompt)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+        return dict(zip(prompts, pool.map(call, prompts)))
+
+
+def test_failed_batch_items_are_retried_singly():
+    inner = FlakyBatchProvider(fail_in_batch={'b'})
+    provider = BatchingProvider(inner, window_seconds=0.05, max_batch_size=8)
+
+    results = _run_concurrently(provider, ['a', 'b', 'c'])
+
+    assert results == {'a': 're: a', 'b': 're: b', 'c': 're: c'}
+    assert inner.single_calls == ['b']
+    assert provider.stats()['batching']['retried_requests'] == 1
+
+
+def test_item_failing_again_reaches_only_its_caller():
+    inner = FlakyBatchProvider(fail_in_batch={'b'}, always_fail={'b'})
+    provider = BatchingProvider(inner, window_seconds=0.05, max_batch_size=8)
+
+    results = _run_concurrently(provider, ['a', 'b'])
+
+    assert results['a'] == 're: a'
+    with pytest.raises(ValueError):
+        raise results['b']
+
+
+class AsyncOnlyProvider(LLMProvider):
+    """Answers only through agenerate_response, after `delay` seconds"""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+
+    def is_available(self):
+        return True
+
+    def generate_response(self, prompt, system_prompt=None, **kwargs):
+        raise AssertionError("the async path must not block a thread")
+
+    async def agenerate_response(self, prompt, system_prompt=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ValueError(f"{self.name} failed")
+        return f"{self.name}: {prompt}"
+
+    def generate_batch(self, requests):
+        return [f"{self.name}: {prompt}" for prompt, _ in requests]
+
+
+def _router(*providers):
+    for provider in providers:
+        LLMProviderFactory._cache[f"test-{provider.name}"] = provider
+    return RoutingProvider([f"test-{provider.name}" for provider in providers])
+
+
+def test_async_routing_hedges_to_the_faster_provider():
+    router = _router(AsyncOnlyProvider('slow', delay=1.0), AsyncOnlyProvider('fast', delay=0.01))
+    router.default_hedge_delay = 0.05
+
+    async def run():
+        started = time.monotonic()
+        result = await router.agenerate_response('hi')
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(run())
+    assert result == 'fast: hi'
+    assert elapsed < 0.5
+
+
+def test_async_routing_fails_over():
+    router = _router(AsyncOnlyProvider('down', fail=True), AsyncOnlyProvider('up'))
+    assert asyncio.run(router.agenerate_response('hi')) == 'up: hi'
+    assert router.breakers['test-down'].failures == 1
+
+
+def test_async_batching_joins_a_batch():
+    provider = BatchingProvider(AsyncOnlyProvider('batch'), window_seconds=0.05, max_batch_size=8)
+
+    async def run():
+        return await asyncio.gather(*(provider.agenerate_response(f"q{i}") for i in range(4)))
+
+    assert asyncio.run(run()) == [f"batch: q{i}" for i in range(4)]
+    assert provider.stats()['batching']['batches'] == 1
+
+
+class StreamingProvider(LLMProvider):
+    def __init__(self, name):
+        self.name = name
+
+    def is_available(self):
+        return True
+
+    def generate_response(self, prompt, system_prompt=None, **kwargs):
+        return 'unused'
+
+    def stream_response(self, prompt, system_prompt=None, **kwargs):
+        yield from ['one', 'two', 'three']
+
+
+def _half_open(breaker):
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    assert breaker.state == 'half_open'
+
+
+def test_closing_a_half_open_stream_early_frees_the_trial():
+    router = _router(StreamingProvider('stream'))
+    breaker = router.breakers['test-stream']
+    _half_open(breaker)
+
+    stream = router.stream_response('hi')
+    assert next(stream) == 'one'
+    stream.close()  # the client went away mid-stream
+
+    assert breaker.state == 'closed'
+    assert list(router.stream_response('hi')) == ['one', 'two', 'three']
+
+
+def test_cancelled_half_open_call_frees_the_trial():
+    router = _router(AsyncOnlyProvider('hung', delay=10))
+    breaker = router.breakers['test-hung']
+    _half_open(breaker)
+
+    async def run():
+        task = asyncio.ensure_future(router._atimed_call('test-hung', router.providers[0][1], 'hi', None, {}))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert breaker.allow()  # takes the trial
+    asyncio.run(run())
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+
+
+class HangingBatchProvider(FlakyBatchProvider):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def generate_batch(self, requests):
+        self.release.wait(5)
+        return super().generate_batch(requests)
+
+
+def test_batched_callers_time_out_when_the_batch_hangs():
+    inner = HangingBatchProvider()
+    provider = BatchingProvider(inner, window_seconds=0.01, max_batch_size=8, timeout=0.2)
+
+    try:
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            provider.generate_response('a')
+        with pytest.raises(TimeoutError):
+            asyncio.run(provider.agenerate_response('b'))
+        assert time.monotonic() - started < 2
+    finally:
+        inner.release.set()
@@ -0,0 +1,88 @@
+"""
+Tests that background LLM work goes through the LLM scheduler
+"""
+import threading
+from contextlib import contextmanager
+from conversation_summarizer import ConversationSummarizer
+from llm_scheduler import LLMScheduler, SchedulerBusy
+from translation_pipeline import TranslationPipeline
+
+
+class RecordingScheduler(LLMScheduler):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.users = []
+
+    def acquire(self, user):
+        super().acquire(user)
+        self.users.append(user)
+
+
+class FakeManager:
+    def __init__(self, conv):
+        self.conv = conv
+        self.applied = None
+        self._lock = threading.Lock()
+
+    def lock(self, conversation_id):
+        return self._lock
+
+    def get_conversation(self, conversation_id):
+        return self.conv
+
+    def apply_summary(self, conversation_id, summary, covered, previous_covered):
+        self.applied = (summary, covered)
+        return True
+
+
+def test_summary_holds_a_slot_for_the_owner():
+    scheduler = RecordingScheduler()
+    manager = FakeManager({'owner': 'ann@example.com', 'messages': [{'role': 'user', 'content': 'headache'}]})
+    summarizer = ConversationSummarizer(manager, lambda previous, messages: 'Headache', scheduler=scheduler)
+
+    summarizer._update('conv-1')
+
+    assert scheduler.users == ['ann@example.com']
+    assert scheduler.stats()['active'] == 0
+    assert manager.applied == ('Headache', 1)
+
+
+def test_summary_is_deferred_when_the_scheduler_is_busy():
+    scheduler = LLMScheduler(max_concurrent=1, max_queue=0)
+    scheduler.acquire('someone-else')
+    manager = FakeManager({'owner': 'ann@example.com', 'messages': [{'role': 'user', 'content': 'headache'}]})
+    summarizer = ConversationSummarizer(manager, lambda previous, messages: 'Headache', scheduler=scheduler)
+
+    summarizer._update('conv-1')
+
+    assert manager.applied is None
+    assert summarizer.stats()['deferred'] == 1
+
+
+def test_each_translation_chunk_holds_its_own_slot():
+    scheduler = RecordingScheduler()
+    active = []
+
+    def translate_batch(messages, target_language):
+        active.append(scheduler.stats()['active'])
+        return [m['content'].upper() for m in messages]
+
+    pipeline = TranslationPipeline(translate_batch, len, max_batch_tokens=20)
+    messages = [{'role': 'user', 'content': 'x' * 10} for _ in range(4)]
+
+    translated = pipeline.translate(messages, 'hindi', lambda: scheduler.slot('ann@example.com'))
+
+    assert translated == ['X' * 10] * 4
+    assert scheduler.users == ['ann@example.com'] * 4
+    assert all(count >= 1 for count in active)
+    assert scheduler.stats()['active'] == 0
+
+
+def test_busy_translation_chunk_is_left_untranslated():
+    @contextmanager
+    def busy_slot():
+        raise SchedulerBusy('busy', 1)
+        yield
+
+    pipeline = TranslationPipeline(lambda messages, target: [m['content'] for m in messages], len)
+    assert pipeline.translate([{'role': 'user', 'content': 'hi'}], 'hindi', busy_slot) == [None]
@@ -0,0 +1,77 @@
+"""
+Tests for the shared LLM transport's retry policy
+"""
+import time
+import pytest
+from llm_providers import LLMTransport
+
+
+class ReadTimeout(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def _transport(**kwargs):
+    options = dict(timeout=0.3, deadline=0.5, max_retries=5, backoff_base=0.01, backoff_max=0.01)
+    options.update(kwargs)
+    return LLMTransport(**options)
+
+
+def test_attempts_share_the_deadline():
+    transport = _transport()
+    timeouts = []
+
+    def slow(timeout):
+        timeouts.append(timeout)
+        time.sleep(timeout)
+        raise ReadTimeout()
+
+    started = time.monotonic()
+    with pytest.raises(ReadTimeout):
+        transport.call(slow)
+    elapsed = time.monotonic() - started
+
+    assert timeouts[0] == pytest.approx(0.3, abs=0.01)
+    assert timeouts[1] < 0.3  # Only what was left of the deadline
+    assert elapsed < 0.5 + 0.05
+
+
+def test_no_retry_when_backoff_crosses_deadline():
+    transport = _transport(deadline=0.2, backoff_base=1, backoff_max=1)
+    calls = []
+
+    def failing(timeout):
+        calls.append(timeout)
+        raise ReadTimeout()
+
+    transport.backoff = lambda attempt: 0.5
+    with pytest.raises(ReadTimeout):
+        transport.call(failing)
+    assert len(calls) == 1
+
+
+def test_non_retryable_errors_raise_at_once():
+    calls = []
+
+    def failing(timeout):
+        calls.append(timeout)
+        raise BadRequest()
+
+    with pytest.raises(BadRequest):
+        _transport().call(failing)
+    assert len(calls) == 1
+
+
+def test_retries_until_success():
+    attempts = iter([ReadTimeout(), ReadTimeout(), 'ok'])
+
+    def flaky(timeout):
+        result = next(attempts)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert _transport().call(flaky) == 'ok'
@@ -0,0 +1,18 @@
+"""
+Tests for the LLM response cache
+"""
+from response_cache import ResponseCache, normalize_symptoms
+
+
+def test_normalization_ignores_case_punctuation_and_spacing():
+    assert normalize_symptoms("Headache, mild  FEVER.") == normalize_symptoms("headache mild fever") == 'headache mild fever'
+
+
+def test_reordered_or_negated_symptoms_get_different_keys():
+    assert normalize_symptoms("chest pain, no fever") != normalize_symptoms("fever, no chest pain")
+    assert normalize_symptoms("pain pain") != normalize_symptoms("pain")
+
+    cache = ResponseCache()
+    cache.put("chest pain, no fever", 'adult', 'english', {'response': 'cardiac advice'})
+    assert cache.get("fever, no chest pain", 'adult', 'english') is None
+    assert cache.get("Chest pain - no fever!", 'adult', 'english') == {'response': 'cardiac advice'}
@@ -0,0 +1,54 @@
+"""
+Tests for the response section parser
+"""
+import pytest
+from response_parser import SectionParser, parse_sections
+
+LETTER_ENUMERATED = """**A. Brief Summary**
+Tension headache.
+
+**B. Home Care Recommendations**
+Rest and drink water.
+
+**C. When to Seek Medical Attention**
+If it lasts more than three days.
+
+**D. Possible Causes**
+Stress."""
+
+PARENTHETICAL = """Brief Summary:
+Tension headache.
+
+Home Care Recommendations (Age-Appropriate):
+Rest and drink water.
+
+When to Seek Medical Attention (Red Flags):
+If it lasts more than three days.
+
+Possible Causes (Most Likely First):
+Stress."""
+
+
+@pytest.mark.parametrize('response', [LETTER_ENUMERATED, PARENTHETICAL])
+@pytest.mark.parametrize('strict', [False, True])
+def test_header_formats_fill_every_section(response, strict):
+    sections = parse_sections(response, strict=strict)
+    assert 'Tension headache.' in sections['summary']
+    assert 'Rest and drink water.' in sections['home_care']
+    assert 'three days' in sections['medical_attention']
+    assert 'Stress.' in sections['possible_causes']
+
+
+@pytest.mark.parametrize('response', [LETTER_ENUMERATED, PARENTHETICAL])
+def test_streaming_parser_finds_same_headers(response):
+    parser = SectionParser(strict=True)
+    events = parser.feed(response) + parser.close()
+    opened = [e['section'] for e in events if e['event'] == 'section']
+    assert opened == ['summary', 'home_care', 'medical_attention', 'possible_causes']
+
+
+def test_strict_mode_ignores_markers_in_body_text():
+    response = "(A) Brief Summary\nCommon causes include stress.\n(D) Possible Causes\nStress."
+    sections = parse_sections(response, strict=True)
+    assert 'Common causes include stress.' in sections['summary']
+    assert sections['possible_causes'].endswith('Stress.')
@@ -0,0 +1,59 @@
+"""
+Tests for the SQLite auth store
+"""
+import sqlite3
+from sqlite_auth_store import SQLiteAuthStore, MIGRATIONS, SELECT_MESSAGES
+
+
+def _store(tmp_path):
+    return SQLiteAuthStore(db_path=str(tmp_path / 'auth_data.db'))
+
+
+def _messages(count):
+    return [{'role': 'user', 'content': f"message {i}", 'timestamp': '2024-01-01T10:00:00'} for i in range(count)]
+
+
+def test_migrations_run_once(tmp_path):
+    with sqlite3.connect(str(tmp_path / 'auth_data.db')) as conn:
+        conn.execute("CREATE TABLE conversations (id TEXT PRIMARY KEY, user_id TEXT, updated_at TEXT)")
+        conn.execute("CREATE INDEX idx_conversations_user_updated ON conversations (user_id, updated_at)")
+
+    _store(tmp_path)
+    _store(tmp_path)
+
+    with sqlite3.connect(str(tmp_path / 'auth_data.db')) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        indexes = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+    assert 'idx_conversations_user_updated' not in indexes
+    assert 'idx_conversations_user_updated_id' in indexes
+
+
+def test_appends_are_written_without_reading_stored_messages(tmp_path):
+    store = _store(tmp_path)
+    assert store.register_user('Ann', '1990-01-01', 'ann@example.com', 'secret123')['success']
+    messages = _messages(3)
+    assert store.save_conversation('ann@example.com', {'id': 'conv-1', 'messages': messages})
+
+    statements = []
+    store._connection().set_trace_callback(statements.append)
+    messages.append({'role': 'assistant', 'content': 'rest', 'timestamp': '2024-01-01T10:00:05'})
+    assert store.update_conversation_messages('conv-1', messages, 'ann@example.com')
+    store._connection().set_trace_callback(None)
+
+    assert not [s for s in statements if s.startswith(SELECT_MESSAGES.split(' WHERE')[0])]
+    assert [m['content'] for m in store.get_conversation('conv-1', 'ann@example.com')['messages']] == \
+        [m['content'] for m in messages]
+
+
+def test_write_from_another_process_is_diffed_against_the_stored_rows(tmp_path):
+    store, other = _store(tmp_path), _store(tmp_path)
+    assert store.register_user('Bo', '1990-01-01', 'bo@example.com', 'secret123')['success']
+    assert store.save_conversation('bo@example.com', {'id': 'conv-2', 'messages': _messages(3)})
+
+    # Another worker rewrites the conversation; this store's fingerprints are now stale
+    edited = _messages(1) + [{'role': 'user', 'content': 'edited', 'timestamp': '2024-01-01T10:00:00'}]
+    assert other.update_conversation_messages('conv-2', edited, 'bo@example.com')
+
+    assert store.update_conversation_messages('conv-2', _messages(4), 'bo@example.com')
+    assert [m['content'] for m in store.get_conversation('conv-2', 'bo@example.com')['messages']] == \
+        [m['content'] for m in _messages(4)]
@@ -0,0 +1,119 @@
+"""
+Tests for the background translation job queue
+"""
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+from datetime import datetime
+from translation_jobs import TranslationJobQueue, INSERT_JOB, QUEUED, RUNNING, COMPLETED, FAILED, SUPERSEDED
+
+
+class FakeManager:
+    def __init__(self, conversations):
+        self.conversations = conversations
+
+    def get_conversation(self, conversation_id):
+        return self.conversations.get(conversation_id)
+
+    def translate_conversation(self, conversation_id, language, translator):
+        conv = self.conversations[conversation_id]
+        contents = translator(conv['messages'], language)
+        if contents is None:
+            return False
+        for message, content in zip(conv['messages'], contents):
+            message['content'] = content
+        conv['language'] = language
+        return True
+
+    def flush(self, conversation_id):
+        pass
+
+
+def _queue(tmp_path, manager, translate):
+    return TranslationJobQueue(manager, translate, db_path=str(tmp_path / 'jobs.db'))
+
+
+def _wait(queue, job_id):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job['status'] not in (QUEUED, RUNNING):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError('job did not finish')
+
+
+def _conversation():
+    # set_language switches the conversation before it submits the job
+    return {'language': 'hindi', 'messages': [
+        {'role': 'user', 'content': 'headache', 'timestamp': 't1'},
+        {'role': 'assistant', 'content': 'rest', 'timestamp': 't2'}
+    ]}
+
+
+def test_untranslated_messages_make_the_job_partial(tmp_path):
+    manager = FakeManager({'conv-1': _conversation()})
+    queue = _queue(tmp_path, manager, lambda messages, language, previous, llm_slot: ['sirdard', None])
+
+    job = _wait(queue, queue.submit('conv-1', 'ann@example.com', 'hindi', 'english')['id'])
+
+    assert (job['status'], job['partial']) == (COMPLETED, True)
+    assert '1 of 2' in job['error']
+    assert [m['content'] for m in job['messages']] == ['sirdard', 'rest']
+    assert [m['content'] for m in manager.conversations['conv-1']['messages']] == ['sirdard', 'rest']
+
+
+def test_job_fails_when_nothing_was_translated(tmp_path):
+    manager = FakeManager({'conv-1': _conversation()})
+    queue = _queue(tmp_path, manager, lambda messages, language, previous, llm_slot: [None, None])
+
+    job = _wait(queue, queue.submit('conv-1', 'ann@example.com', 'hindi', 'english')['id'])
+
+    assert (job['status'], job['partial'], job['messages']) == (FAILED, False, None)
+    assert [m['content'] for m in manager.conversations['conv-1']['messages']] == ['headache', 'rest']
+
+
+def test_restart_fails_only_jobs_whose_process_exited(tmp_path):
+    calls = []
+    _queue(tmp_path, FakeManager({}), lambda *args: calls.append(args))
+    host = socket.gethostname()
+    exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+    exited.wait()
+    now = datetime.now().isoformat()
+    rows = [
+        ('queued-job', QUEUED, f"{host}:{exited.pid}"),
+        ('running-job', RUNNING, f"{host}:{exited.pid}"),
+        ('sibling-job', RUNNING, f"{host}:{os.getppid()}"),  # Another worker sharing the database
+        ('remote-job', QUEUED, 'other-host:1')
+    ]
+    with sqlite3.connect(str(tmp_path / 'jobs.db')) as conn:
+        for job_id, status, instance in rows:
+            conn.execute(INSERT_JOB, (job_id, 'conv-1', 'ann@example.com', 'hindi', None, status, now, now, instance))
+
+    restarted = _queue(tmp_path, FakeManager({}), lambda *args: calls.append(args))
+
+    assert [restarted.get(job_id)['status'] for job_id, _, _ in rows] == [FAILED, FAILED, RUNNING, QUEUED]
+    assert 'restart' in restarted.get('queued-job')['error']
+    assert restarted.stats()['failed'] == 2
+    assert calls == []
+
+
+def test_finishing_leaves_jobs_that_are_no_longer_running(tmp_path):
+    queue = _queue(tmp_path, FakeManager({}), lambda *args: None)
+    now = datetime.now().isoformat()
+    with sqlite3.connect(str(tmp_path / 'jobs.db')) as conn:
+        conn.execute(INSERT_JOB, ('done-job', 'conv-1', 'ann@example.com', 'hindi', None, SUPERSEDED, now, now, None))
+
+    assert not queue._finish('done-job', COMPLETED, None, [])
+    assert queue.get('done-job')['status'] == SUPERSEDED
+
+
+def test_importing_the_app_creates_no_job_database(tmp_path):
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=repo)
+    env.pop('TRANSLATION_JOBS_DB')
+    subprocess.run([sys.executable, '-c', 'import app; assert app.translation_jobs is None'],
+                   cwd=str(tmp_path), env=env, check=True, capture_output=True)
+    assert not (tmp_path / 'translation_jobs.db').exists()
@@ -0,0 +1,319 @@
+"""
+Translation Jobs - Language-switch translations run off the request path
+Jobs are recorded in a local SQLite table and run on a small worker pool
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from llm_scheduler import SchedulerBusy
+import config
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+SUPERSEDED = 'superseded'  # a later language switch replaced this job
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translation_jobs (
+    id TEXT PRIMARY KEY,
+    conversation_id TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    language TEXT NOT NULL,
+    previous_language TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    result TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    instance TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_translation_jobs_status ON translation_jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_translation_jobs_conversation ON translation_jobs (conversation_id, status);
+"""
+
+JOB_COLUMNS = "id, conversation_id, owner, language, previous_language, status, error, result, created_at, updated_at"
+
+INSERT_JOB = f"INSERT INTO translation_jobs ({JOB_COLUMNS}, instance) VALUES (?, ?, ?, ?, ?, ?, NULL, NULL, ?, ?, ?)"
+SELECT_JOB = f"SELECT {JOB_COLUMNS} FROM translation_jobs WHERE id = ?"
+SUPERSEDE_QUEUED = (
+    "UPDATE translation_jobs SET status = ?, updated_at = ? "
+    "WHERE conversation_id = ? AND status = ? AND id != ?"
+)
+CLAIM_JOB = "UPDATE translation_jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?"
+FINISH_JOB = (
+    "UPDATE translation_jobs SET status = ?, error = ?, result = ?, updated_at = ? "
+    "WHERE id = ? AND status = 'running'"
+)
+SELECT_UNFINISHED_INSTANCES = "SELECT DISTINCT instance FROM translation_jobs WHERE status IN (?, ?)"
+EXPIRE_UNFINISHED = (
+    "UPDATE translation_jobs SET status = ?, error = ?, updated_at = ? "
+    "WHERE status IN (?, ?) AND instance IS ?"
+)
+DELETE_FINISHED_BEFORE = "DELETE FROM translation_jobs WHERE status IN (?, ?, ?) AND updated_at < ?"
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this id is running on this host"""
+    if os.name == 'nt':
+        return True  # No signal-0 probe on Windows; never expire a sibling's jobs there
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Running under another user
+    return True
+
+
+def _instance_gone(instance: Optional[str], current: str) -> bool:
+    """Whether the process that owned a job row has exited
+
+    Rows are owned by 'host:pid'. Rows from before ownership was
+    recorded have none and count as gone; rows from other hosts are
+    left to those hosts.
+    """
+    if instance is None:
+        return True
+    if instance == current:
+        return False
+    host, _, pid = instance.rpartition(':')
+    if host != current.rpartition(':')[0] or not pid.isdigit():
+        return False
+    return not _process_alive(int(pid))
+
+
+class TranslationJobQueue:
+    """Runs conversation translations as background jobs with durable status
+
+    submit() records a job and returns at once; a worker later translates
+    the messages with translate(messages, language, previous_language,
+    llm_slot) and applies them through
+    ConversationManager.translate_conversation. llm_slot holds an LLM
+    scheduler slot for the conversation's owner around each LLM call the
+    translation makes, waiting out a busy scheduler a few times. The
+    job row (queued -> running -> completed/failed/superseded) is what
+    clients poll; a completed job also stores the translated messages.
+    translate returns None for messages it could not translate: those keep
+    their original text and the job completes as partial, with an error
+    saying how many were left; if none translated the job fails.
+
+    A newer switch on the same conversation supersedes its queued jobs,
+    and translate_conversation refuses to apply a translation whose
+    language is no longer the conversation's. Active conversations live
+    in memory only, so each row records the process that queued it
+    ('host:pid'); on startup, queued or running jobs whose process has
+    exited are marked failed rather than run against conversations that
+    are gone. Jobs of sibling workers sharing the database are left alone,
+    and a job is only finished while it is still running.
+    """
+
+    def __init__(self, manager, translate: Callable[..., List[str]],
+                 scheduler=None, db_path: str = None, max_workers: int = 2, retention_hours: float = 24,
+                 max_busy_retries: int = 3):
+        self.manager = manager
+        self.translate = translate
+        self.scheduler = scheduler
+        self.db_path = db_path or config.Config.TRANSLATION_JOBS_DB
+        self.retention_hours = retention_hours
+        self.max_busy_retries = max_busy_retries
+        self.instance = f"{socket.gethostname()}:{os.getpid()}"
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translation-job')
+        self._counts_lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(translation_jobs)")]
+        if 'instance' not in columns:
+            conn.execute("ALTER TABLE translation_jobs ADD COLUMN instance TEXT")
+        conn.commit()
+        self._prune()
+        self._recover()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, conversation_id: str, owner: str, language: str, previous_language: str = None) -> Dict:
+        """Queue a translation of a conversation into language; returns the new job"""
+        job_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        conn = self._connection()
+        with conn:
+            conn.execute(INSERT_JOB, (job_id, conversation_id, owner, language, previous_language, QUEUED, now, now, self.instance))
+            conn.execute(SUPERSEDE_QUEUED, (SUPERSEDED, now, conversation_id, QUEUED, job_id))
+
+        self._enqueue(job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get a job's status (and translated messages once completed)"""
+        row = self._connection().execute(SELECT_JOB, (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def stats(self) -> Dict:
+        with self._counts_lock:
+            return {
+                'completed': self.completed,
+                'failed': self.failed,
+                'pending': self.pending
+            }
+
+    def _enqueue(self, job_id: str):
+        with self._counts_lock:
+            self.pending += 1
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str):
+        with self._counts_lock:
+            self.pending -= 1
+        try:
+            job = self._claim(job_id)
+            if job is None:
+                return  # Superseded while queued
+            status, error, result = self._translate(job)
+        except Exception as e:
+            print(f"Warning: Translation job {job_id} failed: {e}")
+            status, error, result = FAILED, 'Translation failed; original messages preserved.', None
+
+        if not self._finish(job_id, status, error, result):
+            return  # Already finished elsewhere, e.g. expired as interrupted
+        with self._counts_lock:
+            if status == COMPLETED:
+                self.completed += 1
+            elif status == FAILED:
+                self.failed += 1
+
+    def _claim(self, job_id: str) -> Optional[Dict]:
+        conn = self._connection()
+        with conn:
+            claimed = conn.execute(CLAIM_JOB, (RUNNING, datetime.now().isoformat(), job_id, QUEUED)).rowcount
+        return self.get(job_id) if claimed else None
+
+    def _translate(self, job: Dict):
+        """Translate and apply one job; returns (status, error, translated messages)"""
+        conversation_id, language = job['conversation_id'], job['language']
+        if not self.manager.get_conversation(conversation_id):
+            return FAILED, 'Conversation is no longer active', None
+
+        snapshot = {}
+
+        def translator(messages, target_language):
+            llm_slot = (lambda: self._llm_slot(job['owner'])) if self.scheduler else None
+            contents = self.translate(messages, target_language, job['previous_language'], llm_slot)
+            missing = [i for i, text in enumerate(contents) if text is None]
+            if len(missing) == len(messages):
+                return None  # Nothing translated; leave the conversation as it was
+            contents = [m.get('content', '') if text is None else text for m, text in zip(messages, contents)]
+            snapshot['messages'], snapshot['contents'], snapshot['missing'] = messages, contents, len(missing)
+            return contents
+
+        applied = self.manager.translate_conversation(conversation_id, language, translator)
+        conv = self.manager.get_conversation(conversation_id)
+        if conv and conv['language'] != language:
+            return SUPERSEDED, None, None
+        if not applied:
+            return FAILED, 'Translation failed; original messages preserved.', None
+
+        self.manager.flush(conversation_id)
+        # The translator is not called for a conversation without messages
+        messages, contents = snapshot.get('messages', []), snapshot.get('contents', [])
+        missing = snapshot.get('missing', 0)
+        error = (
+            f"{missing} of {len(messages)} messages could not be translated and were kept in the original language."
+            if missing else None
+        )
+        return COMPLETED, error, [
+            {'role': m.get('role'), 'content': contents[i], 'timestamp': m.get('timestamp')}
+            for i, m in enumerate(messages)
+        ]
+
+    @contextmanager
+    def _llm_slot(self, owner: str):
+        """Hold a scheduler slot for owner, retrying a busy scheduler after its Retry-After hint"""
+        for attempt in range(self.max_busy_retries + 1):
+            try:
+                self.scheduler.acquire(owner)
+                break
+            except SchedulerBusy as e:
+                if attempt == self.max_busy_retries:
+                    raise
+                time.sleep(e.retry_after)
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.scheduler.release(time.monotonic() - start)
+
+    def _finish(self, job_id: str, status: str, error: Optional[str], result: Optional[List[Dict]]) -> bool:
+        """Record a running job's outcome; False if the job was no longer running"""
+        encoded = json.dumps(result, ensure_ascii=False) if result is not None else None
+        conn = self._connection()
+        with conn:
+            return conn.execute(FINISH_JOB, (status, error, encoded, datetime.now().isoformat(), job_id)).rowcount > 0
+
+    def _recover(self):
+        """Fail the jobs exited processes left unfinished; their conversations did not survive them"""
+        conn = self._connection()
+        expired = 0
+        with conn:
+            instances = [row[0] for row in conn.execute(SELECT_UNFINISHED_INSTANCES, (QUEUED, RUNNING))]
+            for instance in instances:
+                if not _instance_gone(instance, self.instance):
+                    continue
+                expired += conn.execute(EXPIRE_UNFINISHED, (
+                    FAILED, 'Translation interrupted by a server restart; original messages preserved.',
+                    datetime.now().isoformat(), QUEUED, RUNNING, instance
+                )).rowcount
+        with self._counts_lock:
+            self.failed += expired
+
+    def _prune(self):
+        """Drop finished jobs older than the retention period"""
+        cutoff = (datetime.now() - timedelta(hours=self.retention_hours)).isoformat()
+        conn = self._connection()
+        with conn:
+            conn.execute(DELETE_FINISHED_BEFORE, (COMPLETED, FAILED, SUPERSEDED, cutoff))
+
+    @staticmethod
+    def _row_to_job(row) -> Dict:
+        job = dict(zip(
+            ('id', 'conversation_id', 'owner', 'language', 'previous_language', 'status', 'error', 'result',
+             'created_at', 'updated_at'),
+            row
+        ))
+        job['messages'] = json.loads(job.pop('result')) if job['result'] else None
+        # Completed jobs only carry an error when some messages kept their original text
+        job['partial'] = job['status'] == COMPLETED and job['error'] is not None
+        return job
+
+
+def create_translation_job_queue(manager, translate, scheduler=None) -> TranslationJobQueue:
+    """Create a job queue from the configured database, workers and retention"""
+    return TranslationJobQueue(
+        manager,
+        translate,
+        scheduler=scheduler,
+        db_path=config.Config.TRANSLATION_JOBS_DB,
+        max_workers=config.Config.TRANSLATION_JOB_WORKERS,
+        retention_hours=config.Config.TRANSLATION_JOB_RETENTION_HOURS
+    )
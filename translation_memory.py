@@ -0,0 +1,81 @@
+"""
+Translation Memory - Reuses per-message translations across language switches
+Stores translations keyed by content hash and target language
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import config
+
+MemoryKey = Tuple[bytes, str]  # (content digest, target language)
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class TranslationMemory:
+    """Thread-safe, bounded store of message translations
+
+    When the source language is known, each stored translation also records
+    the reverse direction and marks both texts as already being in their own
+    language, so switching back and forth needs no further LLM calls.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[MemoryKey, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, text: str, target_language: str) -> Optional[str]:
+        """Return the remembered translation of text into target_language"""
+        key = (_digest(text), target_language)
+        with self._lock:
+            translated = self._entries.get(key)
+            if translated is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return translated
+
+    def store(self, source_text: str, translated_text: str, target_language: str, source_language: str = None):
+        """Remember a translation (and its reverse when source_language is known)"""
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._put((_digest(source_text), target_language), translated_text)
+            self._put((_digest(translated_text), target_language), translated_text)
+            if source_language:
+                self._put((_digest(translated_text), source_language), source_text)
+                self._put((_digest(source_text), source_language), source_text)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget all translations"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _put(self, key: MemoryKey, value: str):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+
+# Global translation memory instance
+translation_memory = TranslationMemory(max_entries=config.Config.TRANSLATION_MEMORY_MAX_ENTRIES)
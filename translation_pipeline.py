@@ -0,0 +1,105 @@
+"""
+Translation Pipeline - Splits long conversations into token-budgeted chunks
+Chunks are translated concurrently on a bounded worker pool and reassembled by index
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, ContextManager, List, Optional
+
+# Prompt overhead per message for the "INDEX:<i> ROLE:<role>" header and separator
+MESSAGE_OVERHEAD_TOKENS = 8
+
+
+class TranslationPipeline:
+    """Translates message lists chunk by chunk
+
+    translate_batch(messages, target_language) performs one LLM call and
+    returns a list aligned with messages (None for anything it could not
+    translate). A chunk that fails is retried on its own; if it still fails,
+    its messages are retried one at a time so a single bad message cannot
+    discard the rest of the chunk.
+
+    translate() accepts an llm_slot factory returning a context manager
+    held around each LLM call, so chunks running concurrently each take
+    their own LLM scheduler slot.
+    """
+
+    def __init__(
+        self,
+        translate_batch: Callable[[list, str], list],
+        estimate_tokens: Callable[[str], int],
+        max_batch_tokens: int = 1500,
+        max_workers: int = 4,
+        max_retries: int = 1
+    ):
+        self.translate_batch = translate_batch
+        self.estimate_tokens = estimate_tokens
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translate')
+
+    def translate(self, messages: list, target_language: str,
+                  llm_slot: Callable[[], ContextManager] = None) -> List[Optional[str]]:
+        """Translate messages, returning texts in the original order (None where translation failed)"""
+        if not messages:
+            return []
+
+        chunks = self._split(messages)
+        if len(chunks) == 1:
+            return self._translate_chunk(messages, target_language, llm_slot)
+
+        futures = [
+            (chunk, self._executor.submit(
+                self._translate_chunk, [messages[i] for i in chunk], target_language, llm_slot
+            ))
+            for chunk in chunks
+        ]
+
+        translated = [None] * len(messages)
+        for chunk, future in futures:
+            for i, text in zip(chunk, future.result()):
+                translated[i] = text
+        return translated
+
+    def _split(self, messages: list) -> List[List[int]]:
+        """Group message indices into chunks that fit the token budget"""
+        chunks = []
+        current, current_tokens = [], 0
+
+        for i, m in enumerate(messages):
+            tokens = self.estimate_tokens(str(m.get('content', ''))) + MESSAGE_OVERHEAD_TOKENS
+            if current and current_tokens + tokens > self.max_batch_tokens:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _translate_chunk(self, messages: list, target_language: str, llm_slot=None) -> List[Optional[str]]:
+        """Translate one chunk, retrying the chunk and then its missing messages individually"""
+        translated = self._attempt(messages, target_language, llm_slot) or [None] * len(messages)
+
+        if len(messages) > 1:
+            for i, text in enumerate(translated):
+                if text is None:
+                    single = self._attempt([messages[i]], target_language, llm_slot)
+                    if single:
+                        translated[i] = single[0]
+
+        return translated
+
+    def _attempt(self, messages: list, target_language: str, llm_slot=None) -> Optional[List[Optional[str]]]:
+        """Call translate_batch with retries; None if every attempt raised"""
+        result = None
+        for _ in range(self.max_retries + 1):
+            try:
+                with llm_slot() if llm_slot else nullcontext():
+                    result = self.translate_batch(messages, target_language)
+            except Exception:
+                continue
+            if all(text is not None for text in result):
+                break
+        return result